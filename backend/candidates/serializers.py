@@ -19,4 +19,12 @@ class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = ['id', 'candidate', 'job', 'file', 'resume_text', 'parsed_data', 'resume_job_score', 'uploaded_at']
-        read_only_fields = ['candidate', 'job', 'file', 'uploaded_at']
\ No newline at end of file
+        read_only_fields = ['candidate', 'job', 'file', 'uploaded_at']
+
+
+class ResumeJobInfoBulkSerializer(serializers.Serializer):
+    resume_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=1000
+    )
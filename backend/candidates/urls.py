@@ -12,6 +12,8 @@ urlpatterns = [
     path('resumes/<uuid:pk>/', views.ResumeRetrieveUpdateDestroyView.as_view(), name='resume-detail-slash'),
     path('resume/<uuid:pk>', views.ResumeRetrieveUpdateDestroyView.as_view(), name='resume-detail-alias'),
     path('resume/<uuid:pk>/', views.ResumeRetrieveUpdateDestroyView.as_view(), name='resume-detail-alias-slash'),
+    path('resumes/job-info', views.ResumeJobInfoBulkView.as_view(), name='resume-job-info-bulk'),
+    path('resumes/job-info/', views.ResumeJobInfoBulkView.as_view(), name='resume-job-info-bulk-slash'),
     path('resumes/<uuid:pk>/job-info', views.ResumeJobInfoView.as_view(), name='resume-job-info'),
     path('resumes/<uuid:pk>/job-info/', views.ResumeJobInfoView.as_view(), name='resume-job-info-slash'),
 ]
@@ -8,7 +8,7 @@ from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from jobs.models import Job
 from candidates.models import Candidate, Resume
-from candidates.serializers import CandidateSerializer, ResumeSerializer
+from candidates.serializers import CandidateSerializer, ResumeSerializer, ResumeJobInfoBulkSerializer
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import serializers
 
@@ -121,3 +121,27 @@ class ResumeJobInfoView(APIView):
         })
 
 
+class ResumeJobInfoBulkView(APIView):
+    """
+    Bulk variant of ResumeJobInfoView for the parsing pipeline.
+    Body: {"resume_ids": ["<uuid>", ...]} -> job id + description for each, in one query.
+    """
+    def post(self, request):
+        serializer = ResumeJobInfoBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resume_ids = serializer.validated_data["resume_ids"]
+
+        resumes = Resume.objects.filter(pk__in=resume_ids, job__isnull=False).select_related('job')
+
+        results = []
+        found = set()
+        for resume in resumes:
+            found.add(resume.id)
+            results.append({
+                "resume_id": str(resume.id),
+                "job_id": str(resume.job.id),
+                "job_description": resume.job.description
+            })
+
+        missing = [str(rid) for rid in resume_ids if rid not in found]
+        return Response({"results": results, "missing": missing})
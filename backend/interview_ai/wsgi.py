@@ -3,3 +3,7 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'interview_ai.settings')
 application = get_wsgi_application()
+
+# Build the shared Gemini clients once per worker, before the first request
+from interviews.gemini import warmup  # noqa: E402
+warmup()
@@ -1,8 +1,11 @@
 import os
 import json
 import re
+import time
+import bisect
 import asyncio
 import logging
+import threading
 
 import google.generativeai as genai
 
@@ -11,11 +14,23 @@ logger = logging.getLogger(__name__)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not GEMINI_API_KEY:
     logger.warning("GEMINI_API_KEY is not set; interview scoring is disabled.")
 
+# Model per role; each client is built once per process and shared by all calls
+MODEL_ROLES = {
+    "scoring": GEMINI_MODEL,
+    "classification": GEMINI_MODEL,
+}
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 60.0)
+
+_clients_lock = threading.Lock()
+_configured = False
+_clients = {}
+_client_stats = {}
+
 SYSTEM_PROMPT = """
 You are an expert technical interviewer. Evaluate the candidate’s answers against the role.
 Always reply with strict JSON: {"score": <float 1-5>, "rationale": "<<=3 concise sentences>"}.
@@ -40,14 +55,82 @@ async def score_interview_responses(prompt: str) -> dict:
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, _invoke_model, prompt.strip())
 
+def get_model(role: str):
+    """Shared GenerativeModel for `role`; configures genai on first use."""
+    global _configured
+    with _clients_lock:
+        if not _configured:
+            genai.configure(api_key=GEMINI_API_KEY)
+            _configured = True
+        if role not in _clients:
+            _clients[role] = genai.GenerativeModel(MODEL_ROLES[role])
+        return _clients[role]
+
+def warmup():
+    """Builds every client up front (called once per worker at startup)."""
+    if not GEMINI_API_KEY:
+        return
+    for role in MODEL_ROLES:
+        get_model(role)
+    logger.info("Gemini clients ready: %s", ", ".join(MODEL_ROLES))
+
+def _generate(role: str, prompt: str):
+    model = get_model(role)
+    started = time.monotonic()
+    error = True
+    try:
+        response = model.generate_content(prompt)
+        error = False
+        return response
+    finally:
+        latency = time.monotonic() - started
+        _observe(role, latency, error)
+        if not error:
+            _log_usage(role, response, latency)
+
+def _observe(role: str, latency: float, error: bool):
+    with _clients_lock:
+        s = _client_stats.setdefault(
+            role, {"calls": 0, "errors": 0, "seconds": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS) + 1)}
+        )
+        s["calls"] += 1
+        s["errors"] += int(error)
+        s["seconds"] += latency
+        s["buckets"][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+def client_stats() -> dict:
+    """Per role: calls, errors, average latency and the latency histogram."""
+    labels = [f"<={b:g}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+    with _clients_lock:
+        return {
+            role: {
+                "model": MODEL_ROLES[role],
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "avg_seconds": round(s["seconds"] / s["calls"], 3) if s["calls"] else 0.0,
+                "histogram": {label: n for label, n in zip(labels, s["buckets"]) if n},
+            }
+            for role, s in _client_stats.items()
+        }
+
 def _invoke_model(prompt: str) -> dict:
-    model = genai.GenerativeModel(GEMINI_MODEL)
-    response = model.generate_content(f"{SYSTEM_PROMPT.strip()}\n\n{prompt}")
+    response = _generate("scoring", f"{SYSTEM_PROMPT.strip()}\n\n{prompt}")
     text = getattr(response, "text", "") or _extract_text_from_candidates(response)
     if not text:
         raise ValueError("Gemini returned an empty response.")
     return _parse_json_payload(text)
 
+def _log_usage(label: str, response, latency: float):
+    """Tokens in/out per call (from usage_metadata) for latency/cost tracking."""
+    usage = getattr(response, "usage_metadata", None)
+    logger.info(
+        "Gemini %s call: prompt_tokens=%s output_tokens=%s latency=%.2fs",
+        label,
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+        latency,
+    )
+
 def _extract_text_from_candidates(response) -> str:
     if not getattr(response, "candidates", None):
         return ""
@@ -105,8 +188,7 @@ def classify_answer_quality(answer_text: str) -> bool:
         return False  # Without key rely only on heuristic above
 
     try:
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        resp = model.generate_content(f"{CLASSIFY_SYSTEM_PROMPT.strip()}\n\nAnswer:\n{answer_text}")
+        resp = _generate("classification", f"{CLASSIFY_SYSTEM_PROMPT.strip()}\n\nAnswer:\n{answer_text}")
         text = getattr(resp, "text", "") or _extract_text_from_candidates(resp)
         if not text:
             return False
@@ -0,0 +1,65 @@
+import os
+import re
+
+# Prompt budget for interview scoring (0 disables compaction)
+INTERVIEW_PROMPT_TOKEN_BUDGET = int(os.getenv("INTERVIEW_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Interviewer turns mostly repeat the question list that is already in the prompt
+INTERVIEWER_MESSAGE_MAX_CHARS = int(os.getenv("INTERVIEWER_MESSAGE_MAX_CHARS", "200"))
+MIN_MESSAGE_CHARS = 80
+
+TRUNCATION_MARK = " …"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt size: ~4 characters per token (same heuristic as the pipeline)."""
+    return len(text or "") // 4
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + TRUNCATION_MARK
+
+
+def _transcript_chars(lines) -> int:
+    return sum(len(line) + 1 for line in lines)
+
+
+def compact_transcript(lines, max_tokens: int):
+    """
+    Fits transcript lines into about `max_tokens`. Returns (lines, compacted).
+
+    In order, until it fits:
+      1. collapse whitespace
+      2. shorten interviewer turns to INTERVIEWER_MESSAGE_MAX_CHARS
+      3. cap every turn at an equal share of the budget
+      4. keep the first and last turns and omit the middle
+    """
+    budget_chars = max(0, max_tokens) * 4
+    lines = [re.sub(r"\s+", " ", line).strip() for line in lines]
+    if not budget_chars or _transcript_chars(lines) <= budget_chars:
+        return lines, False
+
+    lines = [
+        _truncate(line, INTERVIEWER_MESSAGE_MAX_CHARS) if line.startswith("Interviewer") else line
+        for line in lines
+    ]
+
+    if _transcript_chars(lines) > budget_chars:
+        per_line = max(MIN_MESSAGE_CHARS, budget_chars // len(lines))
+        lines = [_truncate(line, per_line) for line in lines]
+
+    if _transcript_chars(lines) > budget_chars:
+        head, tail, used = [], [], 0
+        for i in range(len(lines)):
+            # Alternate from both ends so the opening and the latest answers survive
+            line = lines[i // 2] if i % 2 == 0 else lines[-(i // 2) - 1]
+            if used + len(line) + 1 > budget_chars:
+                break
+            (head if i % 2 == 0 else tail).append(line)
+            used += len(line) + 1
+        omitted = len(lines) - len(head) - len(tail)
+        lines = head + [f"[... {omitted} message(s) omitted ...]"] + tail[::-1]
+
+    return lines, True
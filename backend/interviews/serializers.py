@@ -28,3 +28,32 @@ class SMSMessagesSerializer(serializers.ModelSerializer):
     class Meta:
         model = SMSMessages
         fields = "__all__"
+
+
+class IngestCandidateSerializer(serializers.Serializer):
+    first_name = serializers.CharField(max_length=100)
+    last_name = serializers.CharField(max_length=100)
+    email = serializers.EmailField()
+    phone_number = serializers.CharField(max_length=15, required=False, allow_null=True, allow_blank=True)
+
+
+class IngestQuestionSerializer(serializers.Serializer):
+    question_text = serializers.CharField()
+    question_type = serializers.ChoiceField(choices=InterviewQuestion._meta.get_field('question_type').choices)
+    sequence_number = serializers.IntegerField(required=False, allow_null=True)
+
+
+class BulkQuestionsSerializer(serializers.Serializer):
+    """Request body of the bulk question endpoint; each question is validated by InterviewQuestionSerializer."""
+    interview_id = serializers.UUIDField()
+    questions = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    replace = serializers.BooleanField(required=False, default=False)
+
+
+class ResumeIngestSerializer(serializers.Serializer):
+    """Everything the parsing pipeline produces for one resume."""
+    job_id = serializers.UUIDField(required=False, allow_null=True)
+    parsed_data = serializers.JSONField()
+    resume_job_score = serializers.FloatField(required=False, allow_null=True, min_value=0.0, max_value=100.0)
+    candidate = IngestCandidateSerializer(required=False, allow_null=True)
+    questions = IngestQuestionSerializer(many=True, required=False)
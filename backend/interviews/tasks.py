@@ -7,6 +7,7 @@ from asgiref.sync import sync_to_async
 
 from interviews.models import Interview, SMSMessages, InterviewQuestion
 from interviews.gemini import score_interview_responses
+from interviews.prompt_budget import INTERVIEW_PROMPT_TOKEN_BUDGET, compact_transcript, estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -80,13 +81,13 @@ def _build_prompt(interview, messages, questions):
         for idx, q in enumerate(questions)
     ) or "- No structured questions recorded."
 
-    transcript_lines = "\n".join(
+    transcript = [
         f"{'Interviewer' if msg['direction'] == 'outbound' else 'Candidate'} "
         f"[{msg['created_at']}]: {msg['message_text']}"
         for msg in messages
-    )
+    ]
 
-    return dedent(f"""
+    header = dedent(f"""
     Candidate: {candidate.first_name} {candidate.last_name} ({candidate.email})
     Role Applied: {job.title if job else 'N/A'}
     Job Category: {job.category if job else 'N/A'}
@@ -94,7 +95,18 @@ def _build_prompt(interview, messages, questions):
 
     Interview Questions:
     {question_lines}
-
-    SMS Transcript:
-    {transcript_lines}
     """).strip()
+
+    # Long SMS threads are compacted so prompt size (latency, cost) stays bounded
+    if INTERVIEW_PROMPT_TOKEN_BUDGET > 0:
+        transcript_budget = max(500, INTERVIEW_PROMPT_TOKEN_BUDGET - estimate_tokens(header))
+        original_tokens = estimate_tokens("\n".join(transcript))
+        transcript, compacted = compact_transcript(transcript, transcript_budget)
+        if compacted:
+            logger.info(
+                "Interview %s transcript compacted: ~%d -> ~%d tokens (%d messages).",
+                interview.pk, original_tokens, estimate_tokens("\n".join(transcript)), len(messages),
+            )
+
+    transcript_lines = "\n".join(transcript)
+    return f"{header}\n\nSMS Transcript:\n{transcript_lines}"
@@ -0,0 +1,100 @@
+import uuid
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from candidates.models import Candidate
+from interviews.models import Interview, InterviewQuestion
+from jobs.models import Job
+
+
+def _make_job(title="Backend Engineer"):
+    return Job.objects.create(
+        title=title,
+        category="Engineering",
+        description="Python, Django and PostgreSQL.",
+        company_name="Acme",
+        location="Remote",
+    )
+
+
+def _questions(*texts):
+    return [
+        {"question_text": text, "question_type": "technical", "sequence_number": i}
+        for i, text in enumerate(texts, start=1)
+    ]
+
+
+class InterviewQuestionBulkCreateViewTests(APITestCase):
+    def setUp(self):
+        self.job = _make_job()
+        self.candidate = Candidate.objects.create(first_name="Jane", last_name="Doe", email="jane@example.com")
+        self.interview = Interview.objects.create(candidate=self.candidate, job=self.job, status="scheduled")
+        self.url = f"/api/interviews/candidates/{self.candidate.id}/questions/bulk"
+        InterviewQuestion.objects.create(
+            interview=self.interview, candidate=self.candidate,
+            question_text="Old question", question_type="other", sequence_number=1,
+        )
+
+    def _post(self, questions, replace=None, interview_id=None):
+        body = {"interview_id": interview_id or str(self.interview.id), "questions": questions}
+        if replace is not None:
+            body["replace"] = replace
+        return self.client.post(self.url, body, format="json")
+
+    def _texts(self):
+        return list(self.interview.questions.order_by("sequence_number").values_list("question_text", flat=True))
+
+    def test_append_by_default(self):
+        response = self._post(_questions("New question"))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(self.interview.questions.count(), 2)
+
+    def test_malformed_interview_id_is_a_bad_request(self):
+        response = self._post(_questions("First"), interview_id="not-a-uuid")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("interview_id", response.data)
+
+    def test_empty_question_list_is_a_bad_request(self):
+        response = self._post([])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_interview_is_not_found(self):
+        response = self._post(_questions("First"), interview_id=str(uuid.uuid4()))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_interview_of_another_candidate_is_not_found(self):
+        other = Candidate.objects.create(first_name="John", last_name="Roe", email="john@example.com")
+        other_interview = Interview.objects.create(candidate=other, job=self.job, status="scheduled")
+
+        response = self._post(_questions("First"), interview_id=str(other_interview.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(other_interview.questions.exists())
+
+    def test_replace_swaps_out_existing_questions(self):
+        response = self._post(_questions("First", "Second"), replace=True)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(self._texts(), ["First", "Second"])
+
+    def test_replace_is_idempotent(self):
+        self._post(_questions("First", "Second"), replace=True)
+        self._post(_questions("First", "Second"), replace=True)
+
+        self.assertEqual(self._texts(), ["First", "Second"])
+
+    def test_replace_refused_once_interview_started(self):
+        self.interview.status = "in_progress"
+        self.interview.save()
+
+        response = self._post(_questions("First"), replace=True)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._texts(), ["Old question"])
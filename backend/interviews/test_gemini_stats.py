@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class GeminiClientStatsViewTests(APITestCase):
+    url = "/api/interviews/gemini/stats"
+
+    def test_requires_admin(self):
+        response = self.client.get(self.url)
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+        user = User.objects.create_user("viewer", password="x")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_gets_stats(self):
+        admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_authenticate(admin)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, dict)
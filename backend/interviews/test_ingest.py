@@ -0,0 +1,129 @@
+from unittest import mock
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from candidates.models import Candidate, Resume
+from interviews.models import Interview, InterviewQuestion
+from jobs.models import Job
+
+
+def _make_job(title="Backend Engineer"):
+    return Job.objects.create(
+        title=title,
+        category="Engineering",
+        description="Python, Django and PostgreSQL.",
+        company_name="Acme",
+        location="Remote",
+    )
+
+
+def _questions(*texts):
+    return [
+        {"question_text": text, "question_type": "technical", "sequence_number": i}
+        for i, text in enumerate(texts, start=1)
+    ]
+
+
+class ResumeIngestViewTests(APITestCase):
+    def setUp(self):
+        self.job = _make_job()
+        self.resume = Resume.objects.create(job=self.job, file="resumes/jane.pdf")
+        self.url = f"/api/interviews/resumes/{self.resume.id}/ingest"
+
+    def _payload(self, **overrides):
+        payload = {
+            "parsed_data": {"skills": ["python", "django"]},
+            "resume_job_score": 0.82,
+            "candidate": {"first_name": "Jane", "last_name": "Doe", "email": "jane@example.com"},
+            "questions": _questions("Explain the GIL.", "How do Django migrations work?"),
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_ingest_creates_candidate_interview_and_questions(self):
+        response = self.client.post(self.url, self._payload(), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data["candidate_created"])
+        self.assertTrue(response.data["interview_created"])
+        self.assertEqual(len(response.data["question_ids"]), 2)
+
+        candidate = Candidate.objects.get(email="jane@example.com")
+        interview = Interview.objects.get(pk=response.data["interview_id"])
+        self.assertEqual(str(candidate.id), response.data["candidate_id"])
+        self.assertEqual(interview.candidate, candidate)
+        self.assertEqual(interview.job, self.job)
+        self.assertEqual(interview.status, "scheduled")
+        self.assertEqual(interview.questions.count(), 2)
+
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.candidate, candidate)
+        self.assertEqual(self.resume.resume_job_score, 0.82)
+        self.assertEqual(self.resume.parsed_data, {"skills": ["python", "django"]})
+
+    def test_reingest_reuses_candidate_by_email_and_scheduled_interview(self):
+        first = self.client.post(self.url, self._payload(), format="json")
+        second = self.client.post(
+            self.url,
+            self._payload(
+                candidate={"first_name": "Janet", "last_name": "Doe", "email": "jane@example.com"},
+                questions=_questions("Describe a hard bug you fixed."),
+            ),
+            format="json",
+        )
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(second.data["candidate_created"])
+        self.assertFalse(second.data["interview_created"])
+        self.assertEqual(second.data["candidate_id"], first.data["candidate_id"])
+        self.assertEqual(second.data["interview_id"], first.data["interview_id"])
+
+        self.assertEqual(Candidate.objects.count(), 1)
+        self.assertEqual(Candidate.objects.get().first_name, "Janet")
+        self.assertEqual(Interview.objects.count(), 1)
+        # The scheduled interview's questions are replaced, not appended
+        self.assertEqual(
+            list(InterviewQuestion.objects.values_list("question_text", flat=True)),
+            ["Describe a hard bug you fixed."],
+        )
+
+    def test_ingest_is_atomic(self):
+        with mock.patch.object(
+            InterviewQuestion.objects, "bulk_create", side_effect=RuntimeError("database went away")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.url, self._payload(), format="json")
+
+        self.assertFalse(Candidate.objects.exists())
+        self.assertFalse(Interview.objects.exists())
+        self.resume.refresh_from_db()
+        self.assertIsNone(self.resume.candidate)
+        self.assertIsNone(self.resume.parsed_data)
+        self.assertIsNone(self.resume.resume_job_score)
+
+    def test_ingest_without_candidate_only_stores_the_resume(self):
+        response = self.client.post(self.url, self._payload(candidate=None, questions=[]), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(response.data["candidate_id"])
+        self.assertIsNone(response.data["interview_id"])
+        self.assertFalse(Interview.objects.exists())
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.resume_job_score, 0.82)
+
+    def test_ingest_requires_a_job(self):
+        resume = Resume.objects.create(file="resumes/nojob.pdf")
+
+        response = self.client.post(f"/api/interviews/resumes/{resume.id}/ingest", self._payload(), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Candidate.objects.exists())
+
+    def test_ingest_rejects_invalid_question_type(self):
+        questions = [{"question_text": "Why us?", "question_type": "trivia"}]
+
+        response = self.client.post(self.url, self._payload(questions=questions), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Candidate.objects.exists())
@@ -7,10 +7,15 @@ urlpatterns = [
     path('<uuid:pk>', views.InterviewRetrieveUpdateDestroyView.as_view(), name='interview-detail'),
     # Interview Questions
     path('candidates/<uuid:candidate_id>/questions', views.InterviewQuestionListCreateView.as_view(), name='interviewquestion-list-create'),
+    path('candidates/<uuid:candidate_id>/questions/bulk', views.InterviewQuestionBulkCreateView.as_view(), name='interviewquestion-bulk-create'),
     path('questions/<uuid:pk>', views.InterviewQuestionRetrieveUpdateDestroyView.as_view(), name='interviewquestion-detail'),
+    # Pipeline ingest (parsed resume -> candidate + interview + questions)
+    path('resumes/<uuid:resume_id>/ingest', views.ResumeIngestView.as_view(), name='resume-ingest'),
     # SMS Messages
     path('sms-messages', views.SMSMessagesListCreateView.as_view(), name='smsmessages-list-create'),
     path('sms-messages/<uuid:pk>', views.SMSMessagesRetrieveUpdateDestroyView.as_view(), name='smsmessages-detail'),
     path('webhook', IncomingSMSWebhookView.as_view(), name='incoming-sms-webhook'),
     path('<uuid:pk>/start', views.StartInterviewView.as_view(), name='start_interview'),
+    # Gemini client stats (per worker process)
+    path('gemini/stats', views.GeminiClientStatsView.as_view(), name='gemini-client-stats'),
 ]
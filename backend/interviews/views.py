@@ -1,6 +1,7 @@
 import os
 import requests
 from django.utils import timezone
+from django.db import transaction
 
 from rest_framework.views import APIView
 from rest_framework import status
@@ -10,10 +11,16 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView ,ListCreateAPIView, RetrieveUpdateDestroyAPIView
 from interviews.models import Interview, InterviewQuestion, SMSMessages
-from interviews.serializers import InterviewSerializer, InterviewQuestionSerializer, SMSMessagesSerializer
+from interviews.serializers import (
+    InterviewSerializer, InterviewQuestionSerializer, SMSMessagesSerializer, ResumeIngestSerializer,
+    BulkQuestionsSerializer,
+)
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAdminUser
 from rest_framework.exceptions import ValidationError
-from candidates.models import Candidate
+from candidates.models import Candidate, Resume
+from interviews.gemini import client_stats
+from jobs.models import Job
 
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
@@ -80,6 +87,129 @@ class InterviewQuestionListCreateView(ListCreateAPIView):
         serializer.save(candidate=candidate, interview=interview)
 
 
+class InterviewQuestionBulkCreateView(APIView):
+    """
+    Creates all questions for one candidate/interview in a single request.
+    Body: {"interview_id": "<uuid>", "questions": [{"question_text", "question_type", "sequence_number"}, ...],
+           "replace": false}
+    With "replace": true the interview's existing questions are swapped out
+    (scheduled interviews only), so the pipeline can safely re-post.
+    """
+    def post(self, request, candidate_id):
+        body = BulkQuestionsSerializer(data=request.data)
+        body.is_valid(raise_exception=True)
+        interview_id = body.validated_data["interview_id"]
+        questions = body.validated_data["questions"]
+
+        # One query checks both the interview and that it belongs to this candidate
+        interview = get_object_or_404(Interview, pk=interview_id, candidate_id=candidate_id)
+
+        serializer = InterviewQuestionSerializer(data=questions, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        objs = []
+        for item in serializer.validated_data:
+            item.pop("candidate", None)
+            item.pop("interview", None)
+            objs.append(InterviewQuestion(candidate_id=candidate_id, interview=interview, **item))
+
+        replace = body.validated_data["replace"]
+        if replace and interview.status != 'scheduled':
+            raise ValidationError({"replace": "Questions can only be replaced on a scheduled interview."})
+
+        with transaction.atomic():
+            if replace:
+                interview.questions.all().delete()
+            created = InterviewQuestion.objects.bulk_create(objs)
+
+        return Response({
+            "interview_id": str(interview.id),
+            "created": len(created),
+            "question_ids": [str(q.id) for q in created],
+        }, status=status.HTTP_201_CREATED)
+
+
+class ResumeIngestView(APIView):
+    """
+    Stores one parsed resume in a single transaction for the parsing pipeline:
+    resume parsed_data/score, candidate (created or updated by email),
+    a scheduled interview and its questions (bulk inserted).
+    """
+    def post(self, request, resume_id):
+        serializer = ResumeIngestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        candidate = None
+        interview = None
+        question_ids = []
+        candidate_created = False
+        interview_created = False
+
+        with transaction.atomic():
+            resume = get_object_or_404(Resume.objects.select_for_update().select_related('job'), pk=resume_id)
+
+            job = resume.job
+            if data.get("job_id") and (job is None or job.id != data["job_id"]):
+                job = get_object_or_404(Job, pk=data["job_id"])
+            if job is None:
+                raise ValidationError({"job_id": "Resume has no linked job and no job_id was provided."})
+
+            candidate_data = data.get("candidate")
+            if candidate_data:
+                candidate, candidate_created = Candidate.objects.update_or_create(
+                    email=candidate_data["email"],
+                    defaults={
+                        "first_name": candidate_data["first_name"],
+                        "last_name": candidate_data["last_name"],
+                        "phone_number": candidate_data.get("phone_number"),
+                        "applied_job": job,
+                    },
+                )
+                resume.candidate = candidate
+
+            resume.parsed_data = data["parsed_data"]
+            resume.resume_job_score = data.get("resume_job_score")
+            resume.save(update_fields=["candidate", "parsed_data", "resume_job_score", "modified_at"])
+
+            if candidate:
+                # Re-ingesting reuses the pending interview instead of creating a duplicate
+                interview = (
+                    Interview.objects.filter(candidate=candidate, job=job, status='scheduled')
+                    .order_by('-created_at')
+                    .first()
+                )
+                if interview is None:
+                    interview = Interview.objects.create(candidate=candidate, job=job, status='scheduled')
+                    interview_created = True
+
+                questions = data.get("questions") or []
+                if questions:
+                    # A scheduled interview has no answers yet, so its questions can be replaced
+                    interview.questions.all().delete()
+                    created = InterviewQuestion.objects.bulk_create([
+                        InterviewQuestion(
+                            interview=interview,
+                            candidate=candidate,
+                            question_text=q["question_text"],
+                            question_type=q["question_type"],
+                            sequence_number=q.get("sequence_number") or idx,
+                        )
+                        for idx, q in enumerate(questions, start=1)
+                    ])
+                    question_ids = [str(q.id) for q in created]
+
+        return Response({
+            "resume_id": str(resume.id),
+            "job_id": str(job.id),
+            "candidate_id": str(candidate.id) if candidate else None,
+            "interview_id": str(interview.id) if interview else None,
+            "question_ids": question_ids,
+            "candidate_created": candidate_created,
+            "interview_created": interview_created,
+        }, status=status.HTTP_201_CREATED)
+
+
 class InterviewQuestionRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
     queryset = InterviewQuestion.objects.all()
     serializer_class = InterviewQuestionSerializer
@@ -152,3 +282,10 @@ class StartInterviewView(APIView):
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+class GeminiClientStatsView(APIView):
+    """Per-model Gemini call counts and latency histograms for this worker (staff only)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(client_stats(), status=status.HTTP_200_OK)
@@ -7,85 +7,176 @@ from datetime import datetime, timedelta
 sys.path.append("/app/code")
 
 # 2. Import your specific functions
-from extractor import extract_all_resumes
-from parser import parse_resume_file  # Sync wrapper in parser.py
+from extractor import extract_pending_resumes
+from blob_utils import LAST_SYNC
+from batch_manifest import write_manifest, chunk_offsets, read_slice, prune_manifests
+from parser import parse_resume_batch  # Sync batch wrapper in parser.py
+from ledger import select_unprocessed, failure_stats, leased, release_owned, set_lease_owner
+from timing import summarize_log, format_summary, prune_logs
 
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from airflow.utils.dates import days_ago
 
 # Env var matches what you used in extractor.py
 RESUME_DIR = os.getenv("LOCAL_RESUME_DIR", "/app/resumes")
 
+# Resumes per mapped parse task, and how many mapped tasks may run at once.
+# Total in-flight resumes = PARSE_PARALLEL_CHUNKS * PARSE_CONCURRENCY.
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", "50"))
+PARSE_PARALLEL_CHUNKS = int(os.getenv("PARSE_PARALLEL_CHUNKS", "4"))
+
 
 # ------------------------------------------------------------
 # TASK 1: EXTRACT
-# Downloads files and passes the LIST OF FILENAMES to XCom
+# Downloads files, writes the pending resumes to a batch manifest on the
+# shared volume and passes only the manifest path through XCom
 # ------------------------------------------------------------
 def task_extract(**context):
     print("====================================================")
     print("[EXTRACT] Starting extraction task...")
 
-    files = extract_all_resumes()
-
-    print(f"[EXTRACT] Extracted {len(files)} files.")
-    print(f"[EXTRACT] File list: {files}")
-
-    context["ti"].xcom_push(key="resume_filenames", value=files)
+    entries = extract_pending_resumes(run_id=context["run_id"])
+    manifest = write_manifest(entries, run_id=context["run_id"])
+    pruned = prune_manifests()
+    pruned_timings = prune_logs()
+
+    print(f"[EXTRACT] Extracted {manifest['count']} files -> {manifest['path']}")
+    if pruned:
+        print(f"[EXTRACT] Pruned {pruned} old manifest(s).")
+    if pruned_timings:
+        print(f"[EXTRACT] Pruned {pruned_timings} old timing log(s).")
+
+    context["ti"].xcom_push(key="manifest_path", value=manifest["path"])
+    context["ti"].xcom_push(key="manifest_count", value=manifest["count"])
+    print(
+        f"[EXTRACT] Blob sync: {len(LAST_SYNC['changed'])} changed | "
+        f"{LAST_SYNC['unchanged']} unchanged | watermark={LAST_SYNC['watermark']}"
+    )
 
-    print("[EXTRACT] Pushed filenames to XCom.")
+    print("[EXTRACT] Pushed manifest path to XCom.")
     print("====================================================")
 
 
 # ------------------------------------------------------------
-# TASK 2: PARSE
-# Pulls filenames, creates full paths, and runs the full LLM + backend flow
+# TASK 2: CHUNK
+# Splits the manifest into PARSE_CHUNK_SIZE slices (byte offset + line
+# count); each slice becomes one mapped "parse" task instance
 # ------------------------------------------------------------
-def task_parse(**context):
-    print("====================================================")
-    print("[PARSE] Starting parse task...")
+def task_chunk(**context):
+    manifest_path = context["ti"].xcom_pull(task_ids="extract", key="manifest_path")
+    if not manifest_path:
+        print("[CHUNK] No manifest from extract; nothing to parse.")
+        return []
 
-    filenames = context["ti"].xcom_pull(task_ids="extract", key="resume_filenames")
+    slices = chunk_offsets(manifest_path, PARSE_CHUNK_SIZE)
+    total = sum(count for _, count in slices)
 
-    if not filenames:
-        print("[PARSE] ⚠️ No files found in XCom. Nothing to process.")
-        return
+    print(f"[CHUNK] {total} file(s) -> {len(slices)} chunk(s) of up to {PARSE_CHUNK_SIZE}")
 
-    success_count = 0
-    fail_count = 0
+    # One op_args list per mapped task instance
+    return [[manifest_path, offset, count] for offset, count in slices]
 
-    for fname in filenames:
-        fpath = os.path.join(RESUME_DIR, fname)
 
-        if not os.path.exists(fpath):
-            print(f"[PARSE] ❌ File missing locally (Check path logic): {fpath}")
-            fail_count += 1
-            continue
+# ------------------------------------------------------------
+# TASK 3: PARSE (mapped, one instance per chunk)
+# Runs the full LLM + backend flow for one chunk inside one event loop
+# (bounded by PARSE_CONCURRENCY) and returns that chunk's counts
+# ------------------------------------------------------------
+def task_parse_chunk(manifest_path, offset, count, **context):
+    print("====================================================")
+    chunk_index = context["ti"].map_index
+    filenames = [entry["name"] for entry in read_slice(manifest_path, offset, count)]
+    print(f"[PARSE] Starting parse chunk {chunk_index} ({len(filenames)} file(s))...")
+
+    filepaths = [os.path.join(RESUME_DIR, fname) for fname in filenames]
+
+    existing = [fp for fp in filepaths if os.path.exists(fp)]
+    missing = [fp for fp in filepaths if not os.path.exists(fp)]  # reported as failures by the batch
+
+    # Leases belong to this chunk across its retries; a timed-out attempt
+    # leaves its in-flight resumes leased, and they are ours to pick up again
+    set_lease_owner(f"{context['run_id']}:parse:{chunk_index}")
+    stale = release_owned()
+    if stale:
+        print(f"[PARSE] Released {stale} lease(s) left by an earlier attempt of this chunk.")
+
+    # On a retry, resumes the ledger already marked done are not repeated;
+    # resumes another task is still working on are reported as in progress
+    pending = select_unprocessed(existing)
+    in_progress = len(leased(existing))
+    already_done = len(existing) - len(pending) - in_progress
+    if already_done:
+        print(f"[PARSE] {already_done} file(s) already processed by an earlier attempt; skipping.")
+    if in_progress:
+        print(f"[PARSE] {in_progress} file(s) being processed by another task; skipping.")
+
+    summary = parse_resume_batch(pending + missing, run_id=context["run_id"])
+    in_progress += summary["in_progress"]
+
+    for fname, reason in summary["failures"].items():
+        print(f"[PARSE] ❌ {fname}: {reason}")
+
+    print("====================================================")
+    print(
+        f"[PARSE] Chunk {chunk_index} Complete. Success: {summary['success']} | "
+        f"Failed: {summary['failed']} | Already done: {already_done} | In progress elsewhere: {in_progress}"
+    )
+    print(
+        f"[PARSE] Parse cache: hits={summary['cache']['hits']} | "
+        f"misses={summary['cache']['misses']} | evicted={summary['cache']['evicted']}"
+    )
+    for path, info in summary["extraction"].items():
+        print(f"[PARSE] Extraction path {path}: {info['count']} file(s), avg {info['avg_seconds']}s")
+    limiter = summary["rate_limiter"]
+    print(
+        f"[PARSE] Gemini limiter: calls={limiter['calls']} | throttled={limiter['throttled']} | "
+        f"queue wait p50={limiter['queue_wait_p50']}s p95={limiter['queue_wait_p95']}s | "
+        f"concurrency limit={limiter['concurrency_limit']}"
+    )
+    timings = summary["timings"]
+    print(f"[PARSE] Throughput: {timings['resumes_per_minute']} resumes/min over {timings['elapsed_seconds']}s")
+    print("====================================================")
 
-        print("--------------------------------------------------")
-        print(f"[PARSE] Processing: {fname}")
+    return {
+        "chunk": chunk_index,
+        "total": len(filenames),
+        "success": summary["success"],
+        "failed": summary["failed"],
+        "already_done": already_done,
+        "in_progress": in_progress,
+        "resumes_per_minute": timings["resumes_per_minute"],
+    }
 
-        try:
-            result = parse_resume_file(fpath)
 
-            if result and result.get("candidate_id"):
-                cid = result.get("candidate_id")
-                q_count = result.get("questions_count", 0)
-                score = result.get("resume_job_score")
-                print(
-                    f"[PARSE] ✅ Success! Candidate ID: {cid} | "
-                    f"resume_job_score: {score} | Questions: {q_count}"
-                )
-                success_count += 1
-            else:
-                print(f"[PARSE] ⚠️ Parsed, but returned incomplete data or no candidate_id.")
-                fail_count += 1
+# ------------------------------------------------------------
+# TASK 4: SUMMARIZE
+# Adds up the counts returned by every parse chunk and reports
+# per-stage p50/p95 for the whole run from its timing log
+# ------------------------------------------------------------
+def task_summarize(**context):
+    chunk_counts = context["ti"].xcom_pull(task_ids="parse") or []
+    chunk_counts = [c for c in chunk_counts if c]
 
-        except Exception as e:
-            print(f"[PARSE] ❌ CRITICAL ERROR parsing {fname}: {e}")
-            fail_count += 1
+    success = sum(c["success"] for c in chunk_counts)
+    failed = sum(c["failed"] for c in chunk_counts)
+    already_done = sum(c["already_done"] for c in chunk_counts)
+    in_progress = sum(c.get("in_progress", 0) for c in chunk_counts)
 
     print("====================================================")
-    print(f"[PARSE] Batch Complete. Success: {success_count} | Failed: {fail_count}")
+    for c in chunk_counts:
+        print(f"[SUMMARY] Chunk {c['chunk']}: Success: {c['success']} | Failed: {c['failed']}")
+    print(
+        f"[SUMMARY] Batch Complete. Chunks: {len(chunk_counts)} | Success: {success} | "
+        f"Failed: {failed} | Already done: {already_done} | In progress elsewhere: {in_progress}"
+    )
+    for line in format_summary(summarize_log(context["run_id"])):
+        print(f"[SUMMARY][TIMING] {line}")
+    queue = failure_stats()
+    print(
+        f"[SUMMARY] Retry queue: {queue['queued']} waiting ({queue['due']} due) | "
+        f"dead letter: {queue['dead_letter']} | by class: {queue['by_class']}"
+    )
     print("====================================================")
 
 
@@ -112,11 +203,27 @@ with DAG(
         python_callable=task_extract,
     )
 
-    parse_task = PythonOperator(
+    chunk_task = PythonOperator(
+        task_id="chunk",
+        python_callable=task_chunk,
+    )
+
+    # One mapped instance per chunk; each retries on its own, and the
+    # ledger makes a retry skip the resumes that already finished
+    parse_task = PythonOperator.partial(
         task_id="parse",
-        python_callable=task_parse,
-        execution_timeout=timedelta(minutes=60),  # Safety limit
+        python_callable=task_parse_chunk,
+        retries=2,
+        retry_exponential_backoff=True,
+        max_active_tis_per_dag=PARSE_PARALLEL_CHUNKS,
+        execution_timeout=timedelta(minutes=30),  # Safety limit per chunk
+    ).expand(op_args=chunk_task.output)
+
+    summarize_task = PythonOperator(
+        task_id="summarize",
+        python_callable=task_summarize,
+        trigger_rule="all_done",  # report even if some chunks failed or there was nothing to map
     )
 
-    # Set Dependency: Extract runs first, then Parse
-    extract_task >> parse_task
+    # Set Dependency: Extract -> Chunk -> Parse (mapped) -> Summarize
+    extract_task >> chunk_task >> parse_task >> summarize_task
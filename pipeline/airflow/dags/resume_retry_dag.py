@@ -0,0 +1,76 @@
+# resume_retry_dag.py
+import os
+import sys
+from datetime import timedelta
+
+# Add the code directory to system path so Airflow can find the modules
+sys.path.append("/app/code")
+
+from retry_queue import run_retry_pass, RETRY_BATCH_LIMIT
+
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from airflow.utils.dates import days_ago
+
+# Same per-process limit as the main parse chunks
+RETRY_CONCURRENCY = int(os.getenv("PIPELINE_RETRY_CONCURRENCY", os.getenv("PARSE_CONCURRENCY", "8")))
+
+# Often enough that the shortest backoff (PIPELINE_RETRY_BASE_SECONDS) is honoured roughly on time
+RETRY_SCHEDULE = os.getenv("PIPELINE_RETRY_SCHEDULE", "*/15 * * * *")
+
+
+# ------------------------------------------------------------
+# TASK: RETRY
+# Re-drives failed resumes whose backoff has elapsed; everything else
+# (queued for later, dead-lettered, done) is left alone
+# ------------------------------------------------------------
+def task_retry(**context):
+    print("====================================================")
+    print(f"[RETRY] Starting retry pass (concurrency={RETRY_CONCURRENCY}, limit={RETRY_BATCH_LIMIT})...")
+
+    summary = run_retry_pass(concurrency=RETRY_CONCURRENCY, run_id=context["run_id"])
+
+    for fname, reason in summary["failures"].items():
+        print(f"[RETRY] ❌ {fname}: {reason}")
+
+    queue = summary["queue"]
+    print("====================================================")
+    print(
+        f"[RETRY] Complete. Due: {summary['due']} | Success: {summary['success']} | "
+        f"Failed: {summary['failed']} | Dead-lettered (missing file): {summary['dead_lettered']}"
+    )
+    print(
+        f"[RETRY] Queue: {queue['queued']} waiting ({queue['due']} due) | "
+        f"dead letter: {queue['dead_letter']} | by class: {queue['by_class']}"
+    )
+    print("====================================================")
+
+    return {
+        "due": summary["due"],
+        "success": summary["success"],
+        "failed": summary["failed"],
+        "queued": queue["queued"],
+        "dead_letter": queue["dead_letter"],
+    }
+
+
+default_args = {
+    "owner": "airflow",
+    "retries": 0,  # backoff is per resume, in the ledger; the next scheduled pass picks up what is due
+}
+
+with DAG(
+    dag_id="resume_retry_pipeline",
+    default_args=default_args,
+    start_date=days_ago(1),
+    schedule_interval=RETRY_SCHEDULE,
+    catchup=False,
+    max_active_runs=1,
+    tags=["hiring", "genai", "retry"],
+) as dag:
+
+    retry_task = PythonOperator(
+        task_id="retry",
+        python_callable=task_retry,
+        execution_timeout=timedelta(minutes=45),
+    )
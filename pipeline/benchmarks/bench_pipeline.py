@@ -0,0 +1,221 @@
+# bench_pipeline.py
+"""
+Offline end-to-end benchmark for the resume parsing pipeline.
+
+    python benchmarks/bench_pipeline.py --resumes 200 --concurrency 1,4,8,16
+
+Runs parse_resumes_async (the batch path used by the DAG) on a synthetic
+resume corpus against a local fake backend and a fake Gemini model, so no
+quota or live backend is involved. For each concurrency level it reports
+resumes/sec, per-stage p50/p95 from the timing spans and peak memory.
+Latency, error rates and payload sizes of both fakes are configurable.
+
+Compare batched against per-file parsing (resumes/sec, parse tokens/resume):
+
+    python benchmarks/bench_pipeline.py --concurrency 8
+    python benchmarks/bench_pipeline.py --concurrency 8 --parse-batch-size 4
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import resource
+import contextlib
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "code"))
+sys.path.insert(0, HERE)
+
+import parser as pipeline_parser  # noqa: E402
+import http_client  # noqa: E402
+import gemini_clients  # noqa: E402
+import ledger  # noqa: E402
+import parse_cache  # noqa: E402
+import timing  # noqa: E402
+from rate_limiter import GEMINI_LIMITER  # noqa: E402
+from shared_quota import SharedQuota  # noqa: E402
+from fakes import FakeBackend, FakeGemini, make_corpus  # noqa: E402
+
+# Stages printed per level (others are still in the --json output)
+REPORT_STAGES = (
+    "total", "llm_parse", "llm_parse_batch", "parse_batch_wait", "llm_queue_wait", "question_generation", "gemini_upload", "file_active_wait",
+    "jd_prefetch", "backend_ingest", "backend_post_candidate", "backend_post_questions", "parse_slot_wait",
+)
+
+
+def _isolate(workdir: str, level: int):
+    """Fresh parse cache, ledger and timing log per level so runs don't share state."""
+    level_dir = os.path.join(workdir, f"c{level}")
+    os.makedirs(level_dir, exist_ok=True)
+    parse_cache.CACHE_DIR = os.path.join(level_dir, "parse_cache")
+    ledger.LEDGER_PATH = os.path.join(level_dir, "ledger.sqlite3")
+    timing.TIMING_LOG_DIR = os.path.join(level_dir, "timings")
+    pipeline_parser.OUTPUT_DIR = level_dir
+    pipeline_parser.FAILED_LOG = os.path.join(level_dir, "failed_logs.jsonl")
+
+    # Own quota window per level (and never the real pipeline's quota file)
+    GEMINI_LIMITER.shared = SharedQuota(os.path.join(level_dir, "gemini_quota.sqlite3"), "gemini")
+
+    # Start every level with the limiter fully open again
+    GEMINI_LIMITER._limit = float(GEMINI_LIMITER.max_concurrency)
+    GEMINI_LIMITER._latency_ewma = None
+
+
+async def run_level(filepaths: list, level: int, backend: FakeBackend, quiet: bool) -> dict:
+    sink = open(os.devnull, "w") if quiet else sys.stdout
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sink):
+            summary = await pipeline_parser.parse_resumes_async(filepaths, concurrency=level, run_id=f"bench-c{level}")
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if quiet:
+            sink.close()
+
+    return {
+        "concurrency": level,
+        "resumes": len(filepaths),
+        "success": summary["success"],
+        "failed": summary["failed"],
+        "seconds": round(elapsed, 3),
+        "resumes_per_sec": round(len(filepaths) / elapsed, 2) if elapsed else 0.0,
+        "peak_traced_mb": round(peak / (1024 * 1024), 1),
+        "limiter": summary["rate_limiter"],
+        "tokens": summary["tokens"],
+        "gemini_clients": summary["gemini_clients"],
+        "parse_batching": summary["parse_batching"],
+        "tokens_per_resume": _tokens_per_resume(summary["tokens"], len(filepaths)),
+        "stages": summary["timings"]["stages"],
+    }
+
+
+def _tokens_per_resume(tokens: dict, resumes: int) -> dict:
+    """Parse-side prompt/output tokens per resume (single + batched calls), the cost driver of batching."""
+    parse = [s for label, s in tokens.items() if label in ("parse", "parse_batch")]
+    return {
+        "prompt": round(sum(s["prompt_tokens"] for s in parse) / resumes, 1) if resumes else 0.0,
+        "output": round(sum(s["output_tokens"] for s in parse) / resumes, 1) if resumes else 0.0,
+    }
+
+
+def print_level(result: dict):
+    print(
+        f"[BENCH] concurrency={result['concurrency']:<3} {result['resumes_per_sec']:7.2f} resumes/s | "
+        f"{result['seconds']:7.2f}s | ok={result['success']} failed={result['failed']} | "
+        f"peak traced {result['peak_traced_mb']} MiB | throttled={result['limiter']['throttled']}"
+    )
+    print(
+        f"          parse tokens/resume: prompt={result['tokens_per_resume']['prompt']} "
+        f"output={result['tokens_per_resume']['output']} | batching={result['parse_batching']}"
+    )
+    for stage in REPORT_STAGES:
+        s = result["stages"].get(stage)
+        if s:
+            print(f"          {stage:<24} p50={s['p50']:.3f}s p95={s['p95']:.3f}s n={s['count']}")
+
+
+async def main_async(args) -> list:
+    rng = random.Random(args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_pipeline_")
+
+    filepaths = make_corpus(
+        os.path.join(workdir, "resumes"), args.resumes, rng,
+        upload_share=args.upload_share,
+        resume_words=args.resume_words,
+        missing_contact_share=args.missing_contact_share,
+    )
+
+    gemini = FakeGemini(
+        latency=args.llm_latency, jitter=args.llm_jitter, throttle_rate=args.llm_throttle_rate,
+        garbage_rate=args.llm_garbage_rate, processing_time=args.file_processing_time,
+        questions=args.questions, seed=args.seed, batch_item_latency=args.llm_batch_item_latency,
+    )
+    gemini.install(pipeline_parser.genai)
+    gemini_clients.reset_clients()
+
+    backend = FakeBackend(
+        jobs=args.jobs, latency=args.backend_latency, jitter=args.backend_jitter,
+        error_rate=args.backend_error_rate, seed=args.seed,
+    )
+    http_client.BASE_URL = await backend.start()
+    http_client.HTTP_BACKOFF = min(http_client.HTTP_BACKOFF, 0.1)
+    GEMINI_LIMITER.rpm = args.rpm
+    GEMINI_LIMITER.base_backoff = min(GEMINI_LIMITER.base_backoff, 0.2)
+
+    print(
+        f"[BENCH] {args.resumes} resumes ({args.upload_share:.0%} via upload) | "
+        f"LLM {args.llm_latency}s±{args.llm_jitter} throttle={args.llm_throttle_rate} | "
+        f"backend {args.backend_latency}s±{args.backend_jitter} errors={args.backend_error_rate} | "
+        f"ingest={pipeline_parser.USE_INGEST_ENDPOINT} | parse batch={args.parse_batch_size} | workdir={workdir}"
+    )
+
+    results = []
+    try:
+        for level in args.concurrency:
+            _isolate(workdir, level)
+            result = await run_level(filepaths, level, backend, quiet=not args.verbose)
+            print_level(result)
+            results.append(result)
+    finally:
+        await http_client.close_session()
+        await backend.stop()
+
+    print(f"[BENCH] fake backend requests: {backend.requests}")
+    print(f"[BENCH] fake Gemini calls: {gemini.calls}")
+    print(f"[BENCH] process max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4, 8, 16],
+                        help="comma-separated PARSE_CONCURRENCY levels")
+    parser.add_argument("--jobs", type=int, default=10, help="distinct jobs on the fake backend")
+    parser.add_argument("--upload-share", type=float, default=0.1, help="share of resumes with no local text")
+    parser.add_argument("--missing-contact-share", type=float, default=0.05)
+    parser.add_argument("--resume-words", type=int, default=300, help="filler words per resume (payload size)")
+    parser.add_argument("--questions", type=int, default=8, help="questions returned per candidate")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--llm-jitter", type=float, default=0.3)
+    parser.add_argument("--llm-throttle-rate", type=float, default=0.02)
+    parser.add_argument("--llm-garbage-rate", type=float, default=0.01)
+    parser.add_argument("--file-processing-time", type=float, default=2.0)
+    parser.add_argument("--llm-batch-item-latency", type=float, default=0.3,
+                        help="extra LLM latency per additional resume in a batched parse, as a share of --llm-latency")
+    parser.add_argument("--rpm", type=int, default=0, help="Gemini requests/min budget (0 = unlimited)")
+    parser.add_argument("--backend-latency", type=float, default=0.05)
+    parser.add_argument("--backend-jitter", type=float, default=0.02)
+    parser.add_argument("--backend-error-rate", type=float, default=0.01)
+    parser.add_argument("--stepwise", action="store_true", help="use one request per entity instead of ingest")
+    parser.add_argument("--parse-batch-size", type=int, default=0,
+                        help="resumes per batched parse request (0 = one request per resume)")
+    parser.add_argument("--parse-batch-wait", type=float, default=None, help="default PARSE_BATCH_MAX_WAIT")
+    parser.add_argument("--workdir", help="keep corpus, caches and timing logs here")
+    parser.add_argument("--json", help="write per-level results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own logging")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.stepwise:
+        pipeline_parser.USE_INGEST_ENDPOINT = False
+    pipeline_parser.configure_parse_batching(args.parse_batch_size, args.parse_batch_wait)
+
+    results = asyncio.run(main_async(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[BENCH] wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_scoring.py
+"""
+Throughput benchmark for the vectorised resume-vs-job scoring engine.
+
+    python benchmarks/bench_scoring.py --resumes 10000 --jobs 100
+
+Builds a synthetic skill vocabulary, resumes and job descriptions, then
+times vectorisation, the all-pairs score matrix and the paired
+(one job per resume) pass.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
+
+from scoring import SEED_SKILLS, SkillVocabulary, idf_weights, score_matrix, score_pairs  # noqa: E402
+
+FILLER = (
+    "we are looking for an engineer to join our team and build reliable services "
+    "with strong ownership communication and a focus on quality"
+).split()
+
+
+def make_skills(n_terms: int) -> list:
+    extra = [f"skill{i}" for i in range(max(0, n_terms - len(SEED_SKILLS)))]
+    return SEED_SKILLS + extra
+
+
+def make_resumes(skills: list, n: int, rng: random.Random) -> list:
+    return [rng.sample(skills, rng.randint(5, 25)) for _ in range(n)]
+
+
+def make_jds(skills: list, n: int, rng: random.Random) -> list:
+    jds = []
+    for _ in range(n):
+        words = rng.sample(skills, rng.randint(5, 15)) + rng.choices(FILLER, k=150)
+        rng.shuffle(words)
+        jds.append(" ".join(words))
+    return jds
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--vocab", type=int, default=2000, help="distinct skill terms")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = make_skills(args.vocab)
+    resume_skills = make_resumes(skills, args.resumes, rng)
+    jds = make_jds(skills, args.jobs, rng)
+
+    print(f"[BENCH] {args.resumes} resumes x {args.jobs} jobs, vocab={len(skills)}")
+
+    vocab, _ = timed("build vocabulary", lambda: SkillVocabulary.build(skills))
+    # Fixed weights, as production loads them from SCORE_WEIGHTS_FILE
+    vocab, _ = timed("idf weights (one-off)", lambda: SkillVocabulary.build(skills, weights=idf_weights(vocab, jds)))
+    resumes, t_res = timed("vectorise resumes", lambda: vocab.resume_matrix(resume_skills))
+    jobs, t_jobs = timed("vectorise JDs", lambda: vocab.jd_matrix(jds))
+
+    matrix, t_matrix = timed("score all pairs", lambda: score_matrix(resumes, jobs, vocab.weights))
+    job_index = [rng.randrange(args.jobs) for _ in range(args.resumes)]
+    _, t_pairs = timed("score paired", lambda: score_pairs(resumes, jobs, job_index, vocab.weights))
+
+    n_pairs = matrix.size
+    print(f"[BENCH] all-pairs throughput : {n_pairs / t_matrix:,.0f} pairs/s ({n_pairs:,} pairs)")
+    print(f"[BENCH] paired throughput    : {args.resumes / t_pairs:,.0f} resumes/s")
+    print(f"[BENCH] end-to-end (incl. vectorising): {n_pairs / (t_res + t_jobs + t_matrix):,.0f} pairs/s")
+    print(f"[BENCH] mean score={matrix.mean():.3f} max={matrix.max():.3f}")
+
+
+if __name__ == "__main__":
+    main()
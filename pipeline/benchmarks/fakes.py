@@ -0,0 +1,325 @@
+# fakes.py
+"""
+Offline stand-ins for the two external services the parser talks to:
+
+- FakeBackend: a local aiohttp server implementing the backend endpoints
+  parser.py calls (bulk/single job-info, resume PATCH, candidate,
+  interview, question bulk and ingest).
+- FakeGemini: replaces google.generativeai's GenerativeModel, upload_file
+  and get_file with latency-, error- and payload-configurable fakes.
+
+Plus make_corpus() to write a synthetic resume folder. Used by
+bench_pipeline.py; nothing here touches the network or Gemini quota.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import uuid
+import types
+import random
+import asyncio
+from aiohttp import web
+from google.api_core import exceptions as google_exceptions
+
+from scoring import SEED_SKILLS
+
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Dana", "Eli", "Fatima", "Goran", "Hana", "Ivan", "Jia"]
+LAST_NAMES = ["Ng", "Okafor", "Patel", "Quinn", "Rossi", "Silva", "Tanaka", "Usman", "Varga", "Weber"]
+FILLER = (
+    "delivered reliable services owned features end to end mentored engineers "
+    "improved latency reduced costs collaborated with product and design"
+).split()
+
+
+def _sleep_for(latency: float, jitter: float, rng: random.Random) -> float:
+    return max(0.0, latency + rng.uniform(-jitter, jitter))
+
+
+# -----------------------------------------------------
+# Synthetic corpus
+# -----------------------------------------------------
+
+def make_corpus(directory: str, n: int, rng: random.Random, upload_share: float = 0.0,
+                resume_words: int = 300, missing_contact_share: float = 0.0) -> list:
+    """
+    Writes `n` synthetic .txt resumes named <uuid>.txt and returns their paths.
+    `upload_share` of them have no text, which sends them down the Gemini
+    upload path; `missing_contact_share` have no email.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(n):
+        resume_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        path = os.path.join(directory, f"{resume_id}.txt")
+
+        if rng.random() < upload_share:
+            # Whitespace only: no usable text, but a distinct content hash (and parse-cache key)
+            text = " " * (i + 1)
+        else:
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email = "" if rng.random() < missing_contact_share else f"{first}.{last}{i}@example.com".lower()
+            skills = rng.sample(SEED_SKILLS, rng.randint(4, 12))
+            body = " ".join(rng.choices(FILLER, k=resume_words))
+            text = (
+                f"Name: {first} {last}\nEmail: {email}\nPhone: +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}\n"
+                f"Skills: {', '.join(skills)}\n\nExperience\n{body}\n"
+            )
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+
+# -----------------------------------------------------
+# Fake backend
+# -----------------------------------------------------
+
+class FakeBackend:
+    """
+    Local HTTP stand-in for the Django backend.
+    Every request sleeps `latency` +/- `jitter` seconds and fails with a
+    503 (retried by http_client) with probability `error_rate`.
+    """
+
+    def __init__(self, jobs: int = 10, latency: float = 0.05, jitter: float = 0.02,
+                 error_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.jobs = {}
+        for _ in range(max(1, jobs)):
+            job_id = str(uuid.UUID(int=self.rng.getrandbits(128)))
+            skills = self.rng.sample(SEED_SKILLS, self.rng.randint(5, 12))
+            self.jobs[job_id] = "We are hiring an engineer. Requirements: " + ", ".join(skills) + ". " + " ".join(
+                self.rng.choices(FILLER, k=120)
+            )
+        self.requests = {}
+        self.candidates = {}
+        self._runner = None
+        self.base_url = None
+
+    def job_for(self, resume_id: str) -> str:
+        job_ids = sorted(self.jobs)
+        return job_ids[zlib.crc32(resume_id.encode()) % len(job_ids)]
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] = self.requests.get(route, 0) + 1
+        await asyncio.sleep(_sleep_for(self.latency, self.jitter, self.rng))
+        if self.rng.random() < self.error_rate:
+            return web.json_response({"detail": "fake outage"}, status=503)
+        return await handler(request)
+
+    async def _job_info_bulk(self, request):
+        body = await request.json()
+        results = [
+            {"resume_id": rid, "job_id": self.job_for(rid), "job_description": self.jobs[self.job_for(rid)]}
+            for rid in body.get("resume_ids") or []
+        ]
+        return web.json_response({"results": results, "missing": []})
+
+    async def _job_info(self, request):
+        rid = request.match_info["resume_id"]
+        job_id = self.job_for(rid)
+        return web.json_response({"resume_id": rid, "job_id": job_id, "job_description": self.jobs[job_id]})
+
+    async def _patch_resume(self, request):
+        return web.json_response({"id": request.match_info["resume_id"], **(await request.json())})
+
+    async def _candidate(self, request):
+        body = await request.json()
+        candidate_id = self.candidates.setdefault(body.get("email"), str(uuid.uuid4()))
+        return web.json_response({"id": candidate_id}, status=201)
+
+    async def _interview(self, request):
+        return web.json_response({"id": str(uuid.uuid4())}, status=201)
+
+    async def _questions(self, request):
+        body = await request.json()
+        ids = [str(uuid.uuid4()) for _ in body.get("questions") or []]
+        return web.json_response({"interview_id": body.get("interview_id"), "created": len(ids), "question_ids": ids}, status=201)
+
+    async def _ingest(self, request):
+        rid = request.match_info["resume_id"]
+        body = await request.json()
+        candidate = body.get("candidate")
+        candidate_id = self.candidates.setdefault(candidate["email"], str(uuid.uuid4())) if candidate else None
+        return web.json_response({
+            "resume_id": rid,
+            "job_id": body.get("job_id") or self.job_for(rid),
+            "candidate_id": candidate_id,
+            "interview_id": str(uuid.uuid4()) if candidate_id else None,
+            "question_ids": [str(uuid.uuid4()) for _ in body.get("questions") or []],
+            "candidate_created": True,
+            "interview_created": bool(candidate_id),
+        }, status=201)
+
+    async def start(self) -> str:
+        app = web.Application(middlewares=[self._middleware], client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/api/candidates/resumes/job-info", self._job_info_bulk)
+        app.router.add_get("/api/candidates/resumes/{resume_id}/job-info", self._job_info)
+        app.router.add_patch("/api/candidates/resume/{resume_id}", self._patch_resume)
+        app.router.add_post("/api/candidates", self._candidate)
+        app.router.add_post("/api/interviews", self._interview)
+        app.router.add_post("/api/interviews/candidates/{candidate_id}/questions/bulk", self._questions)
+        app.router.add_post("/api/interviews/resumes/{resume_id}/ingest", self._ingest)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# -----------------------------------------------------
+# Fake Gemini
+# -----------------------------------------------------
+
+_FIELD_RE = {
+    "name": re.compile(r"^Name:\s*(\S+)\s+(\S+)", re.M),
+    "email": re.compile(r"^Email:\s*(\S+)", re.M),
+    "phone": re.compile(r"^Phone:\s*(.+)$", re.M),
+    "skills": re.compile(r"^Skills:\s*(.+)$", re.M),
+}
+
+
+class FakeGemini:
+    """
+    Stands in for google.generativeai. Each generate call sleeps `latency`
+    +/- `jitter` seconds; `throttle_rate` of calls raise ResourceExhausted
+    (retried by the rate limiter) and `garbage_rate` return invalid JSON.
+    Uploaded files stay PROCESSING for `processing_time` seconds.
+    A batched parse request takes `batch_item_latency` x `latency` longer
+    per extra resume, and each of its items is left out with `garbage_rate`.
+    """
+
+    def __init__(self, latency: float = 1.0, jitter: float = 0.3, throttle_rate: float = 0.0,
+                 garbage_rate: float = 0.0, processing_time: float = 2.0, questions: int = 8, seed: int = 7,
+                 batch_item_latency: float = 0.3):
+        self.latency = latency
+        self.batch_item_latency = batch_item_latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.garbage_rate = garbage_rate
+        self.processing_time = processing_time
+        self.questions = questions
+        self.rng = random.Random(seed)
+        self.calls = {"parse": 0, "parse_batch": 0, "questions": 0, "throttled": 0, "garbage": 0, "uploads": 0}
+        self._uploads = {}
+
+    def install(self, genai_module):
+        """Swaps the fake into the imported google.generativeai module."""
+        fake = self
+
+        class FakeModel:
+            def __init__(self, model_name=None, generation_config=None, **kwargs):
+                self.model_name = model_name
+
+            async def generate_content_async(self, contents, safety_settings=None, **kwargs):
+                return await fake.generate(contents)
+
+            async def count_tokens_async(self, contents, **kwargs):
+                return types.SimpleNamespace(total_tokens=len(str(contents)) // 4)
+
+        genai_module.GenerativeModel = FakeModel
+        genai_module.upload_file = self.upload_file
+        genai_module.get_file = self.get_file
+        genai_module.configure = lambda **kwargs: None
+
+    # Files API -------------------------------------------------------
+
+    def _file(self, name: str, ready_at: float):
+        state = "ACTIVE" if time.monotonic() >= ready_at else "PROCESSING"
+        return types.SimpleNamespace(name=name, state=types.SimpleNamespace(name=state))
+
+    def upload_file(self, path, **kwargs):
+        time.sleep(_sleep_for(self.latency / 4, self.jitter / 4, self.rng))
+        name = f"files/{os.path.splitext(os.path.basename(path))[0]}"
+        self._uploads[name] = time.monotonic() + self.processing_time
+        self.calls["uploads"] += 1
+        return self._file(name, self._uploads[name])
+
+    def get_file(self, name, **kwargs):
+        return self._file(name, self._uploads.get(name, 0.0))
+
+    # Generation ------------------------------------------------------
+
+    async def generate(self, contents):
+        is_parse = isinstance(contents, list)
+        batch = [c for c in contents[1:] if isinstance(c, str) and c.startswith("===== RESUME ")] if is_parse else []
+        self.calls["parse_batch" if batch else "parse" if is_parse else "questions"] += 1
+        extra = self.batch_item_latency * self.latency * max(0, len(batch) - 1)
+        await asyncio.sleep(_sleep_for(self.latency, self.jitter, self.rng) + extra)
+
+        if self.rng.random() < self.throttle_rate:
+            self.calls["throttled"] += 1
+            raise google_exceptions.ResourceExhausted("fake quota exceeded")
+
+        if self.rng.random() < self.garbage_rate:
+            self.calls["garbage"] += 1
+            return types.SimpleNamespace(text="Sorry, I cannot help with that.", usage_metadata=None)
+
+        if batch:
+            payload = {"resumes": {}}
+            for part in batch:
+                header, _, text = part.partition("\n")
+                if self.rng.random() < self.garbage_rate:
+                    self.calls["garbage"] += 1
+                    continue
+                resume_id = header.strip("= ").split(" ", 1)[1]
+                payload["resumes"][resume_id] = self._parse_payload([None, text])
+        elif is_parse:
+            payload = self._parse_payload(contents)
+        else:
+            payload = self._questions_payload()
+        return types.SimpleNamespace(text=json.dumps(payload), usage_metadata=None)
+
+    def _parse_payload(self, contents) -> dict:
+        text = next((c for c in contents[1:] if isinstance(c, str)), "")
+        name = _FIELD_RE["name"].search(text)
+        email = _FIELD_RE["email"].search(text)
+        phone = _FIELD_RE["phone"].search(text)
+        skills = _FIELD_RE["skills"].search(text)
+
+        if not text:
+            # Uploaded file: no text to read back, so invent a plausible profile
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            return {
+                "first_name": first, "last_name": last,
+                "email": f"{first}.{last}{self.rng.randint(0, 10 ** 6)}@example.com".lower(),
+                "phone_number": "+1 555 123 4567",
+                "skills": self.rng.sample(SEED_SKILLS, 6),
+                "experience": [], "education": [], "summary": "Uploaded resume.",
+            }
+
+        return {
+            "first_name": name.group(1) if name else None,
+            "last_name": name.group(2) if name else None,
+            "email": email.group(1) if email else None,
+            "phone_number": phone.group(1).strip() if phone else None,
+            "skills": [s.strip() for s in skills.group(1).split(",")] if skills else [],
+            "experience": [{"title": "Engineer", "company": "Example Corp", "description": text[-400:]}],
+            "education": [],
+            "summary": text[:200],
+        }
+
+    def _questions_payload(self) -> dict:
+        kinds = ["technical", "behavioral", "experience"]
+        return {
+            "interview_questions": [
+                {"sequence_number": i, "question_type": kinds[i % len(kinds)], "question": f"Synthetic question {i}?"}
+                for i in range(1, self.questions + 1)
+            ]
+        }
@@ -0,0 +1,97 @@
+# batch_manifest.py
+import os
+import json
+import time
+from itertools import islice
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Written by the extract task, read by the chunk and parse tasks (shared volume)
+BATCH_MANIFEST_DIR = os.getenv("BATCH_MANIFEST_DIR", "/app/output/batches")
+BATCH_MANIFEST_MAX_AGE = float(os.getenv("BATCH_MANIFEST_MAX_AGE_DAYS", "7")) * 24 * 3600
+
+
+def _safe_name(run_id: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in run_id or "manual")
+
+
+def write_manifest(entries: list, run_id: str = None) -> dict:
+    """
+    Writes one JSONL line per resume to be processed:
+        {"name", "resume_id", "size", "sha256"}
+    `entries` are (filepath, content_hash, size) tuples from
+    ledger.pending_entries. Written to a temp file and renamed, so a
+    reader never sees a partial manifest. Returns {"path", "count"}.
+    """
+    os.makedirs(BATCH_MANIFEST_DIR, exist_ok=True)
+    path = os.path.join(BATCH_MANIFEST_DIR, f"{_safe_name(run_id)}.jsonl")
+    tmp_path = f"{path}.tmp"
+
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for filepath, content_hash, size in entries:
+            name = os.path.basename(filepath)
+            line = {
+                "name": name,
+                "resume_id": os.path.splitext(name)[0],
+                "size": size,
+                "sha256": content_hash,
+            }
+            f.write(json.dumps(line, separators=(",", ":")) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+
+    print(f"[MANIFEST] Wrote {count} entr{'y' if count == 1 else 'ies'} -> {path}")
+    return {"path": path, "count": count}
+
+
+def chunk_offsets(path: str, chunk_size: int) -> list:
+    """
+    Splits the manifest into slices of up to `chunk_size` lines without
+    parsing them. Returns [(byte_offset, line_count), ...], one per slice.
+    """
+    chunk_size = max(1, chunk_size)
+    slices = []
+    with open(path, "rb") as f:
+        offset = 0
+        start, count = 0, 0
+        for line in f:
+            if count == 0:
+                start = offset
+            count += 1
+            offset += len(line)
+            if count == chunk_size:
+                slices.append((start, count))
+                count = 0
+        if count:
+            slices.append((start, count))
+    return slices
+
+
+def read_slice(path: str, offset: int = 0, count: int = None):
+    """Yields the manifest entries of one slice, reading only that part of the file."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in islice(f, count):
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def prune_manifests(max_age: float = None) -> int:
+    """Deletes manifests older than BATCH_MANIFEST_MAX_AGE_DAYS. Returns how many."""
+    if not os.path.isdir(BATCH_MANIFEST_DIR):
+        return 0
+
+    cutoff = time.time() - (max_age if max_age is not None else BATCH_MANIFEST_MAX_AGE)
+    removed = 0
+    for name in os.listdir(BATCH_MANIFEST_DIR):
+        path = os.path.join(BATCH_MANIFEST_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            print(f"[MANIFEST] ⚠️ Could not prune {path}: {e}")
+    return removed
@@ -1,7 +1,11 @@
 # blob_utils.py
 import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from azure.storage.blob import BlobServiceClient
 from dotenv import load_dotenv
+import timing
 
 load_dotenv()
 
@@ -10,11 +14,120 @@ CONTAINER_NAME = os.getenv("AZURE_BLOB_CONTAINER")
 BLOB_PREFIX = os.getenv("AZURE_BLOB_PREFIX", "resumes/")
 LOCAL_DOWNLOAD_PATH = os.getenv("LOCAL_RESUME_DIR", "/app/resumes")
 
+BLOB_DOWNLOAD_WORKERS = int(os.getenv("BLOB_DOWNLOAD_WORKERS", "8"))  # blobs downloaded in parallel
+BLOB_MAX_CONCURRENCY = int(os.getenv("BLOB_MAX_CONCURRENCY", "2"))    # ranged GETs per blob (SDK)
+BLOB_CHUNK_SIZE = int(os.getenv("BLOB_CHUNK_MB", "4")) * 1024 * 1024  # bytes per ranged GET
 
-def download_resumes_from_blob():
+# Persistent record of what was last synced: blob name -> etag / last_modified / size
+MANIFEST_PATH = os.getenv("BLOB_MANIFEST_PATH", "/app/output/blob_manifest.json")
+
+# Outcome of the most recent sync, read by the DAG after extraction
+LAST_SYNC = {"changed": [], "unchanged": 0, "removed": 0, "watermark": None}
+
+_container_client = None
+
+
+def get_container_client():
+    """
+    Returns the container client shared by the whole run.
+    The underlying BlobServiceClient keeps one connection pool for all downloads.
+    """
+    global _container_client
+
+    if _container_client is None:
+        print(f"[BLOB] Connecting to Azure Blob Storage...")
+        blob_service = BlobServiceClient.from_connection_string(
+            CONNECTION_STRING,
+            max_single_get_size=BLOB_CHUNK_SIZE,
+            max_chunk_get_size=BLOB_CHUNK_SIZE,
+        )
+        _container_client = blob_service.get_container_client(CONTAINER_NAME)
+
+    return _container_client
+
+
+def load_manifest() -> dict:
+    """Returns {"watermark": iso-str or None, "blobs": {name: {...}}}."""
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"watermark": None, "blobs": {}}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[BLOB] ⚠️ Manifest unreadable ({e}); doing a full comparison this run.")
+        return {"watermark": None, "blobs": {}}
+
+    manifest.setdefault("watermark", None)
+    manifest.setdefault("blobs", {})
+    return manifest
+
+
+def save_manifest(manifest: dict):
+    """Writes the manifest atomically (temp file + rename)."""
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = f"{MANIFEST_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _manifest_entry(blob) -> dict:
+    return {
+        "etag": blob.etag,
+        "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
+        "size": blob.size,
+    }
+
+
+def _is_unchanged(blob, entry: dict, local_path: str) -> bool:
+    """
+    True when the manifest has the blob's current etag and the local copy
+    is still there with the blob's size. A local file that was deleted or
+    never finished downloading is fetched again.
+    """
+    if not entry or entry.get("etag") != blob.etag:
+        return False
+    return os.path.exists(local_path) and os.path.getsize(local_path) == blob.size
+
+
+def _download_one(container_client, blob, local_path: str, on_downloaded=None):
+    """
+    Streams one blob into a temp file next to `local_path`, then atomically
+    renames it into place so readers never see a half-written resume.
+    If given, `on_downloaded(local_path)` is then called from the worker
+    thread; a blocking callback holds the worker back (backpressure).
+    Returns (bytes_written, seconds) where seconds excludes the callback.
+    """
+    start = time.perf_counter()
+    tmp_path = f"{local_path}.part"
+
+    try:
+        with open(tmp_path, "wb") as file:
+            downloader = container_client.download_blob(blob, max_concurrency=BLOB_MAX_CONCURRENCY)
+            size = downloader.readinto(file)
+        os.replace(tmp_path, local_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    seconds = time.perf_counter() - start
+    if on_downloaded is not None:
+        on_downloaded(local_path)
+    return size, seconds
+
+
+def download_resumes_from_blob(on_downloaded=None):
     """
     Downloads blobs inside the `resumes/` folder.
-    Maintains folder structure locally and skips existing files.
+    Maintains folder structure locally and only downloads blobs that are
+    new or whose etag/size changed since the last sync (per the manifest).
+    Up to BLOB_DOWNLOAD_WORKERS blobs are streamed to disk concurrently.
+    `on_downloaded(local_path)` is called as each file lands (see _download_one);
+    if it raises, that blob counts as failed and is retried next sync.
+
+    Returns the number of blobs downloaded; the changed paths (relative
+    to the prefix) are kept in LAST_SYNC for the DAG.
     """
 
     if not CONNECTION_STRING:
@@ -26,17 +139,26 @@ def download_resumes_from_blob():
     # Ensure base directory exists
     os.makedirs(LOCAL_DOWNLOAD_PATH, exist_ok=True)
 
-    print(f"[BLOB] Connecting to Azure Blob Storage...")
     try:
-        blob_service = BlobServiceClient.from_connection_string(CONNECTION_STRING)
-        container_client = blob_service.get_container_client(CONTAINER_NAME)
+        container_client = get_container_client()
     except Exception as e:
         print(f"[BLOB] Connection failed: {e}")
         return 0
 
-    print(f"[BLOB] Listing blobs inside prefix '{BLOB_PREFIX}' ...")
+    manifest = load_manifest()
+    watermark = manifest["watermark"]
+    previous = manifest["blobs"]
+    current = {}
+    newest = watermark
 
-    count = 0
+    # Azure's list API has no server-side modified-since filter, so every
+    # run still lists the prefix; the watermark records how far the last
+    # complete sync got.
+    print(f"[BLOB] Listing blobs inside prefix '{BLOB_PREFIX}' (watermark={watermark}) ...")
+
+    pending = []
+    unchanged = 0
+    list_start = time.perf_counter()
     blobs = container_client.list_blobs(name_starts_with=BLOB_PREFIX)
 
     for blob in blobs:
@@ -57,20 +179,68 @@ def download_resumes_from_blob():
         if not os.path.exists(local_dir):
             os.makedirs(local_dir, exist_ok=True)
 
-        # 4. Skip if file exists (Incremental Download)
-        if os.path.exists(local_path):
-            # Optional: You could compare blob.size with local file size to check for updates
-            print(f"[BLOB] Skipping existing -> {relative_path}")
+        # 4. Skip if unchanged since the last sync (Incremental Download)
+        entry = previous.get(blob.name)
+        if _is_unchanged(blob, entry, local_path):
+            current[blob.name] = entry
+            unchanged += 1
             continue
 
-        print(f"[BLOB] Downloading -> {relative_path}")
-
-        try:
-            with open(local_path, "wb") as file:
-                file.write(container_client.download_blob(blob).readall())
-            count += 1
-        except Exception as e:
-            print(f"[ERROR] Failed to download {blob.name}: {e}")
-
-    print(f"[BLOB] Download complete: {count} new file(s).")
-    return count
+        pending.append((blob, relative_path, local_path))
+
+    timing.observe("blob_list", time.perf_counter() - list_start)
+
+    removed = len(set(previous) - set(current) - {blob.name for blob, _, _ in pending})
+    print(f"[BLOB] {len(pending)} new/changed, {unchanged} unchanged, {removed} removed since last sync.")
+
+    changed = []
+    print(f"[BLOB] Downloading {len(pending)} blob(s) with {BLOB_DOWNLOAD_WORKERS} worker(s)...")
+
+    total_bytes = 0
+    latencies = []
+    run_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, BLOB_DOWNLOAD_WORKERS)) as pool:
+        futures = {
+            pool.submit(_download_one, container_client, blob, local_path, on_downloaded): (blob, relative_path)
+            for blob, relative_path, local_path in pending
+        }
+
+        for future in as_completed(futures):
+            blob, relative_path = futures[future]
+            try:
+                size, seconds = future.result()
+            except Exception as e:
+                print(f"[ERROR] Failed to download {blob.name}: {e}")
+                continue
+
+            current[blob.name] = _manifest_entry(blob)
+            changed.append(relative_path)
+            total_bytes += size
+            latencies.append(seconds)
+            timing.observe("blob_download", seconds)
+            print(f"[BLOB] Downloaded -> {relative_path} ({size} bytes in {seconds:.2f}s)")
+
+            modified = current[blob.name]["last_modified"]
+            if modified and (newest is None or modified > newest):
+                newest = modified
+
+    elapsed = time.perf_counter() - run_start
+    throughput = total_bytes / elapsed if elapsed > 0 else 0.0
+    avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
+
+    print(f"[BLOB] Download complete: {len(changed)} new/changed file(s).")
+    if latencies:
+        print(
+            f"[BLOB] {total_bytes} bytes in {elapsed:.2f}s ({throughput / 1024:.1f} KiB/s) | "
+            f"avg latency {avg_latency:.2f}s | max latency {max(latencies):.2f}s"
+        )
+
+    # Failed downloads stay out of the manifest so the next run retries them.
+    # Only advance the watermark when everything listed is in sync.
+    if len(changed) < len(pending):
+        newest = watermark
+    save_manifest({"watermark": newest, "blobs": current})
+
+    LAST_SYNC.update(changed=changed, unchanged=unchanged, removed=removed, watermark=newest)
+    return len(changed)
@@ -1,30 +1,59 @@
 # extractor.py
 import os
 from dotenv import load_dotenv
+import timing
 from blob_utils import download_resumes_from_blob
+from ledger import pending_entries
 
 load_dotenv()
 
 RESUME_DIR = os.getenv("LOCAL_RESUME_DIR", "/app/resumes")
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
 
 
-def extract_all_resumes() -> list:
-    """
-    Downloads resumes from Azure Blob and returns a list of filenames.
-    No text extraction. Raw files only.
-    """
-    print("[EXTRACTOR] Downloading resumes from Azure Blob...")
-    download_resumes_from_blob()
+def is_resume_file(path: str) -> bool:
+    return path.lower().endswith(RESUME_EXTENSIONS)
+
 
+def list_resume_files() -> list:
+    """Filenames of the resumes currently in RESUME_DIR."""
     if not os.path.exists(RESUME_DIR):
         print("[EXTRACTOR] Resume directory does not exist:", RESUME_DIR)
         return []
 
-    files = [
+    return [
         f for f in os.listdir(RESUME_DIR)
-        if os.path.isfile(os.path.join(RESUME_DIR, f))
-        and f.lower().endswith((".pdf", ".docx", ".txt"))
+        if os.path.isfile(os.path.join(RESUME_DIR, f)) and is_resume_file(f)
     ]
 
-    print("[EXTRACTOR] Downloaded files:", files)
-    return files
+
+def extract_pending_resumes(run_id: str = None) -> list:
+    """
+    Downloads resumes from Azure Blob and returns (filepath, content_hash, size)
+    for every resume that still needs processing (new, changed or not yet
+    completed per the ledger). No text extraction. Raw files only.
+    Stage timings are written to the timing log tagged with `run_id`.
+    """
+    timing.start_run(run_id)
+
+    print("[EXTRACTOR] Downloading resumes from Azure Blob...")
+    with timing.span("blob_sync"):
+        downloaded = download_resumes_from_blob()
+
+    files = list_resume_files()
+    print(f"[EXTRACTOR] {len(files)} resume file(s) on disk ({downloaded} new/changed this sync).")
+
+    with timing.span("ledger_select"):
+        pending = pending_entries([os.path.join(RESUME_DIR, f) for f in files])
+
+    timing.stage_record("extract")
+    for line in timing.format_summary(timing.summary())[1:]:
+        print(f"[TIMING] {line}")
+
+    print(f"[EXTRACTOR] {len(pending)} file(s) pending processing.")
+    return pending
+
+
+def extract_all_resumes(run_id: str = None) -> list:
+    """Same as extract_pending_resumes, returning just the filenames."""
+    return [os.path.basename(filepath) for filepath, _, _ in extract_pending_resumes(run_id)]
@@ -0,0 +1,157 @@
+# gemini_clients.py
+"""
+Process-wide Gemini model clients.
+
+Each role (parse, questions) is registered once with its model name and
+generation config; the GenerativeModel is built on first use (or by
+warmup) and reused by every call in the process. genai.configure also
+runs once, on first use instead of at import time.
+
+generate_async() times every call, so stats() can report per-model call
+counts, errors and a latency histogram next to the limiter stats.
+"""
+import os
+import time
+import asyncio
+import bisect
+import threading
+from collections import deque
+from dotenv import load_dotenv
+import google.generativeai as genai
+
+load_dotenv()
+
+# Warm up with a count_tokens request so the first real call skips connection/auth setup
+GEMINI_WARMUP_CALL = os.getenv("GEMINI_WARMUP_CALL", "true").lower() in ("1", "true", "yes")
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 60.0)
+
+_lock = threading.Lock()
+_configured = False
+_specs = {}      # role -> (model_name, generation_config)
+_clients = {}    # role -> GenerativeModel
+STATS = {}       # role -> {"calls", "errors", "seconds", "buckets", "samples"}
+
+
+def configure():
+    """Runs genai.configure once per process (also needed by the Files API)."""
+    global _configured
+    with _lock:
+        if not _configured:
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _configured = True
+
+
+def register(role: str, model_name: str, generation_config: dict = None):
+    """Declares a model role; nothing is built until get() or warmup()."""
+    with _lock:
+        if _specs.get(role) != (model_name, generation_config):
+            _specs[role] = (model_name, generation_config)
+            _clients.pop(role, None)
+
+
+def get(role: str):
+    """The shared GenerativeModel for `role`, built on first use."""
+    client = _clients.get(role)
+    if client is not None:
+        return client
+
+    configure()
+    with _lock:
+        if role not in _clients:
+            model_name, generation_config = _specs[role]
+            _clients[role] = genai.GenerativeModel(model_name, generation_config=generation_config)
+            print(f"[GEMINI] Built '{role}' client ({model_name})")
+        return _clients[role]
+
+
+def reset_clients():
+    """Drops built clients (e.g. after swapping genai.GenerativeModel in tests/benchmarks)."""
+    with _lock:
+        _clients.clear()
+
+
+# -----------------------------------------------------
+# Calls and stats
+# -----------------------------------------------------
+
+def _observe(role: str, seconds: float, error: bool):
+    with _lock:
+        s = STATS.setdefault(role, {
+            "calls": 0, "errors": 0, "seconds": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            "samples": deque(maxlen=10000),
+        })
+        s["calls"] += 1
+        s["errors"] += int(error)
+        s["seconds"] += seconds
+        s["buckets"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        s["samples"].append(seconds)
+
+
+async def generate_async(role: str, contents, **kwargs):
+    """generate_content_async on the shared `role` client, timed per attempt."""
+    model = get(role)
+    start = time.perf_counter()
+    error = True
+    try:
+        response = await model.generate_content_async(contents, **kwargs)
+        error = False
+        return response
+    finally:
+        _observe(role, time.perf_counter() - start, error)
+
+
+def reset_stats():
+    with _lock:
+        STATS.clear()
+
+
+def stats() -> dict:
+    """Per role: calls, errors, avg/p50/p95 seconds and the latency histogram."""
+    labels = [f"<={b:g}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+    out = {}
+    with _lock:
+        for role, s in STATS.items():
+            samples = sorted(s["samples"])
+
+            def pct(p):
+                return round(samples[min(len(samples) - 1, int(p * len(samples)))], 3) if samples else 0.0
+
+            out[role] = {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "avg_seconds": round(s["seconds"] / s["calls"], 3) if s["calls"] else 0.0,
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "histogram": {label: n for label, n in zip(labels, s["buckets"]) if n},
+            }
+    return out
+
+
+# -----------------------------------------------------
+# Warmup
+# -----------------------------------------------------
+
+async def warmup_async(roles: list = None, call: bool = None):
+    """
+    Builds every registered client (or `roles`) before the first resume.
+    With `call` (GEMINI_WARMUP_CALL by default) each model also sends a
+    count_tokens request, which is free and opens the connection. Warmup
+    failures are printed and otherwise ignored.
+    """
+    roles = roles or list(_specs)
+    call = GEMINI_WARMUP_CALL if call is None else call
+    start = time.perf_counter()
+
+    async def _warm(role: str):
+        try:
+            model = get(role)
+            if call and hasattr(model, "count_tokens_async"):
+                await model.count_tokens_async("ping")
+        except Exception as e:
+            print(f"[GEMINI] ⚠️ Warmup of '{role}' failed: {e}")
+
+    await asyncio.gather(*(_warm(role) for role in roles))
+    print(f"[GEMINI] Warmed up {roles} in {time.perf_counter() - start:.2f}s")
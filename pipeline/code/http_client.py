@@ -0,0 +1,134 @@
+# http_client.py
+import os
+import json
+import random
+import asyncio
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from constants import NGROK
+
+# -----------------------------
+# Global config
+# -----------------------------
+BASE_URL = NGROK.rstrip("/")  # centralize base URL
+
+HTTP_LIMIT = int(os.getenv("BACKEND_HTTP_LIMIT", "64"))                   # total pooled connections
+HTTP_LIMIT_PER_HOST = int(os.getenv("BACKEND_HTTP_LIMIT_PER_HOST", "16"))  # per-host cap
+HTTP_KEEPALIVE = float(os.getenv("BACKEND_HTTP_KEEPALIVE", "30"))         # seconds idle before close
+HTTP_TIMEOUT = float(os.getenv("BACKEND_HTTP_TIMEOUT", "20"))             # total seconds per attempt
+HTTP_CONNECT_TIMEOUT = float(os.getenv("BACKEND_HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("BACKEND_HTTP_RETRIES", "3"))                # extra attempts after the first
+HTTP_BACKOFF = float(os.getenv("BACKEND_HTTP_BACKOFF", "0.5"))            # base backoff in seconds
+
+# Status codes worth retrying (throttling / transient gateway errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods safe to resend after the server may have acted on them
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+_session = None
+_session_loop = None
+
+
+# -----------------------------------------------------
+# Session lifecycle
+# -----------------------------------------------------
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Returns the shared keep-alive session for the running event loop.
+    A new session is created lazily the first time it is needed, or when
+    the previous one belongs to a loop that has since been closed.
+    """
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_LIMIT,
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _session_loop = loop
+        print(
+            f"[HTTP] Opened pooled session (limit={HTTP_LIMIT}, "
+            f"per_host={HTTP_LIMIT_PER_HOST}, timeout={HTTP_TIMEOUT}s)"
+        )
+    return _session
+
+
+async def close_session():
+    """Closes the shared session. Call once at the end of every event loop."""
+    global _session, _session_loop
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+        print("[HTTP] Closed pooled session")
+    _session = None
+    _session_loop = None
+
+
+# -----------------------------------------------------
+# Requests
+# -----------------------------------------------------
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, HTTP_BACKOFF * (2 ** attempt))
+
+
+async def request(method: str, path: str, retry: bool = None, **kwargs):
+    """
+    Sends a request to the backend through the shared session.
+
+    `path` is either an absolute URL or a path relative to BASE_URL.
+    With `retry` (default: only for IDEMPOTENT_METHODS), timeouts, client
+    errors and RETRY_STATUSES are retried with exponential backoff up to
+    HTTP_RETRIES times. Without it, only failures that prove the request
+    was not processed are retried: connection errors before anything was
+    sent, and 429. A POST that timed out after the backend committed must
+    not be resent, or it creates a duplicate candidate/interview.
+
+    Returns (status_code, body) where body is the decoded JSON payload,
+    or the raw text if the response is not JSON. Raises the last error
+    if every attempt failed before a response was received.
+    """
+    url = path if path.startswith("http") else f"{BASE_URL}/{path.lstrip('/')}"
+    session = get_session()
+    if retry is None:
+        retry = method.upper() in IDEMPOTENT_METHODS
+    retry_statuses = RETRY_STATUSES if retry else {429}
+    retry_errors = (aiohttp.ClientError, asyncio.TimeoutError) if retry else (aiohttp.ClientConnectorError,)
+
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            async with session.request(method, url, **kwargs) as res:
+                status = res.status
+                text = await res.text()
+        except retry_errors as e:
+            if attempt >= HTTP_RETRIES:
+                raise
+            delay = _backoff_delay(attempt)
+            print(f"[HTTP] {method} {url} failed ({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        try:
+            body = json.loads(text) if text else None
+        except json.JSONDecodeError:
+            body = text
+
+        if status in retry_statuses and attempt < HTTP_RETRIES:
+            # The response is released above, so the pooled connection is free while we wait
+            delay = _backoff_delay(attempt)
+            print(f"[HTTP] {method} {url} -> {status}; retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        return status, body
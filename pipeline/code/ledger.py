@@ -0,0 +1,484 @@
+# ledger.py
+import os
+import json
+import time
+import socket
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from parse_cache import file_sha256
+
+load_dotenv()
+
+OUTPUT_DIR = "/app/output"
+LEDGER_PATH = os.getenv("PIPELINE_LEDGER_PATH", os.path.join(OUTPUT_DIR, "pipeline_ledger.sqlite3"))
+
+# Pipeline states recorded per resume
+STATE_COMPLETED = "completed"  # candidate created end-to-end
+STATE_SKIPPED = "skipped"      # parsed, but nothing more to do for this content (no JD / no contact details)
+STATE_FAILED = "failed"        # errored; re-driven by the retry queue with backoff
+STATE_DEAD_LETTER = "dead_letter"  # gave up: permanent error or PIPELINE_RETRY_MAX_ATTEMPTS reached
+STATE_RUNNING = "running"      # leased by another process (never stored in resumes.state)
+
+# Content that reached one of these states is not re-emitted until it changes
+DONE_STATES = (STATE_COMPLETED, STATE_SKIPPED)
+
+# Error classes stored with each failure
+ERROR_LLM = "llm"                        # Gemini call failed or returned unusable JSON
+ERROR_NO_JOB = "no_job_description"      # backend had no job/JD for the resume yet
+ERROR_BACKEND = "backend"                # candidate/interview could not be stored
+ERROR_MISSING_FILE = "missing_file"      # resume no longer on local disk
+ERROR_UNHANDLED = "unhandled"            # unexpected exception in the pipeline
+
+# Classes worth re-driving; anything else goes straight to the dead letter state
+RETRYABLE_ERRORS = (ERROR_LLM, ERROR_NO_JOB, ERROR_BACKEND, ERROR_UNHANDLED)
+
+# Retry queue: attempt n waits RETRY_BASE_SECONDS * 2^(n-1), capped at RETRY_MAX_DELAY_SECONDS
+RETRY_MAX_ATTEMPTS = int(os.getenv("PIPELINE_RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("PIPELINE_RETRY_BASE_SECONDS", "300"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("PIPELINE_RETRY_MAX_DELAY_SECONDS", str(6 * 3600)))
+
+# A resume being processed is leased to one process until it is recorded, so the
+# daily chunks, the streaming DAG and the retry DAG never drive it twice at once.
+# The lease expires (a killed worker does not hold it forever); checkpoint saves extend it.
+LEASE_SECONDS = float(os.getenv("PIPELINE_LEASE_SECONDS", "1800"))
+LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id    TEXT PRIMARY KEY,
+    filename     TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size         INTEGER,
+    mtime        REAL,
+    state        TEXT NOT NULL,
+    error        TEXT,
+    updated_at   TEXT NOT NULL
+)
+"""
+
+# Step outputs saved while a resume is in flight (parsed_data, job_id,
+# resume_job_score, questions, candidate_id, interview_id, ...), so a rerun
+# of the same content resumes after the last completed step.
+_CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    resume_id    TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    size         INTEGER,
+    mtime        REAL,
+    data         TEXT NOT NULL,
+    updated_at   TEXT NOT NULL
+)
+"""
+
+# One row per resume whose current content failed; the retry queue reads
+# it and dead_letter marks the ones it gave up on.
+_FAILURE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS failures (
+    resume_id       TEXT PRIMARY KEY,
+    filename        TEXT NOT NULL,
+    content_hash    TEXT NOT NULL,
+    error_class     TEXT NOT NULL,
+    error           TEXT,
+    attempts        INTEGER NOT NULL,
+    next_retry_at   REAL,
+    dead_letter     INTEGER NOT NULL DEFAULT 0,
+    first_failed_at TEXT NOT NULL,
+    updated_at      TEXT NOT NULL
+)
+"""
+
+
+# One row per resume currently being processed (see claim / record)
+_LEASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    resume_id  TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    claimed_at TEXT NOT NULL
+)
+"""
+
+
+@contextmanager
+def _connect():
+    """Opens the ledger, commits on success and always closes the connection."""
+    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+    conn = sqlite3.connect(LEDGER_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        conn.execute(_CHECKPOINT_SCHEMA)
+        conn.execute(_FAILURE_SCHEMA)
+        conn.execute(_LEASE_SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _resume_id(filepath: str) -> str:
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def _content_hash(row, filepath: str):
+    """
+    Returns (hash, size, mtime) for the file. The stored hash is reused when
+    size and mtime are unchanged, so unchanged files are not re-read every run.
+    """
+    st = os.stat(filepath)
+    if row is not None and row["size"] == st.st_size and row["mtime"] == st.st_mtime:
+        return row["content_hash"], st.st_size, st.st_mtime
+    return file_sha256(filepath), st.st_size, st.st_mtime
+
+
+def pending_entries(filepaths: list, hash_new: bool = True) -> list:
+    """
+    Like select_unprocessed, but returns (filepath, content_hash, size)
+    for each pending resume so callers can reuse the hash. With
+    hash_new=False, resumes the ledger has never seen are returned as
+    (filepath, None, None) without being read.
+    """
+    selected = []
+    with _connect() as conn:
+        leased = _leased_ids(conn)
+        for filepath in filepaths:
+            if _resume_id(filepath) in leased:
+                continue  # being processed right now; its outcome decides what happens next
+
+            row = conn.execute(
+                """
+                SELECT r.*, f.content_hash AS failure_hash
+                FROM resumes r LEFT JOIN failures f ON f.resume_id = r.resume_id
+                WHERE r.resume_id = ?
+                """,
+                (_resume_id(filepath),),
+            ).fetchone()
+
+            if row is None and not hash_new:
+                selected.append((filepath, None, None))
+                continue
+
+            try:
+                content_hash, size, _ = _content_hash(row, filepath)
+            except OSError as e:
+                print(f"[LEDGER] ⚠️ Could not stat {filepath}: {e}")
+                continue
+
+            if row is None or content_hash != row["content_hash"]:
+                selected.append((filepath, content_hash, size))
+            elif row["state"] not in DONE_STATES and row["failure_hash"] != content_hash:
+                # Failures of this content belong to the retry queue (or the dead letter state)
+                selected.append((filepath, content_hash, size))
+    return selected
+
+
+def select_unprocessed(filepaths: list) -> list:
+    """
+    Filters `filepaths` down to resumes that are new, changed since they
+    were last processed, or not yet in a done state. Failed content that
+    is queued for retry or dead-lettered is left to the retry queue, and
+    resumes leased by a running task are left to that task.
+    """
+    return [filepath for filepath, _, _ in pending_entries(filepaths, hash_new=False)]
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)), RETRY_MAX_DELAY_SECONDS)
+
+
+def _record_failure(conn, resume_id: str, filename: str, content_hash: str, error_class: str, error: str) -> str:
+    """
+    Upserts the failure row and schedules the next attempt. Attempts restart
+    when the content changed. Returns the state to record: STATE_FAILED, or
+    STATE_DEAD_LETTER for non-retryable classes and exhausted attempts.
+    """
+    error_class = error_class or ERROR_UNHANDLED
+    previous = conn.execute(
+        "SELECT content_hash, attempts, first_failed_at FROM failures WHERE resume_id = ?", (resume_id,)
+    ).fetchone()
+
+    now = datetime.now(timezone.utc).isoformat()
+    if previous is not None and previous["content_hash"] == content_hash:
+        attempts, first_failed_at = previous["attempts"] + 1, previous["first_failed_at"]
+    else:
+        attempts, first_failed_at = 1, now
+
+    dead = error_class not in RETRYABLE_ERRORS or attempts >= RETRY_MAX_ATTEMPTS
+    next_retry_at = None if dead else time.time() + _retry_delay(attempts)
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO failures
+            (resume_id, filename, content_hash, error_class, error, attempts,
+             next_retry_at, dead_letter, first_failed_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (resume_id, filename, content_hash, error_class, error, attempts,
+         next_retry_at, int(dead), first_failed_at, now),
+    )
+
+    if dead:
+        print(f"[LEDGER] ☠️ {resume_id} dead-lettered after {attempts} attempt(s) ({error_class}): {error}")
+        return STATE_DEAD_LETTER
+    print(f"[LEDGER] {resume_id} queued for retry #{attempts} in {_retry_delay(attempts):.0f}s ({error_class})")
+    return STATE_FAILED
+
+
+def record(filepath: str, state: str, error: str = None, error_class: str = None):
+    """
+    Records the pipeline state reached by this resume's current content
+    and releases its lease. A STATE_FAILED record also queues the resume
+    for retry (classified by `error_class`) or dead-letters it.
+    """
+    resume_id = _resume_id(filepath)
+    try:
+        with _connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # attempts are read-modify-write; the retry DAG may run alongside
+            row = conn.execute("SELECT * FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+            content_hash, size, mtime = _content_hash(row, filepath)
+            if state in (STATE_FAILED, STATE_DEAD_LETTER):
+                state = _record_failure(
+                    conn, resume_id, os.path.basename(filepath), content_hash, error_class, error
+                )
+            conn.execute(
+                """
+                INSERT INTO resumes (resume_id, filename, content_hash, size, mtime, state, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(resume_id) DO UPDATE SET
+                    filename = excluded.filename,
+                    content_hash = excluded.content_hash,
+                    size = excluded.size,
+                    mtime = excluded.mtime,
+                    state = excluded.state,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    resume_id,
+                    os.path.basename(filepath),
+                    content_hash,
+                    size,
+                    mtime,
+                    state,
+                    error,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+            conn.execute("DELETE FROM leases WHERE resume_id = ? AND owner = ?", (resume_id, LEASE_OWNER))
+            if state in DONE_STATES:
+                # Nothing left to resume or retry for this content
+                conn.execute("DELETE FROM checkpoints WHERE resume_id = ?", (resume_id,))
+                conn.execute("DELETE FROM failures WHERE resume_id = ?", (resume_id,))
+    except (OSError, sqlite3.Error) as e:
+        print(f"[LEDGER] ⚠️ Failed to record state '{state}' for {resume_id}: {e}")
+
+
+# -----------------------------------------------------
+# In-progress leases
+# -----------------------------------------------------
+
+def _leased_ids(conn) -> set:
+    rows = conn.execute("SELECT resume_id FROM leases WHERE expires_at > ?", (time.time(),))
+    return {row["resume_id"] for row in rows}
+
+
+def set_lease_owner(owner: str):
+    """
+    Leases taken from now on belong to `owner` instead of host:pid, e.g. one
+    Airflow task instance, so a retry of that task can recognise its own leases.
+    """
+    global LEASE_OWNER
+    LEASE_OWNER = owner
+
+
+def release_owned() -> int:
+    """
+    Drops every lease held by LEASE_OWNER, e.g. the ones a killed earlier
+    attempt of the same task left behind. Returns how many.
+    """
+    try:
+        with _connect() as conn:
+            return conn.execute("DELETE FROM leases WHERE owner = ?", (LEASE_OWNER,)).rowcount
+    except (OSError, sqlite3.Error) as e:
+        print(f"[LEDGER] ⚠️ Could not release leases of {LEASE_OWNER}: {e}")
+        return 0
+
+
+def leased(filepaths: list) -> list:
+    """The `filepaths` another task currently holds an unexpired lease on."""
+    with _connect() as conn:
+        ids = _leased_ids(conn)
+    return [filepath for filepath in filepaths if _resume_id(filepath) in ids]
+
+
+def claim(filepath: str) -> bool:
+    """
+    Leases the resume to this process for LEASE_SECONDS. Returns False if
+    another task holds an unexpired lease on it. If the ledger itself
+    fails the resume is processed anyway, as before leases existed.
+    """
+    resume_id = _resume_id(filepath)
+    now = time.time()
+    try:
+        with _connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # check and take the lease atomically across processes
+            row = conn.execute(
+                "SELECT owner, expires_at FROM leases WHERE resume_id = ?", (resume_id,)
+            ).fetchone()
+            if row is not None and row["expires_at"] > now:
+                print(f"[LEDGER] {resume_id} is already being processed by {row['owner']}; skipping.")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO leases (resume_id, owner, expires_at, claimed_at) VALUES (?, ?, ?, ?)",
+                (resume_id, LEASE_OWNER, now + LEASE_SECONDS, datetime.now(timezone.utc).isoformat()),
+            )
+            return True
+    except (OSError, sqlite3.Error) as e:
+        print(f"[LEDGER] ⚠️ Could not lease {resume_id}: {e}")
+        return True
+
+
+def release(filepath: str):
+    """Drops the lease without recording a state (record() releases it otherwise)."""
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE resume_id = ? AND owner = ?", (_resume_id(filepath), LEASE_OWNER)
+            )
+    except (OSError, sqlite3.Error) as e:
+        print(f"[LEDGER] ⚠️ Could not release lease for {_resume_id(filepath)}: {e}")
+
+
+# -----------------------------------------------------
+# Retry queue
+# -----------------------------------------------------
+
+def due_failures(limit: int = None) -> list:
+    """
+    Retryable failures whose backoff has elapsed, oldest first, as dicts
+    with filename, error_class, error and attempts. Resumes leased by a
+    running task are skipped.
+    """
+    query = """
+        SELECT resume_id, filename, error_class, error, attempts, next_retry_at
+        FROM failures
+        WHERE dead_letter = 0 AND next_retry_at <= ?
+          AND resume_id NOT IN (SELECT resume_id FROM leases WHERE expires_at > ?)
+        ORDER BY next_retry_at
+    """
+    now = time.time()
+    params = [now, now]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    with _connect() as conn:
+        return [dict(row) for row in conn.execute(query, params)]
+
+
+def dead_letter(resume_id: str, error_class: str, error: str):
+    """Gives up on a queued resume without another attempt (e.g. the file is gone)."""
+    now = datetime.now(timezone.utc).isoformat()
+    with _connect() as conn:
+        conn.execute(
+            """
+            UPDATE failures
+            SET dead_letter = 1, next_retry_at = NULL, error_class = ?, error = ?, updated_at = ?
+            WHERE resume_id = ?
+            """,
+            (error_class, error, now, resume_id),
+        )
+        conn.execute(
+            "UPDATE resumes SET state = ?, error = ?, updated_at = ? WHERE resume_id = ?",
+            (STATE_DEAD_LETTER, error, now, resume_id),
+        )
+    print(f"[LEDGER] ☠️ {resume_id} dead-lettered ({error_class}): {error}")
+
+
+def failure_stats() -> dict:
+    """Queue size, due now and dead-lettered counts, plus queued failures per error class."""
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT error_class, dead_letter, COUNT(*) AS n, SUM(next_retry_at <= ?) AS due
+            FROM failures GROUP BY error_class, dead_letter
+            """,
+            (time.time(),),
+        ).fetchall()
+
+    stats = {"queued": 0, "due": 0, "dead_letter": 0, "by_class": {}}
+    for row in rows:
+        if row["dead_letter"]:
+            stats["dead_letter"] += row["n"]
+            continue
+        stats["queued"] += row["n"]
+        stats["due"] += row["due"] or 0
+        stats["by_class"][row["error_class"]] = row["n"]
+    return stats
+
+
+# -----------------------------------------------------
+# Step checkpoints
+# -----------------------------------------------------
+
+def _current_checkpoint(conn, filepath: str):
+    """Returns (data, content_hash, size, mtime); data is {} when missing or stale."""
+    row = conn.execute(
+        "SELECT * FROM checkpoints WHERE resume_id = ?", (_resume_id(filepath),)
+    ).fetchone()
+    content_hash, size, mtime = _content_hash(row, filepath)
+    if row is None or row["content_hash"] != content_hash:
+        return {}, content_hash, size, mtime
+    return json.loads(row["data"]), content_hash, size, mtime
+
+
+def load_checkpoint(filepath: str) -> dict:
+    """Step outputs saved for this resume's current content ({} if none)."""
+    try:
+        with _connect() as conn:
+            data, _, _, _ = _current_checkpoint(conn, filepath)
+            return data
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"[LEDGER] ⚠️ Could not load checkpoint for {_resume_id(filepath)}: {e}")
+        return {}
+
+
+def save_checkpoint(filepath: str, **fields):
+    """Merges `fields` into the resume's checkpoint; a stale one is replaced."""
+    resume_id = _resume_id(filepath)
+    try:
+        with _connect() as conn:
+            # Write lock before reading, so concurrent saves for the same
+            # resume merge instead of overwriting each other's fields
+            conn.execute("BEGIN IMMEDIATE")
+            data, content_hash, size, mtime = _current_checkpoint(conn, filepath)
+            data.update(fields)
+            # Progress: keep the lease of the task saving this checkpoint alive
+            conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE resume_id = ? AND owner = ?",
+                (time.time() + LEASE_SECONDS, resume_id, LEASE_OWNER),
+            )
+            conn.execute(
+                """
+                INSERT INTO checkpoints (resume_id, content_hash, size, mtime, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(resume_id) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    size = excluded.size,
+                    mtime = excluded.mtime,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    resume_id,
+                    content_hash,
+                    size,
+                    mtime,
+                    json.dumps(data, ensure_ascii=False),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+    except (OSError, sqlite3.Error, ValueError, TypeError) as e:
+        print(f"[LEDGER] ⚠️ Could not save checkpoint {sorted(fields)} for {resume_id}: {e}")
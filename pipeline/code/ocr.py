@@ -1,11 +1,88 @@
+# ocr.py
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 
-def run_ocr_on_pdf(pdf_path):
-    pages = convert_from_path(pdf_path)
-    text = ""
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_PAGE_TIMEOUT = float(os.getenv("OCR_PAGE_TIMEOUT", "30"))      # seconds per page (render and OCR each)
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_PAGE_WINDOW = int(os.getenv("OCR_PAGE_WINDOW", "2"))           # pages rendered per worker task
 
-    for page in pages:
-        text += pytesseract.image_to_string(page)
+_pool = None
+_pool_lock = threading.Lock()
 
-    return text
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    One process pool shared by every OCR call in this process, so concurrent
+    resumes queue for the same OCR_MAX_WORKERS instead of each spawning their own.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # Tesseract is itself multi-threaded; one thread per worker avoids oversubscription
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+            _pool = ProcessPoolExecutor(max_workers=max(1, OCR_MAX_WORKERS))
+        return _pool
+
+
+def _ocr_window(pdf_path: str, first_page: int, last_page: int, dpi: int, timeout: float) -> str:
+    """Renders pages [first_page, last_page] and OCRs them. Runs inside a worker process."""
+    try:
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            timeout=timeout,
+        )
+    except Exception as e:
+        print(f"[OCR] ⚠️ Failed to render pages {first_page}-{last_page} of {pdf_path}: {e}")
+        return ""
+
+    parts = []
+    for offset, image in enumerate(images):
+        try:
+            parts.append(pytesseract.image_to_string(image, timeout=timeout))
+        except RuntimeError as e:
+            # pytesseract raises RuntimeError when the timeout kills tesseract
+            print(f"[OCR] ⚠️ Page {first_page + offset} of {pdf_path} timed out: {e}")
+        finally:
+            image.close()
+
+    return "".join(parts)
+
+
+def run_ocr_on_pdf(pdf_path, dpi=None, page_timeout=None, max_pages=None):
+    """
+    OCRs a scanned PDF without rendering the whole document at once.
+    Pages are rendered in windows of OCR_PAGE_WINDOW inside the worker
+    processes, so peak memory is bounded by OCR_MAX_WORKERS windows. Text
+    is returned in page order.
+    """
+    dpi = dpi or OCR_DPI
+    timeout = page_timeout or OCR_PAGE_TIMEOUT
+
+    page_count = pdfinfo_from_path(pdf_path, timeout=timeout)["Pages"]
+    if max_pages:
+        page_count = min(page_count, max_pages)
+
+    window = max(1, OCR_PAGE_WINDOW)
+    starts = list(range(1, page_count + 1, window))
+    ends = [min(start + window - 1, page_count) for start in starts]
+
+    print(f"[OCR] {os.path.basename(pdf_path)}: {page_count} page(s), dpi={dpi}, windows={len(starts)}")
+
+    pool = _get_pool()
+    results = pool.map(
+        _ocr_window,
+        [pdf_path] * len(starts),
+        starts,
+        ends,
+        [dpi] * len(starts),
+        [timeout] * len(starts),
+    )
+    return "".join(results)
@@ -0,0 +1,87 @@
+# parse_batcher.py
+import time
+import asyncio
+
+import timing
+
+
+class ParseBatcher:
+    """
+    Coalesces concurrent single-item requests into batched calls.
+
+    Each `submit(key, payload)` waits until `size` items are pending or
+    `max_wait` seconds have passed since the first one, then the whole
+    batch goes to `call(items)` (items = [(key, payload), ...]), which
+    returns {key: result}. Every submitter gets its own result, or None
+    if the batch call failed or left its item out; callers fall back to
+    their single-item path on None.
+
+    Batches only fill up to the number of callers in flight, so `size`
+    should not exceed the parse concurrency; `max_wait` bounds the delay
+    when fewer items arrive.
+    """
+
+    def __init__(self, call, size: int, max_wait: float, name: str = "batch"):
+        self.call = call
+        self.size = max(1, size)
+        self.max_wait = max(0.0, max_wait)
+        self.name = name
+        self._pending = []     # (key, payload, future) waiting for the next flush
+        self._timer = None
+        self._tasks = set()    # running batch calls (keeps them referenced until done)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self._stats = {"batches": 0, "items": 0, "returned": 0, "failed_batches": 0}
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["avg_batch_size"] = round(s["items"] / s["batches"], 2) if s["batches"] else 0.0
+        s["item_success_rate"] = round(s["returned"] / s["items"], 3) if s["items"] else 0.0
+        return s
+
+    async def submit(self, key: str, payload):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, payload, future))
+        queued_at = time.perf_counter()
+
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        try:
+            return await future
+        finally:
+            timing.observe(f"{self.name}_wait", time.perf_counter() - queued_at)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            task = asyncio.get_running_loop().create_task(self._run(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: list):
+        # Shared by several resumes, so spans here count for the run, not the flushing resume
+        timing.detach()
+        self._stats["batches"] += 1
+        self._stats["items"] += len(items)
+        results = {}
+        try:
+            results = await self.call([(key, payload) for key, payload, _ in items]) or {}
+        except Exception as e:
+            print(f"[BATCH] ⚠️ {self.name} call with {len(items)} item(s) failed: {e}")
+            self._stats["failed_batches"] += 1
+        finally:
+            # Always resolve, so no submitter waits forever (even if this task is cancelled)
+            for key, _, future in items:
+                result = results.get(key)
+                if result is not None:
+                    self._stats["returned"] += 1
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,145 @@
+# parse_cache.py
+import os
+import json
+import time
+import hashlib
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OUTPUT_DIR = "/app/output"
+CACHE_DIR = os.path.join(OUTPUT_DIR, "parse_cache")
+
+CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_MB", "512")) * 1024 * 1024
+CACHE_MAX_AGE = float(os.getenv("PARSE_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+
+# Per-run counters, surfaced in the batch summary
+STATS = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+
+def file_sha256(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """Streams the file through SHA-256 and returns the hex digest."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(filepath: str, version: str, content_hash: str = None) -> str:
+    """
+    Content-addressed key: SHA-256 of the file bytes combined with the
+    prompt/model version, so a prompt or model change never reuses stale output.
+    Pass `content_hash` to build keys for several versions without rehashing.
+    """
+    content_hash = content_hash or file_sha256(filepath)
+    return hashlib.sha256(f"{content_hash}:{version}".encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _read(key: str):
+    path = _entry_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_MAX_AGE:
+            os.remove(path)
+            STATS["evicted"] += 1
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def get(key: str):
+    """Returns the cached parsed JSON for `key`, or None on a miss."""
+    return get_any([key])
+
+
+def get_any(keys: list):
+    """Returns the entry of the first key that is cached (one hit or one miss in the stats)."""
+    if not CACHE_ENABLED:
+        return None
+
+    for key in keys:
+        data = _read(key)
+        if data is not None:
+            STATS["hits"] += 1
+            return data
+
+    STATS["misses"] += 1
+    return None
+
+
+def put(key: str, data: dict):
+    """Stores parsed JSON for `key`. Written to a temp file then renamed, so readers never see partial entries."""
+    if not CACHE_ENABLED:
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        STATS["writes"] += 1
+    except OSError as e:
+        print(f"[CACHE] ⚠️ Failed to write cache entry {key}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def evict() -> int:
+    """
+    Removes entries older than PARSE_CACHE_MAX_AGE_DAYS, then the oldest
+    entries until the cache fits in PARSE_CACHE_MAX_MB. Returns the number removed.
+    """
+    if not CACHE_ENABLED or not os.path.isdir(CACHE_DIR):
+        return 0
+
+    now = time.time()
+    entries = []
+    removed = 0
+
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+
+        if now - st.st_mtime > CACHE_MAX_AGE:
+            os.remove(path)
+            removed += 1
+        else:
+            entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+
+    STATS["evicted"] += removed
+    if removed:
+        print(f"[CACHE] Evicted {removed} cache entries; cache size now {total / (1024 * 1024):.1f} MB")
+    return removed
+
+
+def reset_stats():
+    for k in STATS:
+        STATS[k] = 0
+
+
+def stats() -> dict:
+    return dict(STATS)
@@ -1,8 +1,10 @@
 # parser.py
 import os
 import json
+import time
 import asyncio
-import requests
+import uuid
+import hashlib
 import traceback
 from dotenv import load_dotenv
 import google.generativeai as genai
@@ -10,19 +12,55 @@ from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 load_dotenv()
 
-from constants import NGROK
+import gemini_clients
+import ledger
+import parse_cache
+import scoring
+import text_extraction
+import timing
+import token_budget
+from parse_batcher import ParseBatcher
+from http_client import request, close_session
+from rate_limiter import GEMINI_LIMITER, estimate_tokens
 
 # -----------------------------
 # Global config
 # -----------------------------
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-BASE_URL = NGROK.rstrip("/")  # centralize base URL
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
 OUTPUT_DIR = "/app/output"
-FAILED_LOG = os.path.join(OUTPUT_DIR, "failed_logs.txt")
+FAILED_LOG = os.path.join(OUTPUT_DIR, "failed_logs.jsonl")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Max number of resumes processed at the same time by the batch controller
+PARSE_CONCURRENCY = int(os.getenv("PARSE_CONCURRENCY", "8"))
+
+# Store each resume with one transactional ingest request instead of one request per entity
+USE_INGEST_ENDPOINT = os.getenv("PIPELINE_USE_INGEST", "true").lower() in ("1", "true", "yes")
+
+# Resume IDs per bulk job-info request
+JOB_INFO_BATCH_SIZE = int(os.getenv("JOB_INFO_BATCH_SIZE", "500"))
+
+# Batched parse mode: pack up to PARSE_BATCH_SIZE short text resumes into one
+# Gemini request (0 or 1 = one request per resume). Keep it <= PARSE_CONCURRENCY.
+PARSE_BATCH_SIZE = int(os.getenv("PARSE_BATCH_SIZE", "0"))
+PARSE_BATCH_MAX_WAIT = float(os.getenv("PARSE_BATCH_MAX_WAIT", "0.5"))    # seconds to wait for a batch to fill
+PARSE_BATCH_MAX_CHARS = int(os.getenv("PARSE_BATCH_MAX_CHARS", "8000"))  # longer resumes are parsed alone
+
+# Resumes that need a Gemini file upload within this window are uploaded
+# together and awaited until ACTIVE as one batch
+UPLOAD_BATCH_MAX_WAIT = float(os.getenv("UPLOAD_BATCH_MAX_WAIT", "0.2"))
+
+# In-process JD caches for the current run (filled by prefetch_job_details)
+_RESUME_JOBS = {}       # resume_id -> job_id
+_JOB_DESCRIPTIONS = {}  # job_id -> job_description
+_NO_JOB = set()         # resume_ids the bulk lookup reported without a linked job
+
+# Gemini file readiness polling: exponential backoff capped at FILE_POLL_MAX, bounded by FILE_ACTIVE_DEADLINE
+FILE_POLL_INITIAL = float(os.getenv("GEMINI_FILE_POLL_INITIAL", "0.5"))
+FILE_POLL_MAX = float(os.getenv("GEMINI_FILE_POLL_MAX", "8"))
+FILE_ACTIVE_DEADLINE = float(os.getenv("GEMINI_FILE_ACTIVE_DEADLINE", "180"))
+
 # -----------------------------------------------------
 # 🛡️ SAFETY SETTINGS
 # -----------------------------------------------------
@@ -41,6 +79,14 @@ JSON_CONFIG = {
     "temperature": 0.0,  # Deterministic output
 }
 
+# One shared client per role for the whole process (built on first use)
+gemini_clients.register("parse", GEMINI_MODEL, JSON_CONFIG)
+gemini_clients.register("questions", GEMINI_MODEL, JSON_CONFIG)
+gemini_clients.register("parse_batch", GEMINI_MODEL, JSON_CONFIG)
+
+# Must match InterviewQuestion.question_type choices in the backend
+QUESTION_TYPES = {"technical", "behavioral", "experience", "other"}
+
 # -----------------------------------------------------
 # PROMPTS
 # -----------------------------------------------------
@@ -69,6 +115,20 @@ RULES:
 - Do NOT include any scoring or fit fields.
 """
 
+SYSTEM_INSTRUCTIONS_PARSE_BATCH = SYSTEM_INSTRUCTIONS_PARSE + """
+BATCH MODE:
+You will receive several resumes. Each one starts with a line "===== RESUME <resume_id> =====".
+Parse every resume independently; never mix information between resumes.
+Return ONLY one JSON object of this form, with exactly one entry per resume_id given:
+{
+  "resumes": {
+    "<resume_id>": { ...object with the schema above... }
+  }
+}
+"""
+
+PARSE_FIELDS = ("first_name", "last_name", "email", "phone_number", "skills", "summary", "experience", "education")
+
 SYSTEM_INSTRUCTIONS_QUESTIONS = """
 You are a Senior Technical Interviewer. 
 Based on the Candidate's Resume and the Job Description below, generate a set of interview questions.
@@ -97,6 +157,15 @@ RULES:
 - Tailor questions to the candidate's skills and experience seniority.
 """
 
+# Parse cache entries are only reused for the same model + parse prompt;
+# results of the batch prompt are cached under their own version
+PARSE_CACHE_VERSION = hashlib.sha256(
+    f"{GEMINI_MODEL}:{SYSTEM_INSTRUCTIONS_PARSE}".encode("utf-8")
+).hexdigest()[:16]
+PARSE_BATCH_CACHE_VERSION = hashlib.sha256(
+    f"{GEMINI_MODEL}:{SYSTEM_INSTRUCTIONS_PARSE_BATCH}".encode("utf-8")
+).hexdigest()[:16]
+
 
 # -----------------------------------------------------
 # Helper Functions
@@ -131,11 +200,18 @@ def clean_phone_number(phone_str: str) -> str:
     return clean
 
 
-def log_failure(resume_id: str, filename: str, error: str):
-    """Append failure information to a log file."""
+def log_failure(resume_id: str, filename: str, error: str, error_class: str = ledger.ERROR_UNHANDLED):
+    """Appends one JSON line per failure; the retry queue itself lives in the ledger."""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    entry = {
+        "ts": time.time(),
+        "resume_id": resume_id,
+        "filename": filename,
+        "error_class": error_class,
+        "error": error,
+    }
     with open(FAILED_LOG, "a", encoding="utf-8") as f:
-        f.write(f"{resume_id} | {filename} | {error}\n")
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
 
 def validate_parsed_data(data: dict) -> bool:
@@ -152,40 +228,160 @@ def validate_parsed_data(data: dict) -> bool:
 
 def compute_resume_job_score(parsed_data: dict, job_description: str) -> float:
     """
-    Computes a simple numeric resume-job fit score in [0, 1].
+    Computes a resume-job fit score in [0, 1]: weighted JD skill coverage
+    blended with cosine similarity (see scoring.py).
+    """
+    with timing.span("score"):
+        score = scoring.score_batch([parsed_data], [job_description])[0]
+    if score == 0.0:
+        print("[PARSER] ⚠️ No JD skills matched the resume; resume_job_score is 0.0")
+    else:
+        print(f"[PARSER] Skill match score -> {score}")
+    return score
+
+
+@timing.timed("gemini_upload")
+async def upload_file_async(filepath: str):
+    """Runs the blocking genai.upload_file in a worker thread."""
+    gemini_clients.configure()
+    return await asyncio.to_thread(genai.upload_file, filepath)
+
+
+@timing.timed("file_active_wait")
+async def wait_for_file_active(uploaded_file, deadline: float = None):
+    """
+    Waits for the uploaded file to be ready for processing.
+    Polls genai.get_file off the event loop with exponential backoff and
+    raises TimeoutError once `deadline` seconds have passed.
+    Returns the refreshed file handle.
     """
-    skills = [s.lower() for s in (parsed_data.get("skills") or [])]
-    jd_text = (job_description or "").lower()
+    print(f"[PARSER] Waiting for file processing: {uploaded_file.name}...")
+    delay = FILE_POLL_INITIAL
+    give_up_at = time.monotonic() + (deadline or FILE_ACTIVE_DEADLINE)
 
-    keyword_candidates = ["python", "azure", "blob", "asyncio", "llm", "sql", "docker", "kubernetes"]
-    jd_keywords = [k for k in keyword_candidates if k in jd_text]
+    while uploaded_file.state.name == "PROCESSING":
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"File {uploaded_file.name} still PROCESSING after {deadline or FILE_ACTIVE_DEADLINE}s")
 
-    if not jd_keywords:
-        print("[PARSER] ⚠️ No JD keywords detected; defaulting resume_job_score to 0.0")
-        return 0.0
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, FILE_POLL_MAX)
+        uploaded_file = await asyncio.to_thread(genai.get_file, uploaded_file.name)
 
-    overlap = set(skills) & set(jd_keywords)
-    coverage = len(overlap) / len(jd_keywords)
+    if uploaded_file.state.name != "ACTIVE":
+        raise Exception(f"File upload failed with state: {uploaded_file.state.name}")
 
-    score = round(coverage, 2)
-    print(f"[PARSER] Skill overlap: {overlap} | coverage={coverage:.2f} -> score={score}")
-    return score
+    print(f"[PARSER] File is ACTIVE and ready.")
+    return uploaded_file
 
 
-def fetch_job_details(resume_id: str):
+async def upload_files_async(filepaths: list, deadline: float = None) -> dict:
+    """
+    Uploads every file concurrently and waits until all of them are ACTIVE.
+    Returns { filepath: ACTIVE file handle, or the exception for that file }.
+    """
+    async def _upload_one(filepath: str):
+        uploaded = await upload_file_async(filepath)
+        return await wait_for_file_active(uploaded, deadline=deadline)
+
+    results = await asyncio.gather(*(_upload_one(fp) for fp in filepaths), return_exceptions=True)
+    return dict(zip(filepaths, results))
+
+
+async def _upload_batch(items: list) -> dict:
+    """`items` are (resume_id, filepath); returns {resume_id: ACTIVE file} for the uploads that succeeded."""
+    uploaded = await upload_files_async([filepath for _, filepath in items])
+    results = {}
+    for resume_id, filepath in items:
+        handle = uploaded[filepath]
+        if isinstance(handle, Exception):
+            print(f"[PARSER] ⚠️ Batched upload of {resume_id} failed: {handle}")
+        else:
+            results[resume_id] = handle
+    return results
+
+
+# The resumes of a chunk that have no usable text go through upload_files_async together
+UPLOAD_BATCHER = ParseBatcher(_upload_batch, PARSE_CONCURRENCY, UPLOAD_BATCH_MAX_WAIT, name="upload_batch")
+
+
+# -----------------------------------------------------
+# Async network helpers
+# -----------------------------------------------------
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+@timing.timed("jd_prefetch")
+async def prefetch_job_details(resume_ids: list) -> int:
+    """
+    Looks up job_id + job_description for many resumes with the bulk
+    job-info endpoint and fills the in-process caches that
+    fetch_job_details reads first. Returns the number of resumes resolved.
+    """
+    ids = [rid for rid in dict.fromkeys(resume_ids) if _is_uuid(rid) and rid not in _RESUME_JOBS]
+    url = "/api/candidates/resumes/job-info"
+    resolved = 0
+
+    for i in range(0, len(ids), JOB_INFO_BATCH_SIZE):
+        chunk = ids[i:i + JOB_INFO_BATCH_SIZE]
+        try:
+            status, data = await request("POST", url, json={"resume_ids": chunk}, retry=True)  # read-only lookup
+        except Exception as e:
+            print(f"[PARSER] ⚠️ Bulk JD lookup failed ({e}); falling back to per-resume lookups.")
+            return resolved
+
+        if status >= 400 or not isinstance(data, dict):
+            print(f"[PARSER] ⚠️ Bulk JD API error ({status}): {data}; falling back to per-resume lookups.")
+            return resolved
+
+        for item in data.get("results") or []:
+            job_id = item.get("job_id")
+            if not job_id or not item.get("job_description"):
+                continue
+            _RESUME_JOBS[item["resume_id"]] = job_id
+            _JOB_DESCRIPTIONS[job_id] = item["job_description"]
+            resolved += 1
+
+        _NO_JOB.update(data.get("missing") or [])
+
+    print(f"[PARSER] ✅ Prefetched JDs for {resolved}/{len(ids)} resume(s) across {len(set(_RESUME_JOBS.values()))} job(s)")
+    return resolved
+
+
+@timing.timed("jd_fetch")
+async def fetch_job_details(resume_id: str):
     """
     Fetches job_id and job_description from backend using resume_id.
+    Served from the prefetched cache when available.
     """
+    job_id = _RESUME_JOBS.get(resume_id)
+    if job_id and job_id in _JOB_DESCRIPTIONS:
+        print(f"[PARSER] ✅ JD cache hit for Resume ID: {resume_id} (job_id={job_id})")
+        return job_id, _JOB_DESCRIPTIONS[job_id]
+
+    if resume_id in _NO_JOB:
+        print(f"[PARSER] ❌ Bulk lookup found no job linked to Resume ID: {resume_id}")
+        return None, None
+
     print(f"[PARSER] Fetching JD for Resume ID: {resume_id}")
-    url = f"{BASE_URL}/api/candidates/resumes/{resume_id}/job-info"
+    url = f"/api/candidates/resumes/{resume_id}/job-info"
 
     try:
-        res = requests.get(url, timeout=20)
-        if res.status_code >= 400:
-            print(f"[PARSER] ❌ JD API error ({res.status_code}): {res.text}")
+        status, data = await request("GET", url)
+        if status >= 400:
+            print(f"[PARSER] ❌ JD API error ({status}): {data}")
+            return None, None
+
+        if not isinstance(data, dict):
+            print("[PARSER] ❌ JD API returned a non-JSON response")
             return None, None
 
-        data = res.json()
         job_id = data.get("job_id") or data.get("id")
         job_description = data.get("job_description") or data.get("description")
 
@@ -193,6 +389,9 @@ def fetch_job_details(resume_id: str):
             print("[PARSER] ❌ JD API response missing 'job_id' or 'job_description'")
             return None, None
 
+        _RESUME_JOBS[resume_id] = job_id
+        _JOB_DESCRIPTIONS[job_id] = job_description
+
         print(f"[PARSER] ✅ JD fetched. job_id={job_id}")
         return job_id, job_description
 
@@ -201,50 +400,36 @@ def fetch_job_details(resume_id: str):
         return None, None
 
 
-async def wait_for_file_active(uploaded_file):
-    """Waits for the uploaded file to be ready for processing."""
-    print(f"[PARSER] Waiting for file processing: {uploaded_file.name}...")
-    while uploaded_file.state.name == "PROCESSING":
-        await asyncio.sleep(2)
-        uploaded_file = genai.get_file(uploaded_file.name)
-
-    if uploaded_file.state.name != "ACTIVE":
-        raise Exception(f"File upload failed with state: {uploaded_file.state.name}")
-
-    print(f"[PARSER] File is ACTIVE and ready.")
-
-
-# -----------------------------------------------------
-# Async network helpers
-# -----------------------------------------------------
-
-async def patch_resume_job_score(resume_id: str, resume_job_score):
-    """PATCH resume_job_score to backend."""
-    url = f"{BASE_URL}/api/candidates/resume/{resume_id}"
+@timing.timed("backend_patch_score")
+async def patch_resume_job_score(resume_id: str, resume_job_score) -> bool:
+    """PATCH resume_job_score to backend. Returns True on success."""
+    url = f"/api/candidates/resume/{resume_id}"
     payload = {"resume_job_score": resume_job_score}
     print(f"[PARSER] Patching resume_job_score for {resume_id} -> {resume_job_score}")
     try:
-        res = await asyncio.to_thread(requests.patch, url, json=payload, timeout=20)
-        if res.status_code >= 400:
-            print(f"[PARSER] ❌ Error PATCHing resume_job_score: {res.status_code} {res.text}")
-        else:
-            print("[PARSER] ✅ resume_job_score patched successfully")
+        status, data = await request("PATCH", url, json=payload)
+        if status >= 400:
+            print(f"[PARSER] ❌ Error PATCHing resume_job_score: {status} {data}")
+            return False
+        print("[PARSER] ✅ resume_job_score patched successfully")
+        return True
     except Exception as e:
         print(f"[PARSER] ❌ Exception while PATCHing resume_job_score: {e}")
+        return False
 
 
+@timing.timed("backend_post_candidate")
 async def post_candidate_data(profile_payload: dict, resume_id: str):
     """Creates candidate profile."""
-    url = f"{BASE_URL}/api/candidates"
+    url = "/api/candidates"
     print(f"[PARSER] Posting candidate profile for resume_id={resume_id}...")
     print(f"profile_payload {profile_payload}")
     try:
-        res = await asyncio.to_thread(requests.post, url, json=profile_payload, timeout=20)
-        if res.status_code >= 400:
-            print(f"[PARSER] ❌ Error creating candidate: {res.status_code} {res.text}")
+        status, data = await request("POST", url, json=profile_payload)
+        if status >= 400:
+            print(f"[PARSER] ❌ Error creating candidate: {status} {data}")
             return None
 
-        data = res.json()
         candidate_id = data.get("candidate_id") or data.get("id") or data.get("_id")
         print(f"[PARSER] ✅ Created Candidate ID: {candidate_id}")
         return candidate_id
@@ -253,30 +438,30 @@ async def post_candidate_data(profile_payload: dict, resume_id: str):
         return None
 
 
+@timing.timed("question_generation")
 async def generate_questions(parsed_data: dict, job_description: str):
     """Uses Gemini to generate interview questions."""
     print(f"[PARSER] Generating interview questions via LLM...")
-    model = genai.GenerativeModel("gemini-2.5-flash", generation_config=JSON_CONFIG)
-
-    candidate_json = json.dumps(
-        {
-            "skills": parsed_data.get("skills"),
-            "experience": parsed_data.get("experience"),
-            "summary": parsed_data.get("summary"),
-        },
-        ensure_ascii=False,
-    )
-
-    prompt = SYSTEM_INSTRUCTIONS_QUESTIONS.format(
-        job_description=job_description,
-        candidate_json=candidate_json,
+    # Long JDs / resumes are compacted to QUESTIONS_PROMPT_TOKEN_BUDGET
+    prompt, budget = token_budget.fit_questions_prompt(
+        SYSTEM_INSTRUCTIONS_QUESTIONS,
+        job_description,
+        parsed_data.get("skills"),
+        parsed_data.get("experience"),
+        parsed_data.get("summary"),
     )
 
     raw = None
     try:
-        response = await model.generate_content_async(
-            prompt,
-            safety_settings=SAFETY_SETTINGS,
+        response, queue_wait = await GEMINI_LIMITER.run(
+            lambda: gemini_clients.generate_async("questions", prompt, safety_settings=SAFETY_SETTINGS),
+            est_tokens=budget["prompt_tokens"],
+            label="questions",
+        )
+        timing.observe("llm_queue_wait", queue_wait)
+        token_budget.record_usage(
+            "questions", response, budget["prompt_tokens"],
+            original_tokens=budget["original_tokens"], compacted=budget["compacted"],
         )
         raw = response.text
         print("[PARSER][DEBUG] Raw LLM questions response:")
@@ -308,7 +493,9 @@ async def generate_questions(parsed_data: dict, job_description: str):
             text = q.get("question")
             if not text:
                 continue
-            q_type = q.get("question_type") or "general"
+            q_type = str(q.get("question_type") or "other").lower()
+            if q_type not in QUESTION_TYPES:
+                q_type = "other"
             seq = q.get("sequence_number") or idx
             try:
                 seq = int(seq)
@@ -318,7 +505,7 @@ async def generate_questions(parsed_data: dict, job_description: str):
             question_dicts.append(
                 {
                     "sequence_number": seq,
-                    "question_type": str(q_type),
+                    "question_type": q_type,
                     "question_text": str(text),
                 }
             )
@@ -332,44 +519,88 @@ async def generate_questions(parsed_data: dict, job_description: str):
         return []
 
 
-async def post_interview_questions(candidate_id: str, questions: list, interview_id: str = None):
-    """Stores generated interview questions."""
-    base = f"{BASE_URL}/api/interviews/candidates/{candidate_id}/questions"
-
-    print(f"[PARSER] Posting {len(questions)} questions for Candidate {candidate_id}...")
-    if interview_id:
-        print(f"[PARSER] Linking questions to Interview ID: {interview_id}")
-
+def _question_items(questions: list) -> list:
+    """Question dicts in the shape the backend expects, dropping empty ones."""
+    items = []
     for q in questions:
         question_text = q.get("question_text")
-        question_type = q.get("question_type") or "general"
-        sequence_number = q.get("sequence_number") or 1
-
         if not question_text:
             continue
+        items.append(
+            {
+                "question_text": question_text,
+                "question_type": q.get("question_type") or "other",
+                "sequence_number": q.get("sequence_number") or len(items) + 1,
+            }
+        )
+    return items
 
-        payload = {
-            "question_text": question_text,
-            "question_type": question_type,
-            "sequence_number": sequence_number,
-        }
-        if interview_id:
-            payload["interview_id"] = interview_id
 
-        print(f"[PARSER] -> POST {base} payload={payload}")
-        try:
-            res = await asyncio.to_thread(requests.post, base, json=payload, timeout=20)
-            if res.status_code >= 400:
-                print(f"[PARSER] ❌ Backend Error posting question: {res.status_code} {res.text}")
-            else:
-                print(f"[PARSER] ✅ Question (seq={sequence_number}) posted successfully")
-        except Exception as e:
-            print(f"[PARSER] ❌ Connection Failed while posting question: {e}")
+@timing.timed("backend_post_questions")
+async def post_interview_questions(candidate_id: str, questions: list, interview_id: str = None, replace: bool = False):
+    """
+    Stores all generated interview questions with a single bulk POST.
+    replace=True swaps out any questions the interview already has.
+    """
+    url = f"/api/interviews/candidates/{candidate_id}/questions/bulk"
+
+    print(f"[PARSER] Posting {len(questions)} questions for Candidate {candidate_id}...")
+    if not interview_id:
+        print("[PARSER] ❌ No interview_id; backend requires one to store questions.")
+        return 0
+    print(f"[PARSER] Linking questions to Interview ID: {interview_id}")
+
+    items = _question_items(questions)
+    if not items:
+        print("[PARSER] ⚠️ No valid questions to post.")
+        return 0
+
+    payload = {"interview_id": interview_id, "questions": items, "replace": replace}
+    print(f"[PARSER] -> POST {url} ({len(items)} questions)")
+    try:
+        # Resending a replace is harmless; an append could duplicate the questions
+        status, data = await request("POST", url, json=payload, retry=replace)
+        if status >= 400:
+            print(f"[PARSER] ❌ Backend Error posting questions: {status} {data}")
+            return 0
+
+        created = data.get("created", len(items)) if isinstance(data, dict) else len(items)
+        print(f"[PARSER] ✅ {created} questions posted successfully")
+        return created
+    except Exception as e:
+        print(f"[PARSER] ❌ Connection Failed while posting questions: {e}")
+        return 0
+
+
+@timing.timed("backend_ingest")
+async def ingest_parsed_resume(resume_id: str, payload: dict):
+    """
+    Stores score, candidate, interview and questions for one resume in a
+    single transactional request. Returns the response dict of IDs, or None.
+    """
+    url = f"/api/interviews/resumes/{resume_id}/ingest"
+    print(f"[PARSER] -> POST {url} ({len(payload.get('questions') or [])} questions)")
+    try:
+        # Idempotent: the backend reuses the candidate (by email) and the scheduled interview
+        status, data = await request("POST", url, json=payload, retry=True)
+        if status >= 400 or not isinstance(data, dict):
+            print(f"[PARSER] ❌ Error ingesting resume {resume_id}: {status} {data}")
+            return None
 
+        print(
+            f"[PARSER] ✅ Ingested resume {resume_id}: candidate={data.get('candidate_id')} | "
+            f"interview={data.get('interview_id')} | questions={len(data.get('question_ids') or [])}"
+        )
+        return data
+    except Exception as e:
+        print(f"[PARSER] ❌ Exception while ingesting resume {resume_id}: {e}")
+        return None
 
+
+@timing.timed("backend_create_interview")
 async def create_interview(candidate_id: str, job_id: str, status: str = "scheduled"):
     """Creates an interview record tying candidate + job together."""
-    url = f"{BASE_URL}/api/interviews"
+    url = "/api/interviews"
     payload = {
         "candidate": candidate_id,
         "job": job_id,
@@ -377,12 +608,11 @@ async def create_interview(candidate_id: str, job_id: str, status: str = "schedu
     }
     print(f"[PARSER] Creating interview -> POST {url} payload={payload}")
     try:
-        res = await asyncio.to_thread(requests.post, url, json=payload, timeout=20)
-        if res.status_code >= 400:
-            print(f"[PARSER] ❌ Error creating interview: {res.status_code} {res.text}")
+        status, data = await request("POST", url, json=payload)
+        if status >= 400:
+            print(f"[PARSER] ❌ Error creating interview: {status} {data}")
             return None
 
-        data = res.json()
         print(f"[PARSER][DEBUG] Create Interview Response: {data}")
 
         # Try to find ID in common locations
@@ -405,40 +635,409 @@ async def create_interview(candidate_id: str, job_id: str, status: str = "schedu
         return None
 
 
+async def _parse_with_llm(filepath: str, resume_id: str):
+    """
+    Parses the resume with Gemini. Returns (parsed JSON dict, cache version
+    of the prompt that produced it), or (None, None) on failure.
+    Text is extracted locally and sent inline when possible; otherwise the
+    original file is uploaded and polled until ACTIVE.
+    """
+    try:
+        with timing.span("text_extraction"):
+            text, path = await asyncio.to_thread(text_extraction.extract_text, filepath)
+        if text:
+            print(f"[PARSER] Using locally extracted text ({path}, {len(text)} chars); no upload needed.")
+            if PARSE_BATCHER is not None and len(text) <= PARSE_BATCH_MAX_CHARS:
+                parsed_data = await PARSE_BATCHER.submit(resume_id, text)
+                if parsed_data is not None:
+                    return parsed_data, PARSE_BATCH_CACHE_VERSION
+                print(f"[PARSER] ⚠️ No valid batched result for {resume_id}; parsing it on its own.")
+            resume_part = f"RESUME TEXT:\n{text}"
+        else:
+            print("[PARSER] Falling back to Gemini file upload...")
+            upload_start = time.perf_counter()
+            resume_part = await UPLOAD_BATCHER.submit(resume_id, filepath)
+            if resume_part is None:
+                print(f"[PARSER] Retrying the upload of {resume_id} on its own.")
+                resume_part = await upload_file_async(filepath)
+                resume_part = await wait_for_file_active(resume_part)
+            text_extraction.record("upload", time.perf_counter() - upload_start)
+
+        contents = [SYSTEM_INSTRUCTIONS_PARSE, resume_part]
+        est_tokens = estimate_tokens(contents)
+        with timing.span("llm_parse"):
+            response, queue_wait = await GEMINI_LIMITER.run(
+                lambda: gemini_clients.generate_async("parse", contents, safety_settings=SAFETY_SETTINGS),
+                est_tokens=est_tokens,
+                label=f"parse:{resume_id}",
+            )
+        timing.observe("llm_queue_wait", queue_wait)
+        token_budget.record_usage("parse", response, est_tokens)
+        raw = response.text
+        print("[PARSER][DEBUG] Raw LLM parse response:")
+        print(raw)
+        parsed_data = json.loads(raw)
+        if not isinstance(parsed_data, dict):
+            raise ValueError(f"Expected a JSON object, got {type(parsed_data).__name__}")
+        return parsed_data, PARSE_CACHE_VERSION
+
+    except Exception as e:
+        print(f"🔥🔥🔥 [CRITICAL ERROR] LLM parse failed for {resume_id}: {e}")
+        log_failure(resume_id, filepath, f"Parse Error: {e}", ledger.ERROR_LLM)
+        return None, None
+
+
+def _valid_batch_item(item, text: str) -> bool:
+    """
+    A batched result must be a parse-schema object, and its email and first
+    name (when given) must occur in that resume's own text. This catches
+    items the model left out, malformed, or mixed up between resumes.
+    """
+    if not isinstance(item, dict) or not any(field in item for field in PARSE_FIELDS):
+        return False
+    if not isinstance(item.get("skills", []), list):
+        return False
+    lowered = text.lower()
+    for field in ("email", "first_name"):
+        value = item.get(field)
+        if value and str(value).strip().lower() not in lowered:
+            return False
+    return True
+
+
+async def _parse_batch_with_llm(items: list) -> dict:
+    """
+    One Gemini request for several extracted resume texts.
+    `items` are (resume_id, text); returns {resume_id: parsed_data} for the
+    items that pass validation (the rest fall back to a single parse).
+    """
+    contents = [SYSTEM_INSTRUCTIONS_PARSE_BATCH] + [
+        f"===== RESUME {resume_id} =====\nRESUME TEXT:\n{text}" for resume_id, text in items
+    ]
+    est_tokens = estimate_tokens(contents)
+    print(f"[PARSER] Batch parse: {len(items)} resume(s), ~{est_tokens} prompt tokens")
+
+    with timing.span("llm_parse_batch"):
+        response, queue_wait = await GEMINI_LIMITER.run(
+            lambda: gemini_clients.generate_async("parse_batch", contents, safety_settings=SAFETY_SETTINGS),
+            est_tokens=est_tokens,
+            label=f"parse_batch:{len(items)}",
+        )
+    timing.observe("llm_queue_wait", queue_wait)
+    token_budget.record_usage("parse_batch", response, est_tokens)
+
+    data = json.loads(response.text)
+    parsed = data.get("resumes") if isinstance(data, dict) else None
+    if not isinstance(parsed, dict):
+        raise ValueError("Batch response has no 'resumes' object")
+
+    results = {}
+    for resume_id, text in items:
+        item = parsed.get(resume_id)
+        if _valid_batch_item(item, text):
+            results[resume_id] = item
+        else:
+            print(f"[PARSER] ⚠️ Batch item {resume_id} missing or invalid.")
+    print(f"[PARSER] Batch parse: {len(results)}/{len(items)} valid")
+    return results
+
+
+def configure_parse_batching(size: int, max_wait: float = None):
+    """Turns batched parsing on (size > 1) or off; used at import and by the benchmark."""
+    global PARSE_BATCHER
+    if size and size > 1:
+        wait = PARSE_BATCH_MAX_WAIT if max_wait is None else max_wait
+        PARSE_BATCHER = ParseBatcher(_parse_batch_with_llm, size, wait, name="parse_batch")
+    else:
+        PARSE_BATCHER = None
+
+
+configure_parse_batching(PARSE_BATCH_SIZE)
+
+
+def build_profile_payload(parsed_data: dict, job_id: str) -> dict:
+    """Candidate fields sent to the backend, with the phone number cleaned."""
+    return {
+        "first_name": parsed_data.get("first_name"),
+        "last_name": parsed_data.get("last_name"),
+        "email": parsed_data.get("email"),
+        "phone_number": clean_phone_number(parsed_data.get("phone_number")),
+        "applied_job": job_id,
+    }
+
+
+async def _generate_questions_safe(parsed_data: dict, job_description: str, resume_id: str) -> list:
+    try:
+        questions = await generate_questions(parsed_data, job_description)
+        print(f"[PARSER] generate_questions returned {len(questions)} items")
+        return questions
+    except Exception as e:
+        print(f"[PARSER] 🔥 ERROR in questions pipeline for {resume_id}: {e}")
+        return []
+
+
+async def _save_checkpoint(filepath: str, checkpoint: dict, **fields):
+    """Records finished step outputs so a rerun of this content can skip them."""
+    checkpoint.update(fields)
+    await asyncio.to_thread(ledger.save_checkpoint, filepath, **fields)
+
+
+async def _checkpointed_questions(filepath, checkpoint, parsed_data, job_description, resume_id) -> list:
+    """Generated questions from the checkpoint, or a fresh LLM call (then saved)."""
+    if checkpoint.get("questions"):
+        print(f"[PARSER] ✅ Checkpoint: reusing {len(checkpoint['questions'])} generated questions.")
+        return checkpoint["questions"]
+
+    questions = await _generate_questions_safe(parsed_data, job_description, resume_id)
+    if questions:
+        await _save_checkpoint(filepath, checkpoint, questions=questions)
+    return questions
+
+
+async def _post_generated_questions(filepath, checkpoint, questions_task, candidate_id, interview_id) -> int:
+    """
+    Waits for question generation (a task running concurrently, or a
+    coroutine), then posts the questions once the interview exists.
+    Returns the number stored.
+    """
+    questions = await questions_task
+    if not candidate_id or not interview_id:
+        print("[PARSER] ⚠️ No candidate/interview; dropping generated questions.")
+        return 0
+    if not questions:
+        print("[PARSER] ⚠️ No questions generated; skipping question POST.")
+        return 0
+    if checkpoint.get("questions_posted") and checkpoint.get("questions_interview_id") == interview_id:
+        print("[PARSER] ✅ Checkpoint: questions already posted for this interview.")
+        return checkpoint["questions_posted"]
+
+    print("[PARSER] Posting questions...")
+    posted = await post_interview_questions(candidate_id, questions, interview_id=interview_id, replace=True)
+    if posted:
+        await _save_checkpoint(filepath, checkpoint, questions_posted=posted, questions_interview_id=interview_id)
+    return posted
+
+
+async def _store_with_ingest(filepath, checkpoint, resume_id, parsed_data, job_id, job_description,
+                             resume_job_score, profile_payload):
+    """
+    Stores score, candidate, interview and the generated questions with one
+    transactional ingest request. Question generation runs alongside the
+    ingest: questions already done (or checkpointed) when the request goes
+    out are sent inline, the rest are posted with replace=true once
+    interview_id is known. Steps recorded in `checkpoint` are skipped.
+    Returns (candidate_id, interview_id, questions_count, stored), where
+    stored is False when the backend did not accept the ingest.
+    """
+    candidate_id = checkpoint.get("candidate_id")
+    interview_id = checkpoint.get("interview_id")
+
+    if profile_payload and candidate_id and interview_id:
+        print(f"[PARSER] ✅ Checkpoint: already ingested (candidate={candidate_id}, interview={interview_id}).")
+        questions_count = await _post_generated_questions(
+            filepath, checkpoint,
+            _checkpointed_questions(filepath, checkpoint, parsed_data, job_description, resume_id),
+            candidate_id, interview_id,
+        )
+        return candidate_id, interview_id, questions_count, True
+
+    questions, questions_task = [], None
+    if profile_payload and checkpoint.get("questions"):
+        questions = await _checkpointed_questions(filepath, checkpoint, parsed_data, job_description, resume_id)
+    elif profile_payload:
+        print("[PARSER] Step 4: Generating interview questions (concurrently)...")
+        questions_task = asyncio.ensure_future(
+            _checkpointed_questions(filepath, checkpoint, parsed_data, job_description, resume_id)
+        )
+
+    print("[PARSER] Step 5: Ingesting parsed resume in one request...")
+    payload = {
+        "job_id": job_id,
+        "parsed_data": parsed_data,
+        "resume_job_score": resume_job_score,
+    }
+    if profile_payload:
+        if questions_task is not None and questions_task.done():
+            questions, questions_task = questions_task.result(), None
+        payload["candidate"] = {k: v for k, v in profile_payload.items() if k != "applied_job"}
+        payload["questions"] = _question_items(questions)
+
+    try:
+        data = await ingest_parsed_resume(resume_id, payload)
+    except BaseException:
+        if questions_task is not None:
+            questions_task.cancel()
+        raise
+    candidate_id = data.get("candidate_id") if data else None
+    interview_id = data.get("interview_id") if data else None
+    questions_count = len(data.get("question_ids") or []) if data else 0
+
+    if candidate_id and interview_id:
+        fields = {"candidate_id": candidate_id, "interview_id": interview_id}
+        if questions_task is None:
+            fields.update(questions_posted=questions_count, questions_interview_id=interview_id)
+        await _save_checkpoint(filepath, checkpoint, **fields)
+
+    if questions_task is not None:
+        print("[PARSER] Step 6: Waiting for questions...")
+        questions_count = await _post_generated_questions(filepath, checkpoint, questions_task, candidate_id, interview_id)
+    elif questions and not interview_id:
+        print("[PARSER] ⚠️ No candidate/interview; dropping generated questions.")
+
+    return candidate_id, interview_id, questions_count, data is not None
+
+
+async def _checkpointed_score_patch(filepath, checkpoint, resume_id, resume_job_score) -> bool:
+    """PATCHes the score unless checkpointed. Returns whether the backend has it."""
+    if checkpoint.get("score_patched") == resume_job_score:
+        print("[PARSER] ✅ Checkpoint: resume_job_score already stored.")
+        return True
+    if not await patch_resume_job_score(resume_id, resume_job_score):
+        return False
+    await _save_checkpoint(filepath, checkpoint, score_patched=resume_job_score)
+    return True
+
+
+async def _create_candidate_and_interview(filepath, checkpoint, resume_id, job_id, profile_payload):
+    """
+    Candidate POST then interview POST, each skipped when checkpointed.
+    Returns (candidate_id, interview_id).
+    """
+    candidate_id = checkpoint.get("candidate_id")
+    if candidate_id:
+        print(f"[PARSER] ✅ Checkpoint: reusing Candidate ID {candidate_id}.")
+    else:
+        print("[PARSER] Step 4: Creating candidate profile...")
+        candidate_id = await post_candidate_data(profile_payload, resume_id)
+        if not candidate_id:
+            print("[PARSER] ⚠️ No candidate_id; skipping interview creation.")
+            return None, None
+        await _save_checkpoint(filepath, checkpoint, candidate_id=candidate_id)
+
+    interview_id = checkpoint.get("interview_id")
+    if interview_id:
+        print(f"[PARSER] ✅ Checkpoint: reusing Interview ID {interview_id}.")
+    else:
+        print("[PARSER] Step 5: Creating interview record...")
+        interview_id = await create_interview(candidate_id, job_id, status="scheduled")
+        if interview_id:
+            await _save_checkpoint(filepath, checkpoint, interview_id=interview_id)
+    return candidate_id, interview_id
+
+
+async def _store_stepwise(filepath, checkpoint, resume_id, parsed_data, job_id, job_description,
+                          resume_job_score, profile_payload):
+    """
+    Stores results with one request per entity (score PATCH, candidate,
+    interview, questions). Used when PIPELINE_USE_INGEST is off.
+
+    Dependency graph: question generation only needs parsed_data and the JD,
+    so it runs alongside the score PATCH and candidate -> interview chain.
+    Only the question POST waits for interview_id. Steps recorded in
+    `checkpoint` are skipped.
+    Returns (candidate_id, interview_id, questions_count, stored), where
+    stored is False when the backend did not accept the writes.
+    """
+    if not profile_payload:
+        stored = await _checkpointed_score_patch(filepath, checkpoint, resume_id, resume_job_score)
+        return None, None, 0, stored
+
+    print("[PARSER] Step 4: Generating interview questions (concurrently)...")
+    questions_task = asyncio.ensure_future(
+        _checkpointed_questions(filepath, checkpoint, parsed_data, job_description, resume_id)
+    )
+
+    try:
+        _, (candidate_id, interview_id) = await asyncio.gather(
+            _checkpointed_score_patch(filepath, checkpoint, resume_id, resume_job_score),
+            _create_candidate_and_interview(filepath, checkpoint, resume_id, job_id, profile_payload),
+        )
+    except BaseException:
+        questions_task.cancel()
+        raise
+
+    print("[PARSER] Step 6: Waiting for questions...")
+    questions_count = await _post_generated_questions(filepath, checkpoint, questions_task, candidate_id, interview_id)
+    return candidate_id, interview_id, questions_count, bool(candidate_id)
+
+
+async def _parse_or_cached(filepath: str, resume_id: str):
+    """
+    Parsed JSON from the content-addressed parse cache, else from the LLM
+    (then cached under the version of the prompt that produced it). Results
+    of the batch prompt are only reused while batched parsing is on.
+    """
+    versions = [PARSE_CACHE_VERSION]
+    if PARSE_BATCHER is not None:
+        versions.append(PARSE_BATCH_CACHE_VERSION)
+
+    try:
+        content_hash = parse_cache.file_sha256(filepath)
+    except OSError as e:
+        print(f"[PARSER] ⚠️ Could not hash {filepath} for parse cache: {e}")
+        content_hash = None
+
+    if content_hash:
+        parsed_data = parse_cache.get_any([parse_cache.cache_key(filepath, v, content_hash) for v in versions])
+        if parsed_data is not None:
+            print(f"[PARSER] ✅ Parse cache hit for {resume_id}; skipping LLM parse.")
+            return parsed_data
+
+    parsed_data, version = await _parse_with_llm(filepath, resume_id)
+    if parsed_data is not None and content_hash:
+        parse_cache.put(parse_cache.cache_key(filepath, version, content_hash), parsed_data)
+    return parsed_data
+
+
 # -----------------------------------------------------
 # MAIN CONTROLLER: one full pass for a single resume
 # -----------------------------------------------------
 
 async def parse_resume_async(filepath: str):
-    """Orchestrates the entire flow for a single resume file."""
+    """
+    Orchestrates the entire flow for a single resume file.
+    Every stage is timed; the resume's timing record is appended to the
+    timing log and returned under "timings".
+    """
+    record = timing.start_record(extract_resume_id(filepath))
+    result = None
+    try:
+        result = await _parse_resume_steps(filepath)
+    finally:
+        stages = timing.finish_record(
+            record,
+            filename=os.path.basename(filepath),
+            status=(result or {}).get("status") or ledger.STATE_FAILED,
+        )
+
+    if result is not None:
+        result["timings"] = stages
+    return result
+
+
+async def _parse_resume_steps(filepath: str):
     print("--------------------------------------------------")
     print(f"[PARSER] Processing: {filepath}")
 
     resume_id = extract_resume_id(filepath)
 
+    # Outputs of steps an earlier run finished for this exact content
+    checkpoint = await asyncio.to_thread(ledger.load_checkpoint, filepath)
+    if checkpoint:
+        print(f"[PARSER] Resuming {resume_id} from checkpoint: {sorted(checkpoint)}")
+
     # ----------------------
     # Step 1: Parse resume with LLM
     # ----------------------
     print("[PARSER] Step 1: Parsing Resume with LLM...")
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash", generation_config=JSON_CONFIG)
-
-        uploaded_file = genai.upload_file(filepath)
-        await wait_for_file_active(uploaded_file)
-
-        response = await model.generate_content_async(
-            [SYSTEM_INSTRUCTIONS_PARSE, uploaded_file],
-            safety_settings=SAFETY_SETTINGS,
-        )
-        raw = response.text
-        print("[PARSER][DEBUG] Raw LLM parse response:")
-        print(raw)
-        parsed_data = json.loads(raw)
-
-    except Exception as e:
-        print(f"🔥🔥🔥 [CRITICAL ERROR] LLM parse failed for {resume_id}: {e}")
-        log_failure(resume_id, filepath, f"Parse Error: {e}")
-        return None
+    parsed_data = checkpoint.get("parsed_data")
+    if parsed_data is not None:
+        print(f"[PARSER] ✅ Checkpoint: reusing parsed data for {resume_id}.")
+    else:
+        parsed_data = await _parse_or_cached(filepath, resume_id)
+        if parsed_data is None:
+            return None
+        await _save_checkpoint(filepath, checkpoint, parsed_data=parsed_data)
 
     has_valid_contact = validate_parsed_data(parsed_data)
 
@@ -446,91 +1045,256 @@ async def parse_resume_async(filepath: str):
     # Step 2: Fetch job description via API
     # ----------------------
     print("[PARSER] Step 2: Fetching Job Description from backend...")
-    job_id, job_description = fetch_job_details(resume_id)
+    job_id, job_description = await fetch_job_details(resume_id)
     if not job_id or not job_description:
         print(f"[PARSER] ❌ No JD for resume_id={resume_id}. Skipping scoring and candidate creation.")
-        log_failure(resume_id, filepath, "Missing job description from API")
+        log_failure(resume_id, filepath, "Missing job description from API", ledger.ERROR_NO_JOB)
         return {
             "candidate_id": None,
             "resume_job_score": None,
             "questions_count": 0,
             "interview_id": None,
+            "status": ledger.STATE_FAILED,
+            "error": "Missing job description from API",
+            "error_class": ledger.ERROR_NO_JOB,
         }
 
     # ----------------------
-    # Step 3: Compute fit score (resume_job_score) and PATCH it
+    # Step 3: Compute fit score (resume_job_score)
     # ----------------------
     print("[PARSER] Step 3: Computing resume_job_score...")
     resume_job_score = compute_resume_job_score(parsed_data, job_description)
-    await patch_resume_job_score(resume_id, resume_job_score)
-
-    # ----------------------
-    # Step 4: Create candidate profile
-    # ----------------------
-    candidate_id = None
-    questions = []
-    interview_id = None
+    if checkpoint.get("resume_job_score") != resume_job_score or checkpoint.get("job_id") != job_id:
+        await _save_checkpoint(filepath, checkpoint, job_id=job_id, resume_job_score=resume_job_score)
 
     if has_valid_contact:
-        print("[PARSER] Step 4: Creating candidate profile...")
-        
-        # CLEAN PHONE NUMBER HERE
-        raw_phone = parsed_data.get("phone_number")
-        cleaned_phone = clean_phone_number(raw_phone)
-        
-        profile_payload = {
-            "first_name": parsed_data.get("first_name"),
-            "last_name": parsed_data.get("last_name"),
-            "email": parsed_data.get("email"),
-            "phone_number": cleaned_phone,  # Use cleaned phone
-            "applied_job": job_id,
-        }
-
-        candidate_id = await post_candidate_data(profile_payload, resume_id)
+        profile_payload = build_profile_payload(parsed_data, job_id)
     else:
+        profile_payload = None
         print("[PARSER] ⚠️ Missing contact fields; skipping candidate creation.")
 
     # ----------------------
-    # Step 5: Create interview record (FIRST)
+    # Steps 4+: Store score, candidate, interview and questions
     # ----------------------
-    if candidate_id:
-        print("[PARSER] Step 5: Creating interview record...")
-        interview_id = await create_interview(candidate_id, job_id, status="scheduled")
-
-        # ----------------------
-        # Step 6: Generate interview questions
-        # ----------------------
-        print("[PARSER] Step 6: Generating interview questions...")
-        try:
-            questions = await generate_questions(parsed_data, job_description)
-            print(f"[PARSER] Step 6: generate_questions returned {len(questions)} items")
-        except Exception as e:
-            print(f"[PARSER] 🔥 ERROR in Step 6 (questions pipeline) for {resume_id}: {e}")
-            questions = []
-
-        # ----------------------
-        # Step 7: Post Questions (with interview_id)
-        # ----------------------
-        if questions:
-            print("[PARSER] Step 7: Posting questions...")
-            await post_interview_questions(candidate_id, questions, interview_id=interview_id)
-        else:
-            print("[PARSER] ⚠️ No questions generated; skipping question POST.")
+    if USE_INGEST_ENDPOINT:
+        candidate_id, interview_id, questions_count, stored = await _store_with_ingest(
+            filepath, checkpoint, resume_id, parsed_data, job_id, job_description, resume_job_score, profile_payload
+        )
+    else:
+        candidate_id, interview_id, questions_count, stored = await _store_stepwise(
+            filepath, checkpoint, resume_id, parsed_data, job_id, job_description, resume_job_score, profile_payload
+        )
 
+    if candidate_id:
+        status = ledger.STATE_COMPLETED
+    elif not has_valid_contact and stored:
+        status = ledger.STATE_SKIPPED  # re-parsing the same file will not find contact details either
     else:
-        print("[PARSER] ⚠️ No candidate_id; skipping questions and interview creation.")
+        status = ledger.STATE_FAILED  # the backend write failed; retried from the queue
 
     final_output = {
         "candidate_id": candidate_id,
         "resume_job_score": resume_job_score,
-        "questions_count": len(questions),
+        "questions_count": questions_count,
         "interview_id": interview_id,
+        "status": status,
     }
+    if status == ledger.STATE_FAILED:
+        stored_what = "Candidate" if has_valid_contact else "Resume score"
+        final_output["error"] = f"{stored_what} could not be stored in the backend"
+        final_output["error_class"] = ledger.ERROR_BACKEND
 
     print(f"[PARSER] Process Complete for {resume_id} -> {final_output}")
     return final_output
 
 
+async def _run_with_session(coro):
+    """Runs `coro` and closes the shared HTTP session before the loop ends."""
+    try:
+        return await coro
+    finally:
+        await close_session()
+
+
 def parse_resume_file(filepath: str):
     """Public sync wrapper used by Airflow."""
-    return asyncio.run(parse_resume_async(filepath))
\ No newline at end of file
+    return asyncio.run(_run_with_session(parse_resume_async(filepath)))
+
+
+# -----------------------------------------------------
+# BATCH CONTROLLER: many resumes inside one event loop
+# -----------------------------------------------------
+
+def start_batch(run_id: str = None):
+    """Resets per-run stats and caches before a batch or streaming run."""
+    parse_cache.reset_stats()
+    parse_cache.evict()
+    text_extraction.reset_stats()
+    GEMINI_LIMITER.reset_stats()
+    token_budget.reset_stats()
+    gemini_clients.reset_stats()
+    if PARSE_BATCHER is not None:
+        PARSE_BATCHER.reset_stats()
+    UPLOAD_BATCHER.reset_stats()
+    timing.start_run(run_id)
+
+    _RESUME_JOBS.clear()
+    _JOB_DESCRIPTIONS.clear()
+    _NO_JOB.clear()
+
+
+async def process_resume(filepath: str):
+    """
+    Runs parse_resume_async for one file and never raises.
+    Returns (filepath, result, error) for record_outcome(); the result
+    status is STATE_RUNNING if another task holds the resume's lease.
+    """
+    if not os.path.exists(filepath):
+        return filepath, None, "File missing locally"
+
+    if not await asyncio.to_thread(ledger.claim, filepath):
+        return filepath, {"status": ledger.STATE_RUNNING}, None
+
+    try:
+        return filepath, await parse_resume_async(filepath), None
+    except Exception as e:
+        print(f"[PARSER] ❌ CRITICAL ERROR parsing {filepath}: {e}")
+        print(traceback.format_exc())
+        log_failure(extract_resume_id(filepath), filepath, f"Unhandled Error: {e}")
+        return filepath, None, f"Unhandled Error: {e}"
+
+
+def new_summary(total: int = 0) -> dict:
+    return {
+        "total": total,
+        "success": 0,
+        "failed": 0,
+        "results": {},
+        "failures": {},
+        "in_progress": 0,
+    }
+
+
+async def record_outcome(summary: dict, filepath: str, result, error: str = None):
+    """
+    Adds one process_resume outcome to the summary and the ledger. The ledger
+    write can wait on another process's lock, so it runs in a worker thread.
+    """
+    fname = os.path.basename(filepath)
+
+    if result and result.get("status") == ledger.STATE_RUNNING:
+        # Another task owns this resume and records its outcome
+        print(f"[PARSER] ⏭️ {fname}: already being processed elsewhere; skipped.")
+        summary["in_progress"] += 1
+        return
+
+    if error:
+        print(f"[PARSER] ❌ {fname}: {error}")
+        summary["failed"] += 1
+        summary["failures"][fname] = error
+        if os.path.exists(filepath):
+            await asyncio.to_thread(ledger.record, filepath, ledger.STATE_FAILED, error, ledger.ERROR_UNHANDLED)
+        return
+
+    summary["results"][fname] = result
+    if result:
+        await asyncio.to_thread(
+            ledger.record,
+            filepath, result.get("status") or ledger.STATE_FAILED, result.get("error"), result.get("error_class"),
+        )
+    else:
+        await asyncio.to_thread(ledger.record, filepath, ledger.STATE_FAILED, "Parse Error", ledger.ERROR_LLM)
+
+    if result and result.get("candidate_id"):
+        print(
+            f"[PARSER] ✅ {fname}: Candidate ID: {result.get('candidate_id')} | "
+            f"resume_job_score: {result.get('resume_job_score')} | "
+            f"Questions: {result.get('questions_count', 0)}"
+        )
+        summary["success"] += 1
+    else:
+        print(f"[PARSER] ⚠️ {fname}: parsed, but returned incomplete data or no candidate_id.")
+        summary["failed"] += 1
+        summary["failures"][fname] = "Incomplete data or no candidate_id"
+
+
+def finish_summary(summary: dict) -> dict:
+    """Attaches run stats (cache, extraction, limiter, timings) and prints them."""
+    summary["cache"] = parse_cache.stats()
+    summary["extraction"] = text_extraction.stats()
+    summary["rate_limiter"] = GEMINI_LIMITER.stats()
+    summary["tokens"] = token_budget.stats()
+    summary["gemini_clients"] = gemini_clients.stats()
+    summary["parse_batching"] = PARSE_BATCHER.stats() if PARSE_BATCHER is not None else None
+    summary["upload_batching"] = UPLOAD_BATCHER.stats()
+    summary["timings"] = timing.summary()
+
+    print(f"[PARSER] Batch Complete. Success: {summary['success']} | Failed: {summary['failed']}")
+    print(f"[PARSER] Parse cache: {summary['cache']}")
+    print(f"[PARSER] Extraction paths: {summary['extraction']}")
+    print(f"[PARSER] Gemini limiter: {summary['rate_limiter']}")
+    print(f"[PARSER] Gemini tokens: {summary['tokens']}")
+    print(f"[PARSER] Gemini clients: {summary['gemini_clients']}")
+    if summary["parse_batching"]:
+        print(f"[PARSER] Parse batching: {summary['parse_batching']}")
+    print(f"[PARSER] Upload batching: {summary['upload_batching']}")
+    for line in timing.format_summary(summary["timings"]):
+        print(f"[TIMING] {line}")
+    return summary
+
+
+async def parse_resumes_async(filepaths: list, concurrency: int = None, run_id: str = None) -> dict:
+    """
+    Runs parse_resume_async for every file inside a single event loop,
+    keeping at most `concurrency` resumes in flight at once.
+    Timing records are tagged with `run_id` (e.g. the Airflow run).
+
+    Returns a summary dict:
+    {
+        "total": int,
+        "success": int,
+        "failed": int,
+        "results": { filename: parse_resume_async output },
+        "failures": { filename: reason },
+        "in_progress": int,  # skipped: leased by another task
+        "cache": { "hits", "misses", "writes", "evicted" },
+        "extraction": { path: {"count", "seconds", "avg_seconds"} },
+        "rate_limiter": { "calls", "retries", "throttled", "queue_wait_p50", ... },
+        "tokens": { label: {"calls", "prompt_tokens", "output_tokens", "compacted", ...} },
+        "gemini_clients": { role: {"calls", "errors", "avg_seconds", "p50", "p95", "histogram"} },
+        "parse_batching": { "batches", "items", "returned", "avg_batch_size", ... } or None,
+        "upload_batching": { "batches", "items", "returned", "avg_batch_size", ... },
+        "timings": { "resumes", "resumes_per_minute", "stages": { stage: {"count", "p50", "p95", ...} } },
+    }
+    """
+    limit = max(1, concurrency or PARSE_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+    print(f"[PARSER] Batch start: {len(filepaths)} file(s), concurrency={limit}")
+
+    start_batch(run_id)
+    summary = new_summary(len(filepaths))
+
+    async def _run_one(filepath: str):
+        queued_at = time.perf_counter()
+        async with semaphore:
+            timing.observe("parse_slot_wait", time.perf_counter() - queued_at)
+            outcome = await process_resume(filepath)
+        # Recorded as soon as this resume finishes, so a timeout or kill of
+        # the chunk does not lose the outcomes of resumes that completed
+        await record_outcome(summary, *outcome)
+
+    # One bulk JD lookup for the whole batch instead of one GET per resume,
+    # while the Gemini clients are built and warmed up
+    await asyncio.gather(
+        prefetch_job_details([extract_resume_id(fp) for fp in filepaths if os.path.exists(fp)]),
+        gemini_clients.warmup_async(),
+    )
+
+    await asyncio.gather(*(_run_one(fp) for fp in filepaths))
+
+    return finish_summary(summary)
+
+
+def parse_resume_batch(filepaths: list, concurrency: int = None, run_id: str = None) -> dict:
+    """Public sync wrapper used by Airflow for a whole batch of files."""
+    return asyncio.run(_run_with_session(parse_resumes_async(filepaths, concurrency=concurrency, run_id=run_id)))
@@ -0,0 +1,311 @@
+# rate_limiter.py
+import os
+import time
+import random
+import asyncio
+import sqlite3
+from collections import deque
+from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
+
+from shared_quota import SharedQuota
+
+load_dotenv()
+
+WINDOW_SECONDS = 60.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Async limiter shared by every call to one upstream API.
+
+    - Enforces requests/min and tokens/min budgets over a sliding 60s window.
+      With `shared` (a SharedQuota) the window is also checked across
+      processes, so parallel Airflow tasks share one quota instead of
+      each using the full budget; otherwise it only covers this process.
+    - Caps in-flight calls with a concurrency limit that adapts to the
+      service: it grows by one slot per window of fast successes and is
+      cut on throttling errors or when latency rises above the target.
+    - Retries `retry_on` errors with exponential backoff and full jitter.
+    - Records how long each call waited in the queue before it started.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: int,
+        tpm: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        target_latency: float = 20.0,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        retry_on: tuple = (),
+        shared: SharedQuota = None,
+    ):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.shared = shared
+
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._requests = deque()      # start timestamps in the current window
+        self._tokens = deque()        # [timestamp, tokens] in the current window
+        self._token_sum = 0
+        self._latency_ewma = None
+        self._cond = None
+        self._loop = None
+        self.reset_stats()
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+
+    async def run(self, call, est_tokens: int = 0, label: str = ""):
+        """
+        Awaits `call()` (a zero-argument coroutine factory) under the limiter.
+        Returns (result, queue_wait_seconds) where queue_wait covers every
+        attempt, including backoff sleeps after throttling.
+        """
+        total_wait = 0.0
+
+        for attempt in range(self.max_retries + 1):
+            waited, entry, reservation = await self._acquire(est_tokens)
+            total_wait += waited
+            started = time.monotonic()
+
+            try:
+                result = await call()
+            except self.retry_on as e:
+                await self._release(time.monotonic() - started, throttled=True)
+                self._stats["throttled"] += 1
+                if attempt >= self.max_retries:
+                    self._stats["gave_up"] += 1
+                    raise
+
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+                print(
+                    f"[LIMITER:{self.name}] {label} throttled ({type(e).__name__}); "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s, limit={self._limit:.1f}"
+                )
+                self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+                total_wait += delay
+                continue
+            except Exception:
+                await self._release(time.monotonic() - started, throttled=False)
+                raise
+
+            await self._release(time.monotonic() - started, throttled=False)
+            await self._record_actual_tokens(result, entry, reservation)
+
+            self._stats["calls"] += 1
+            self._stats["queue_waits"].append(total_wait)
+            if total_wait >= 1.0:
+                print(f"[LIMITER:{self.name}] {label} waited {total_wait:.2f}s in queue")
+            return result, total_wait
+
+    def reset_stats(self):
+        self._stats = {"calls": 0, "retries": 0, "throttled": 0, "gave_up": 0, "queue_waits": []}
+
+    def stats(self) -> dict:
+        waits = sorted(self._stats["queue_waits"])
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3) if waits else 0.0
+
+        return {
+            "calls": self._stats["calls"],
+            "retries": self._stats["retries"],
+            "throttled": self._stats["throttled"],
+            "gave_up": self._stats["gave_up"],
+            "queue_wait_p50": pct(0.50),
+            "queue_wait_p95": pct(0.95),
+            "queue_wait_max": round(waits[-1], 3) if waits else 0.0,
+            "concurrency_limit": round(self._limit, 2),
+            "latency_ewma": round(self._latency_ewma, 3) if self._latency_ewma else None,
+        }
+
+    # -----------------------------------------------------
+    # Internals
+    # -----------------------------------------------------
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one loop; the sync wrappers start a new loop per run
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._cond
+
+    def _prune(self, now: float):
+        while self._requests and now - self._requests[0] >= WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= WINDOW_SECONDS:
+            self._token_sum -= self._tokens.popleft()[1]
+
+    def _budget_wait(self, now: float, tokens: int) -> float:
+        """Seconds until a call costing `tokens` fits in both budgets (0 if it fits now)."""
+        wait = 0.0
+        if self.rpm and len(self._requests) >= self.rpm:
+            wait = max(wait, WINDOW_SECONDS - (now - self._requests[0]))
+
+        if self.tpm and self._tokens and self._token_sum + tokens > self.tpm:
+            # Wait until enough of the oldest entries leave the window
+            excess = self._token_sum + tokens - self.tpm
+            for ts, used in self._tokens:
+                excess -= used
+                if excess <= 0:
+                    wait = max(wait, WINDOW_SECONDS - (now - ts))
+                    break
+        return wait
+
+    async def _shared_reserve(self, tokens: int):
+        """(wait, reservation_id) from the cross-process quota; (0, None) when it is off or unreachable."""
+        if self.shared is None:
+            return 0.0, None
+        try:
+            return await asyncio.to_thread(self.shared.reserve, tokens, self.rpm, self.tpm)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[LIMITER:{self.name}] ⚠️ Shared quota unavailable ({e}); using the per-process budget only")
+            self.shared = None
+            return 0.0, None
+
+    async def _acquire(self, tokens: int):
+        """
+        Waits for a slot and budget; returns (seconds waited, window entry,
+        shared reservation id or None). The slot and local budget are taken
+        under the lock; the shared quota is checked after releasing it, so
+        a slow SQLite reservation does not block the other callers.
+        """
+        cond = self._condition()
+        queued_at = time.monotonic()
+
+        while True:
+            async with cond:
+                while True:
+                    now = time.monotonic()
+                    self._prune(now)
+                    wait = self._budget_wait(now, tokens)
+                    if wait <= 0 and self._in_flight < int(self._limit):
+                        break
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=wait if wait > 0 else None)
+                    except asyncio.TimeoutError:
+                        pass
+
+                self._in_flight += 1
+                entry = [now, tokens]
+                self._requests.append(now)
+                self._tokens.append(entry)
+                self._token_sum += tokens
+
+            wait, reservation = await self._shared_reserve(tokens)
+            if wait <= 0:
+                return time.monotonic() - queued_at, entry, reservation
+
+            # Other processes used the quota: give the slot back and try again later
+            async with cond:
+                self._in_flight = max(0, self._in_flight - 1)
+                self._unrecord(now, entry)
+                cond.notify_all()
+            await asyncio.sleep(wait)
+
+    def _unrecord(self, started: float, entry: list):
+        """Drops a call that never went out from the local window."""
+        if started in self._requests:
+            self._requests.remove(started)
+        if self._in_window(entry):
+            self._tokens.remove(entry)
+            self._token_sum -= entry[1]
+
+    def _in_window(self, entry: list) -> bool:
+        return any(e is entry for e in self._tokens)
+
+    async def _release(self, latency: float, throttled: bool):
+        cond = self._condition()
+        async with cond:
+            self._in_flight = max(0, self._in_flight - 1)
+
+            if throttled:
+                # Multiplicative decrease on quota errors
+                self._limit = max(self.min_concurrency, self._limit / 2)
+            else:
+                self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+                if self._latency_ewma > self.target_latency:
+                    self._limit = max(self.min_concurrency, self._limit * 0.9)
+                else:
+                    # Additive increase: roughly +1 slot per `limit` fast successes
+                    self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+
+            cond.notify_all()
+
+    async def _record_actual_tokens(self, result, entry: list, reservation: int = None):
+        """
+        Replaces the token estimate with the usage Gemini reports, when
+        available. The call's own window entry is amended, so the tokens
+        leave the window when the call does.
+        """
+        usage = getattr(result, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None) if usage else None
+        if actual is None:
+            return
+        delta = int(actual) - entry[1]
+        if delta:
+            if self._in_window(entry):
+                self._token_sum += delta
+            entry[1] = int(actual)
+            if reservation is not None and self.shared is not None:
+                try:
+                    await asyncio.to_thread(self.shared.adjust, reservation, int(actual))
+                except (OSError, sqlite3.Error) as e:
+                    print(f"[LIMITER:{self.name}] ⚠️ Could not update shared token usage: {e}")
+
+
+# -----------------------------------------------------
+# Shared Gemini limiter (parse + question generation)
+# -----------------------------------------------------
+# GEMINI_RPM / GEMINI_TPM are the quota of the whole API key. With
+# GEMINI_SHARED_QUOTA on (default) every process on the host (mapped parse
+# chunks, streaming and retry DAGs) draws from that one budget through
+# GEMINI_QUOTA_DB; with it off each process enforces the full budget on its
+# own, so set GEMINI_RPM/GEMINI_TPM to the key's quota divided by the number
+# of processes that can run at once (e.g. PARSE_PARALLEL_CHUNKS + 2).
+GEMINI_SHARED_QUOTA = os.getenv("GEMINI_SHARED_QUOTA", "true").lower() in ("1", "true", "yes")
+GEMINI_QUOTA_DB = os.getenv("GEMINI_QUOTA_DB", "/app/output/gemini_quota.sqlite3")
+
+GEMINI_LIMITER = AdaptiveRateLimiter(
+    name="gemini",
+    rpm=int(os.getenv("GEMINI_RPM", "150")),
+    tpm=int(os.getenv("GEMINI_TPM", "1000000")),
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    min_concurrency=int(os.getenv("GEMINI_MIN_CONCURRENCY", "1")),
+    target_latency=float(os.getenv("GEMINI_TARGET_LATENCY", "20")),
+    max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "5")),
+    retry_on=(
+        google_exceptions.ResourceExhausted,   # 429
+        google_exceptions.TooManyRequests,     # 429
+        google_exceptions.ServiceUnavailable,  # 503
+    ),
+    shared=SharedQuota(GEMINI_QUOTA_DB, "gemini") if GEMINI_SHARED_QUOTA else None,
+)
+
+
+def estimate_tokens(parts) -> int:
+    """Rough prompt size: ~4 characters per token for text, a flat cost for uploaded files."""
+    if isinstance(parts, str):
+        parts = [parts]
+    total = 0
+    for part in parts:
+        total += len(part) // 4 if isinstance(part, str) else 1500
+    return total
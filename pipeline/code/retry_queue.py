@@ -0,0 +1,90 @@
+# retry_queue.py
+"""
+Retry pass: re-drives resumes whose last attempt failed with a retryable
+error, once their backoff has elapsed.
+
+Failures are queued in the ledger's failures table by ledger.record():
+attempt n waits PIPELINE_RETRY_BASE_SECONDS * 2^(n-1) (capped at
+PIPELINE_RETRY_MAX_DELAY_SECONDS) and after PIPELINE_RETRY_MAX_ATTEMPTS,
+or on a non-retryable error class, the resume is dead-lettered. Due
+resumes go through parse_resumes_async, so the pass uses the same
+PARSE_CONCURRENCY, Gemini limiter and step checkpoints as the main parse.
+
+    python retry_queue.py --limit 200
+"""
+import os
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+import ledger
+import parser as resume_parser
+from extractor import RESUME_DIR
+from http_client import close_session
+
+load_dotenv()
+
+# Resumes re-driven per pass; the rest stay due for the next one
+RETRY_BATCH_LIMIT = int(os.getenv("PIPELINE_RETRY_BATCH_LIMIT", "500"))
+
+
+async def retry_failures_async(concurrency: int = None, limit: int = None, run_id: str = None) -> dict:
+    """
+    Parses every due failure once. Returns the parse_resumes_async summary
+    plus "due", "dead_lettered" (files gone from disk) and "queue"
+    (ledger.failure_stats() after the pass).
+    """
+    due = await asyncio.to_thread(ledger.due_failures, limit or RETRY_BATCH_LIMIT)
+    print(f"[RETRY] {len(due)} failure(s) due for retry.")
+
+    filepaths = []
+    dead_lettered = 0
+    for failure in due:
+        filepath = os.path.join(RESUME_DIR, failure["filename"])
+        if not os.path.exists(filepath):
+            await asyncio.to_thread(
+                ledger.dead_letter, failure["resume_id"], ledger.ERROR_MISSING_FILE, "File missing locally"
+            )
+            dead_lettered += 1
+            continue
+        print(
+            f"[RETRY] {failure['filename']}: attempt {failure['attempts'] + 1} "
+            f"(last error {failure['error_class']}: {failure['error']})"
+        )
+        filepaths.append(filepath)
+
+    if filepaths:
+        summary = await resume_parser.parse_resumes_async(filepaths, concurrency=concurrency, run_id=run_id)
+    else:
+        summary = resume_parser.new_summary()
+
+    summary["due"] = len(due)
+    summary["dead_lettered"] = dead_lettered
+    summary["queue"] = await asyncio.to_thread(ledger.failure_stats)
+    print(f"[RETRY] Queue after pass: {summary['queue']}")
+    return summary
+
+
+def run_retry_pass(concurrency: int = None, limit: int = None, run_id: str = None) -> dict:
+    """Sync wrapper used by the retry DAG and the command line."""
+    async def _main():
+        try:
+            return await retry_failures_async(concurrency=concurrency, limit=limit, run_id=run_id)
+        finally:
+            await close_session()
+
+    return asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--concurrency", type=int, default=None, help="default PARSE_CONCURRENCY")
+    arg_parser.add_argument("--limit", type=int, default=None, help="default PIPELINE_RETRY_BATCH_LIMIT")
+    arg_parser.add_argument("--run-id", default=None, help="tag for timing records")
+    args = arg_parser.parse_args()
+
+    result = run_retry_pass(concurrency=args.concurrency, limit=args.limit, run_id=args.run_id)
+    print(
+        f"[RETRY] Due: {result['due']} | Success: {result['success']} | Failed: {result['failed']} | "
+        f"Dead-lettered (missing file): {result['dead_lettered']}"
+    )
@@ -0,0 +1,187 @@
+# scoring.py
+import os
+import re
+import json
+import threading
+import numpy as np
+
+# Share of the final score taken by weighted JD coverage; the rest is cosine similarity
+COVERAGE_WEIGHT = float(os.getenv("SCORE_COVERAGE_WEIGHT", "0.7"))
+
+# Longest multi-word skill matched in job descriptions (e.g. "google cloud platform")
+MAX_NGRAM = 3
+
+# Optional extra skill terms, one per line, added to SEED_SKILLS
+SCORE_SKILLS_FILE = os.getenv("SCORE_SKILLS_FILE", "")
+
+# Optional fixed term weights as JSON {"term": weight}; listed terms join the
+# vocabulary, unlisted ones weigh 1.0 (see idf_weights() to derive them from a JD corpus)
+SCORE_WEIGHTS_FILE = os.getenv("SCORE_WEIGHTS_FILE", "")
+
+# The vocabulary and weights are fixed per process (seed + files above), never
+# derived from the batch, so a resume scores the same whatever it is batched with
+SEED_SKILLS = [
+    "python", "java", "javascript", "typescript", "golang", "c++", "c#", "sql", "nosql",
+    "azure", "aws", "gcp", "blob", "docker", "kubernetes", "terraform", "linux",
+    "asyncio", "django", "flask", "fastapi", "react", "node.js", "spring",
+    "llm", "machine learning", "deep learning", "nlp", "pytorch", "tensorflow",
+    "pandas", "numpy", "spark", "airflow", "kafka", "redis", "postgresql", "mongodb",
+    "rest api", "graphql", "microservices", "ci/cd", "git", "agile",
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercases and collapses whitespace; keeps +, #, ., / and - (c++, c#, node.js, ci/cd)."""
+    return " ".join(_tokens(skill or ""))
+
+
+def _tokens(text: str) -> list:
+    return [t.rstrip(".-/") for t in _TOKEN_RE.findall(text.lower()) if t.rstrip(".-/")]
+
+
+def _ngrams(text: str) -> set:
+    tokens = _tokens(text)
+    grams = set()
+    for n in range(1, MAX_NGRAM + 1):
+        for i in range(len(tokens) - n + 1):
+            grams.add(" ".join(tokens[i:i + n]))
+    return grams
+
+
+class SkillVocabulary:
+    """
+    Maps skill terms to columns so resumes and JDs become 0/1 vectors
+    over the same vocabulary, with one fixed weight per term.
+    """
+
+    def __init__(self, terms, weights: dict = None):
+        weights = weights or {}
+        self.terms = sorted({t for t in terms if t} | set(weights))
+        self.index = {term: i for i, term in enumerate(self.terms)}
+        self.weights = np.array([weights.get(t, 1.0) for t in self.terms], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @classmethod
+    def build(cls, terms=(), seed=SEED_SKILLS, weights: dict = None):
+        """Vocabulary = seed skills + extra `terms` (+ any weighted terms)."""
+        normalized = {normalize_skill(s) for s in seed}
+        normalized.update(normalize_skill(s) for s in terms if isinstance(s, str))
+        weights = {normalize_skill(t): float(w) for t, w in (weights or {}).items()}
+        return cls(normalized, weights)
+
+    def resume_matrix(self, skill_lists) -> np.ndarray:
+        """(n_resumes, V) matrix; 1 where the resume lists the skill."""
+        matrix = np.zeros((len(skill_lists), len(self)), dtype=np.float32)
+        for row, skills in enumerate(skill_lists):
+            cols = [self.index[t] for t in (normalize_skill(s) for s in (skills or []) if isinstance(s, str)) if t in self.index]
+            matrix[row, cols] = 1.0
+        return matrix
+
+    def jd_matrix(self, job_descriptions) -> np.ndarray:
+        """(n_jobs, V) matrix; 1 where the skill appears in the JD text (up to MAX_NGRAM words)."""
+        matrix = np.zeros((len(job_descriptions), len(self)), dtype=np.float32)
+        for row, text in enumerate(job_descriptions):
+            cols = [self.index[g] for g in _ngrams(text or "") if g in self.index]
+            matrix[row, cols] = 1.0
+        return matrix
+
+
+_default_lock = threading.Lock()
+_default_vocabulary = None
+
+
+def default_vocabulary() -> SkillVocabulary:
+    """The process-wide vocabulary: SEED_SKILLS + SCORE_SKILLS_FILE, weighted by SCORE_WEIGHTS_FILE."""
+    global _default_vocabulary
+    with _default_lock:
+        if _default_vocabulary is None:
+            terms, weights = [], {}
+            if SCORE_SKILLS_FILE:
+                with open(SCORE_SKILLS_FILE, encoding="utf-8") as f:
+                    terms = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            if SCORE_WEIGHTS_FILE:
+                with open(SCORE_WEIGHTS_FILE, encoding="utf-8") as f:
+                    weights = json.load(f)
+            _default_vocabulary = SkillVocabulary.build(terms, weights=weights)
+            print(f"[SCORING] Vocabulary: {len(_default_vocabulary)} terms ({len(weights)} weighted)")
+        return _default_vocabulary
+
+
+def idf_weights(vocab: SkillVocabulary, job_descriptions) -> dict:
+    """
+    Smoothed IDF per term over a reference JD corpus (skills in fewer JDs
+    count for more). Meant to be computed once and saved as SCORE_WEIGHTS_FILE,
+    not per batch.
+    """
+    jobs = vocab.jd_matrix(list(job_descriptions))
+    n_jobs = jobs.shape[0]
+    doc_freq = jobs.sum(axis=0)
+    weights = np.log((1.0 + n_jobs) / (1.0 + doc_freq)) + 1.0
+    return {term: round(float(w), 4) for term, w in zip(vocab.terms, weights)}
+
+
+def _combine(dot, jd_weight, resume_norm, jd_norm) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(jd_weight > 0, dot / jd_weight, 0.0)
+        cosine = np.where((resume_norm > 0) & (jd_norm > 0), dot / (resume_norm * jd_norm), 0.0)
+    score = COVERAGE_WEIGHT * coverage + (1.0 - COVERAGE_WEIGHT) * cosine
+    return np.clip(score, 0.0, 1.0)
+
+
+def score_matrix(resumes: np.ndarray, jobs: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Scores every resume against every job in one pass, with per-term
+    `weights` (vocab.weights; uniform when omitted).
+    Returns an (n_resumes, n_jobs) array of scores in [0, 1].
+    """
+    weights = np.ones(jobs.shape[1], dtype=np.float32) if weights is None else weights
+    weighted_resumes = resumes * weights
+    weighted_jobs = jobs * weights
+
+    dot = weighted_resumes @ jobs.T                   # sum of w over shared skills
+    jd_weight = jobs @ weights                        # sum of w over JD skills
+    resume_norm = np.sqrt((weighted_resumes * resumes).sum(axis=1))
+    jd_norm = np.sqrt((weighted_jobs * jobs).sum(axis=1))
+
+    # cosine over sqrt(w)-scaled vectors: dot / (|r| |j|)
+    return _combine(dot, jd_weight[None, :], resume_norm[:, None], jd_norm[None, :])
+
+
+def score_pairs(resumes: np.ndarray, jobs: np.ndarray, job_index, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Scores resume i against jobs[job_index[i]] for every i in one pass,
+    with per-term `weights` as in score_matrix.
+    Returns an (n_resumes,) array of scores in [0, 1].
+    """
+    weights = np.ones(jobs.shape[1], dtype=np.float32) if weights is None else weights
+    paired_jobs = jobs[np.asarray(job_index, dtype=np.intp)]
+    weighted_resumes = resumes * weights
+
+    dot = (weighted_resumes * paired_jobs).sum(axis=1)
+    jd_weight = paired_jobs @ weights
+    resume_norm = np.sqrt((weighted_resumes * resumes).sum(axis=1))
+    jd_norm = np.sqrt(((paired_jobs * weights) * paired_jobs).sum(axis=1))
+
+    return _combine(dot, jd_weight, resume_norm, jd_norm)
+
+
+def score_batch(parsed_list: list, job_descriptions: list, vocab: SkillVocabulary = None) -> list:
+    """
+    Scores parsed_list[i] against job_descriptions[i] for a whole batch.
+    Identical JD texts are vectorised once. Returns scores rounded to 2 dp.
+    """
+    vocab = vocab or default_vocabulary()
+    skill_lists = [(p or {}).get("skills") or [] for p in parsed_list]
+
+    unique_jds = list(dict.fromkeys(jd or "" for jd in job_descriptions))
+    jd_pos = {jd: i for i, jd in enumerate(unique_jds)}
+
+    resumes = vocab.resume_matrix(skill_lists)
+    jobs = vocab.jd_matrix(unique_jds)
+    scores = score_pairs(resumes, jobs, [jd_pos[jd or ""] for jd in job_descriptions], vocab.weights)
+
+    return [round(float(s), 2) for s in scores]
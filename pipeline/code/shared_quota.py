@@ -0,0 +1,90 @@
+# shared_quota.py
+import os
+import time
+import sqlite3
+
+# One sliding window per upstream API, shared by every process on the host
+# (mapped parse tasks, the streaming and retry DAGs, the CLI)
+WINDOW_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_calls (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    name   TEXT NOT NULL,
+    ts     REAL NOT NULL,
+    tokens INTEGER NOT NULL
+)
+"""
+
+
+class SharedQuota:
+    """
+    Requests/min and tokens/min budget kept in a SQLite file, so that
+    several processes using the same API key stay within one quota
+    instead of each using the full budget. Every reservation runs in a
+    BEGIN IMMEDIATE transaction, so processes see each other's calls.
+    """
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.name = name
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS quota_calls_name_ts ON quota_calls (name, ts)")
+            self._ready = True
+        return conn
+
+    def reserve(self, tokens: int, rpm: int, tpm: int):
+        """
+        Records one call costing `tokens` if it fits both budgets right now.
+        Returns (0.0, reservation_id) on success, otherwise (seconds to wait, None).
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            conn.execute(
+                "DELETE FROM quota_calls WHERE name = ? AND ts < ?", (self.name, now - WINDOW_SECONDS)
+            )
+            rows = conn.execute(
+                "SELECT ts, tokens FROM quota_calls WHERE name = ? ORDER BY ts", (self.name,)
+            ).fetchall()
+
+            wait = 0.0
+            if rpm and len(rows) >= rpm:
+                wait = max(wait, WINDOW_SECONDS - (now - rows[len(rows) - rpm][0]))
+
+            used = sum(t for _, t in rows)
+            if tpm and rows and used + tokens > tpm:
+                excess = used + tokens - tpm
+                for ts, t in rows:
+                    excess -= t
+                    if excess <= 0:
+                        wait = max(wait, WINDOW_SECONDS - (now - ts))
+                        break
+
+            if wait > 0:
+                conn.execute("ROLLBACK")
+                return wait, None
+
+            cur = conn.execute(
+                "INSERT INTO quota_calls (name, ts, tokens) VALUES (?, ?, ?)", (self.name, now, tokens)
+            )
+            conn.execute("COMMIT")
+            return 0.0, cur.lastrowid
+        finally:
+            conn.close()
+
+    def adjust(self, reservation_id: int, tokens: int):
+        """Replaces a reservation's token estimate with the actual usage."""
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE quota_calls SET tokens = ? WHERE id = ?", (tokens, reservation_id))
+        finally:
+            conn.close()
@@ -0,0 +1,133 @@
+# streaming.py
+"""
+Streaming mode: parse resumes while the blob sync is still downloading.
+
+Each file that lands on disk is pushed onto a bounded asyncio.Queue and
+picked up by PARSE_CONCURRENCY parser workers straight away. When the
+queue is full the download worker threads block in their callback, so at
+most STREAM_QUEUE_SIZE + BLOB_DOWNLOAD_WORKERS downloaded files wait for
+a parser at any time and memory only ever holds file paths.
+
+    python streaming.py --concurrency 8 --queue-size 16
+"""
+import os
+import time
+import asyncio
+import argparse
+from dotenv import load_dotenv
+
+import parser as resume_parser
+import gemini_clients
+import timing
+from blob_utils import download_resumes_from_blob
+from extractor import RESUME_DIR, is_resume_file, list_resume_files
+from http_client import close_session
+from ledger import select_unprocessed
+
+load_dotenv()
+
+# Downloaded files allowed to wait for a parser before downloads pause
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "16"))
+
+
+async def stream_resumes_async(concurrency: int = None, queue_size: int = None, run_id: str = None,
+                               download=download_resumes_from_blob) -> dict:
+    """
+    Downloads and parses in one event loop. Files changed in blob storage
+    are parsed as soon as they are downloaded; afterwards any file already
+    on disk that the ledger still lists as unprocessed is queued too.
+    Returns the same summary dict as parse_resumes_async, plus
+    "already_done" (files skipped because the ledger marks them done).
+    """
+    limit = max(1, concurrency or resume_parser.PARSE_CONCURRENCY)
+    queue = asyncio.Queue(maxsize=max(1, queue_size or STREAM_QUEUE_SIZE))
+    loop = asyncio.get_running_loop()
+
+    resume_parser.start_batch(run_id)
+    summary = resume_parser.new_summary()
+    summary["already_done"] = 0
+    seen = set()
+
+    print(f"[STREAM] Starting: {limit} parser worker(s), queue size {queue.maxsize}")
+
+    async def _put(filepath: str):
+        # Runs on the loop thread only, so `seen` needs no lock
+        if filepath in seen:
+            return
+        seen.add(filepath)
+        summary["total"] += 1
+        await queue.put((filepath, time.perf_counter()))
+
+    def _on_downloaded(filepath: str):
+        # Called from blob download threads; blocks while the queue is full
+        if is_resume_file(filepath):
+            asyncio.run_coroutine_threadsafe(_put(filepath), loop).result()
+
+    async def _produce():
+        print("[STREAM] Syncing blobs; parsing starts with the first download...")
+        with timing.span("blob_sync"):
+            await asyncio.to_thread(download, on_downloaded=_on_downloaded)
+
+        # Unchanged files an earlier run did not finish (failed, or never parsed)
+        paths = [os.path.join(RESUME_DIR, f) for f in list_resume_files()]
+        with timing.span("ledger_select"):
+            pending = await asyncio.to_thread(select_unprocessed, paths)
+        leftovers = [p for p in pending if p not in seen]
+        print(f"[STREAM] Blob sync done; queueing {len(leftovers)} earlier unprocessed file(s).")
+        for filepath in leftovers:
+            await _put(filepath)
+
+    async def _consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            filepath, queued_at = item
+            timing.observe("stream_queue_wait", time.perf_counter() - queued_at)
+            try:
+                if not await asyncio.to_thread(select_unprocessed, [filepath]):
+                    print(f"[STREAM] {os.path.basename(filepath)} already processed; skipping.")
+                    summary["already_done"] += 1
+                    continue
+
+                outcome = await resume_parser.process_resume(filepath)
+                await resume_parser.record_outcome(summary, *outcome)
+            except Exception as e:
+                # Keep the worker alive, otherwise a full queue would stall the downloads
+                print(f"[STREAM] ❌ Worker error on {filepath}: {e}")
+                await resume_parser.record_outcome(summary, filepath, None, f"Stream Error: {e}")
+
+    await gemini_clients.warmup_async()
+    workers = [asyncio.create_task(_consume()) for _ in range(limit)]
+    try:
+        await _produce()
+    finally:
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    print(f"[STREAM] Done: {summary['total']} queued | {summary['already_done']} already processed")
+    return resume_parser.finish_summary(summary)
+
+
+def run_streaming(concurrency: int = None, queue_size: int = None, run_id: str = None) -> dict:
+    """Sync wrapper used by the streaming DAG and the command line."""
+    async def _main():
+        try:
+            return await stream_resumes_async(concurrency=concurrency, queue_size=queue_size, run_id=run_id)
+        finally:
+            await close_session()
+
+    return asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--concurrency", type=int, default=None, help="parser workers (default PARSE_CONCURRENCY)")
+    arg_parser.add_argument("--queue-size", type=int, default=None, help="default STREAM_QUEUE_SIZE")
+    arg_parser.add_argument("--run-id", default=None, help="tag for timing records")
+    args = arg_parser.parse_args()
+
+    result = run_streaming(concurrency=args.concurrency, queue_size=args.queue_size, run_id=args.run_id)
+    print(f"[STREAM] Success: {result['success']} | Failed: {result['failed']} | Already done: {result['already_done']}")
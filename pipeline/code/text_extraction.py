@@ -0,0 +1,106 @@
+# text_extraction.py
+import os
+import time
+import fitz  # PyMuPDF
+import docx
+from dotenv import load_dotenv
+from ocr import run_ocr_on_pdf
+
+load_dotenv()
+
+LOCAL_EXTRACTION_ENABLED = os.getenv("LOCAL_EXTRACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# A PDF with fewer characters than this in its text layer is treated as image-only
+MIN_PDF_TEXT_CHARS = int(os.getenv("MIN_PDF_TEXT_CHARS", "200"))
+
+# Paths a resume can take before reaching the model
+PATHS = ("pdf_text", "docx", "txt", "ocr", "upload")
+
+# Per-run counters: how many files took each path and the time spent there
+STATS = {path: {"count": 0, "seconds": 0.0} for path in PATHS}
+
+
+def record(path: str, seconds: float):
+    STATS[path]["count"] += 1
+    STATS[path]["seconds"] += seconds
+
+
+def reset_stats():
+    for path in PATHS:
+        STATS[path] = {"count": 0, "seconds": 0.0}
+
+
+def stats() -> dict:
+    return {
+        path: {
+            "count": v["count"],
+            "seconds": round(v["seconds"], 3),
+            "avg_seconds": round(v["seconds"] / v["count"], 3) if v["count"] else 0.0,
+        }
+        for path, v in STATS.items()
+    }
+
+
+def _read_txt(filepath: str) -> str:
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _read_docx(filepath: str) -> str:
+    document = docx.Document(filepath)
+    lines = [p.text for p in document.paragraphs if p.text.strip()]
+
+    # Many CV templates keep contact details and skills inside tables
+    for table in document.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                lines.append(" | ".join(cells))
+
+    return "\n".join(lines)
+
+
+def _read_pdf_text_layer(filepath: str) -> str:
+    with fitz.open(filepath) as pdf:
+        return "\n".join(page.get_text() for page in pdf)
+
+
+def extract_text(filepath: str):
+    """
+    Pulls plain text from a resume without any Gemini file upload.
+
+    Returns (text, path) where path is one of PATHS. Text-layer PDFs, DOCX
+    and TXT are read directly; image-only PDFs go through OCR. If nothing
+    usable is found, returns (None, "upload") so the caller falls back to
+    uploading the original file. Only local paths are recorded here; the
+    caller records the upload path once it knows how long it took.
+    """
+    if not LOCAL_EXTRACTION_ENABLED:
+        return None, "upload"
+
+    ext = os.path.splitext(filepath)[1].lower()
+    start = time.perf_counter()
+
+    try:
+        if ext == ".txt":
+            text, path = _read_txt(filepath), "txt"
+        elif ext == ".docx":
+            text, path = _read_docx(filepath), "docx"
+        elif ext == ".pdf":
+            text, path = _read_pdf_text_layer(filepath), "pdf_text"
+            if len(text.strip()) < MIN_PDF_TEXT_CHARS:
+                print(f"[EXTRACT_TEXT] No usable text layer in {os.path.basename(filepath)}; running OCR...")
+                text, path = run_ocr_on_pdf(filepath), "ocr"
+        else:
+            return None, "upload"
+
+    except Exception as e:
+        print(f"[EXTRACT_TEXT] ⚠️ Local extraction failed for {filepath}: {e}")
+        return None, "upload"
+
+    if not text or not text.strip():
+        print(f"[EXTRACT_TEXT] ⚠️ No text extracted from {filepath}; falling back to upload.")
+        return None, "upload"
+
+    record(path, time.perf_counter() - start)
+    return text.strip(), path
@@ -0,0 +1,280 @@
+# timing.py
+import os
+import json
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OUTPUT_DIR = "/app/output"
+
+# One JSONL file per run (next to the batch manifests), so a summary reads
+# only its own run and old runs can be deleted as whole files
+TIMING_LOG_DIR = os.getenv("PIPELINE_TIMING_DIR", os.path.join(OUTPUT_DIR, "timings"))
+TIMING_LOG_MAX_AGE = float(os.getenv("PIPELINE_TIMING_MAX_AGE_DAYS", "7")) * 24 * 3600
+
+# Stage -> seconds for the resume being processed by the current task.
+# asyncio tasks inherit the context, so helpers deep in the call stack
+# add to the right resume without it being passed around.
+_current = contextvars.ContextVar("timing_record", default=None)
+
+_lock = threading.Lock()
+_samples = {}          # stage -> [seconds, ...] for every span in this run
+_counts = {}           # counter -> total for this run (e.g. prompt tokens)
+_run = {"run_id": None, "started": None, "resumes": 0}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def log_path(run_id: str = None) -> str:
+    """Timing log of one run (same file naming as the batch manifests)."""
+    name = "".join(c if c.isalnum() or c in "-_." else "_" for c in run_id or "manual")
+    return os.path.join(TIMING_LOG_DIR, f"{name}.jsonl")
+
+
+def _percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+# -----------------------------------------------------
+# Run lifecycle
+# -----------------------------------------------------
+
+def start_run(run_id: str = None):
+    """
+    Clears in-process samples; records written from now on carry `run_id`
+    and go to its log. Runs without an id (CLI) get a fresh timestamped one
+    each time, so consecutive runs in one process never share a log.
+    """
+    run_id = run_id or f"manual__{datetime.now(timezone.utc):%Y%m%dT%H%M%S.%f}"
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _run.update(run_id=run_id, started=time.time(), resumes=0)
+
+
+def observe(stage: str, seconds: float):
+    """Adds one duration for `stage` to the run samples and the current resume."""
+    with _lock:
+        _samples.setdefault(stage, []).append(seconds)
+
+    record = _current.get()
+    if record is not None:
+        record["stages"][stage] = round(record["stages"].get(stage, 0.0) + seconds, 3)
+
+
+def count(name: str, n: int):
+    """Adds `n` to a counter (e.g. tokens) for the run and the current resume."""
+    with _lock:
+        _counts[name] = _counts.get(name, 0) + n
+
+    record = _current.get()
+    if record is not None:
+        record.setdefault("counts", {})
+        record["counts"][name] = record["counts"].get(name, 0) + n
+
+
+@contextmanager
+def span(stage: str):
+    """Times the enclosed block (sync or async code) as `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """Decorator: times every call of an async function as `stage`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------
+# Per-resume records
+# -----------------------------------------------------
+
+def start_record(resume_id: str) -> dict:
+    """Starts the timing record for one resume in the current async task."""
+    record = {
+        "kind": "resume",
+        "run_id": _run["run_id"],
+        "resume_id": resume_id,
+        "started_at": _now_iso(),
+        "_start": time.perf_counter(),
+        "stages": {},
+    }
+    _current.set(record)
+    return record
+
+
+def detach():
+    """Stops attributing spans in the current task to a resume (run samples only)."""
+    _current.set(None)
+
+
+def finish_record(record: dict, **fields) -> dict:
+    """Closes the record, appends it to the JSONL log and returns its stages."""
+    total = time.perf_counter() - record.pop("_start")
+    record["stages"]["total"] = round(total, 3)
+    record["finished_at"] = _now_iso()
+    record.update(fields)
+
+    with _lock:
+        _samples.setdefault("total", []).append(total)
+        _run["resumes"] += 1
+
+    write_record(record)
+    return record["stages"]
+
+
+def write_record(record: dict):
+    """Appends one JSON line to its run's timing log; logging never breaks the pipeline."""
+    try:
+        os.makedirs(TIMING_LOG_DIR, exist_ok=True)
+        line = json.dumps(record, default=str)
+        with _lock, open(log_path(record.get("run_id")), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"[TIMING] ⚠️ Could not write timing record: {e}")
+
+
+def prune_logs(max_age: float = None) -> int:
+    """Deletes run logs older than PIPELINE_TIMING_MAX_AGE_DAYS. Returns how many."""
+    if not os.path.isdir(TIMING_LOG_DIR):
+        return 0
+
+    cutoff = time.time() - (max_age if max_age is not None else TIMING_LOG_MAX_AGE)
+    removed = 0
+    for name in os.listdir(TIMING_LOG_DIR):
+        path = os.path.join(TIMING_LOG_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            print(f"[TIMING] ⚠️ Could not prune {path}: {e}")
+    return removed
+
+
+# -----------------------------------------------------
+# Summaries
+# -----------------------------------------------------
+
+def summarize_samples(samples: dict, resumes: int, elapsed: float, counts: dict = None) -> dict:
+    """p50/p95/max/total seconds per stage plus resumes/minute and counter totals."""
+    stages = {}
+    for stage, values in samples.items():
+        values = sorted(values)
+        if not values:
+            continue
+        stages[stage] = {
+            "count": len(values),
+            "p50": round(_percentile(values, 0.50), 3),
+            "p95": round(_percentile(values, 0.95), 3),
+            "max": round(values[-1], 3),
+            "total": round(sum(values), 3),
+        }
+
+    return {
+        "resumes": resumes,
+        "elapsed_seconds": round(elapsed, 3),
+        "resumes_per_minute": round(resumes * 60.0 / elapsed, 2) if elapsed > 0 else 0.0,
+        "stages": stages,
+        "counts": dict(counts or {}),
+    }
+
+
+def stage_record(kind: str) -> dict:
+    """
+    Writes the raw samples collected since start_run() as one record, for
+    steps that are not per resume (e.g. blob download in the extract task).
+    """
+    with _lock:
+        samples = {stage: [round(v, 3) for v in values] for stage, values in _samples.items()}
+    record = {"kind": kind, "run_id": _run["run_id"], "finished_at": _now_iso(), "samples": samples}
+    write_record(record)
+    return record
+
+
+def summary() -> dict:
+    """Summary of every span recorded in this process since start_run()."""
+    with _lock:
+        samples = {stage: list(values) for stage, values in _samples.items()}
+        counts = dict(_counts)
+        resumes = _run["resumes"]
+        started = _run["started"]
+    elapsed = time.time() - started if started else 0.0
+    return summarize_samples(samples, resumes, elapsed, counts)
+
+
+def summarize_log(run_id: str, path: str = None) -> dict:
+    """
+    Summary for one run from its JSONL log, so stages spread over several
+    processes (e.g. mapped Airflow tasks) can be reported together.
+    Resume records contribute per-resume stage totals, stage records
+    (e.g. the extract step) their raw samples. Throughput uses the wall
+    time from the first resume started to the last one finished.
+    """
+    samples = {}
+    counts = {}
+    resumes = 0
+    first = last = None
+
+    try:
+        with open(path or log_path(run_id), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("run_id") != run_id:
+                    continue
+
+                for stage, seconds in (record.get("stages") or {}).items():
+                    samples.setdefault(stage, []).append(seconds)
+                for stage, values in (record.get("samples") or {}).items():
+                    samples.setdefault(stage, []).extend(values)
+                for name, n in (record.get("counts") or {}).items():
+                    counts[name] = counts.get(name, 0) + n
+
+                if record.get("kind") == "resume":
+                    resumes += 1
+                    first = min(first, record["started_at"]) if first else record["started_at"]
+                    last = max(last, record["finished_at"]) if last else record["finished_at"]
+    except FileNotFoundError:
+        pass
+
+    elapsed = 0.0
+    if first and last:
+        elapsed = (datetime.fromisoformat(last) - datetime.fromisoformat(first)).total_seconds()
+    return summarize_samples(samples, resumes, elapsed, counts)
+
+
+def format_summary(summary_dict: dict) -> list:
+    """Printable lines, slowest stages (by total time) first."""
+    lines = [
+        f"{summary_dict['resumes']} resume(s) in {summary_dict['elapsed_seconds']}s "
+        f"({summary_dict['resumes_per_minute']} resumes/min)"
+    ]
+    ordered = sorted(summary_dict["stages"].items(), key=lambda item: item[1]["total"], reverse=True)
+    for stage, s in ordered:
+        lines.append(
+            f"{stage:<24} n={s['count']:<5} p50={s['p50']:.3f}s p95={s['p95']:.3f}s "
+            f"max={s['max']:.3f}s total={s['total']:.1f}s"
+        )
+    for name, n in sorted(summary_dict.get("counts", {}).items()):
+        lines.append(f"{name:<24} total={n}")
+    return lines
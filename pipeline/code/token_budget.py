@@ -0,0 +1,195 @@
+# token_budget.py
+"""
+Prompt token budgeting for Gemini calls.
+
+Question generation inlines the job description and the candidate's
+skills / experience / summary. Long resumes and JDs are compacted here to
+QUESTIONS_PROMPT_TOKEN_BUDGET before the prompt is built: whitespace and
+repeated lines are dropped first, then the longest parts are trimmed at
+line or sentence boundaries. Nothing is summarized with an extra LLM call,
+so compaction never adds latency.
+
+Every call's tokens in/out (Gemini's usage_metadata, else the estimate)
+are added to the run stats and to the resume's timing record, so latency
+can be charted against prompt size from the run's timing log.
+"""
+import os
+import re
+import json
+import threading
+from dotenv import load_dotenv
+
+import timing
+from rate_limiter import estimate_tokens
+
+load_dotenv()
+
+# Prompt budget for question generation (0 disables compaction)
+QUESTIONS_PROMPT_TOKEN_BUDGET = int(os.getenv("QUESTIONS_PROMPT_TOKEN_BUDGET", "3000"))
+
+# Share of the variable budget given to the JD; the candidate gets the rest
+JD_BUDGET_SHARE = float(os.getenv("QUESTIONS_JD_BUDGET_SHARE", "0.4"))
+
+# Longest single experience field kept before trimming the list itself
+EXPERIENCE_FIELD_MAX_CHARS = int(os.getenv("EXPERIENCE_FIELD_MAX_CHARS", "600"))
+
+TRUNCATION_MARK = " …"
+
+_lock = threading.Lock()
+STATS = {}  # label -> {"calls", "compacted", "original_tokens", "prompt_tokens", "output_tokens"}
+
+
+def reset_stats():
+    with _lock:
+        STATS.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        out = {}
+        for label, s in STATS.items():
+            out[label] = dict(s)
+            if s["compacted"] and s["original_tokens"]:
+                out[label]["saved_pct"] = round(100 * (1 - s["budgeted_tokens"] / s["original_tokens"]), 1)
+        return out
+
+
+# -----------------------------------------------------
+# Compaction
+# -----------------------------------------------------
+
+def normalize_text(text: str) -> str:
+    """Collapses runs of whitespace and drops blank and repeated lines."""
+    seen = set()
+    lines = []
+    for line in (text or "").splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        key = line.lower()
+        if not line or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cuts `text` to about `max_tokens`, preferring a line or sentence boundary."""
+    max_chars = max(0, max_tokens) * 4
+    if len(text) <= max_chars:
+        return text
+
+    cut = text[:max_chars]
+    boundary = max(cut.rfind("\n"), cut.rfind(". "))
+    if boundary > max_chars // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def _compact_entry(entry, max_chars: int):
+    if isinstance(entry, str):
+        return truncate_text(re.sub(r"\s+", " ", entry).strip(), max_chars // 4)
+    if isinstance(entry, dict):
+        return {k: _compact_entry(v, max_chars) for k, v in entry.items() if v not in (None, "", [], {})}
+    if isinstance(entry, list):
+        return [_compact_entry(v, max_chars) for v in entry]
+    return entry
+
+
+def compact_candidate(skills, experience, summary, max_tokens: int) -> str:
+    """
+    Candidate JSON for the questions prompt, within about `max_tokens`.
+    Long fields are trimmed first; if that is not enough, the summary is
+    shortened and the oldest experience entries (end of the list) dropped.
+    """
+    def _dump(exp, summ):
+        return json.dumps({"skills": skills, "experience": exp, "summary": summ}, ensure_ascii=False)
+
+    candidate_json = _dump(experience, summary)
+    if estimate_tokens(candidate_json) <= max_tokens:
+        return candidate_json
+
+    experience = _compact_entry(experience, EXPERIENCE_FIELD_MAX_CHARS)
+    if isinstance(summary, str):
+        summary = truncate_text(normalize_text(summary), max(50, max_tokens // 6))
+    candidate_json = _dump(experience, summary)
+
+    dropped = 0
+    while estimate_tokens(candidate_json) > max_tokens and isinstance(experience, list) and len(experience) > 1:
+        experience = experience[:-1]
+        dropped += 1
+        candidate_json = _dump(experience + [f"({dropped} earlier role(s) omitted)"], summary)
+
+    # Still over (one huge entry, or a non-list field): hard cut, JSON is only read by the model
+    if estimate_tokens(candidate_json) > max_tokens:
+        candidate_json = truncate_text(candidate_json, max_tokens)
+    return candidate_json
+
+
+def fit_questions_prompt(template: str, job_description: str, skills, experience, summary,
+                         budget: int = None) -> tuple:
+    """
+    Builds the question-generation prompt within `budget` tokens
+    (QUESTIONS_PROMPT_TOKEN_BUDGET by default). Returns (prompt, info) where
+    info has original_tokens, prompt_tokens and compacted.
+    """
+    budget = QUESTIONS_PROMPT_TOKEN_BUDGET if budget is None else budget
+    full_candidate = json.dumps(
+        {"skills": skills, "experience": experience, "summary": summary}, ensure_ascii=False
+    )
+    prompt = template.format(job_description=job_description, candidate_json=full_candidate)
+    original = estimate_tokens(prompt)
+    if budget <= 0 or original <= budget:
+        return prompt, {"original_tokens": original, "prompt_tokens": original, "compacted": False}
+
+    job_description = normalize_text(job_description or "")
+    overhead = estimate_tokens(template.format(job_description="", candidate_json=""))
+    available = max(200, budget - overhead)
+
+    # The JD gets its share; whatever it does not need goes to the candidate
+    jd_budget = min(estimate_tokens(job_description), int(available * JD_BUDGET_SHARE))
+    candidate_json = compact_candidate(skills, experience, summary, available - jd_budget)
+    # ...and what the candidate does not need goes back to the JD
+    jd_budget = available - estimate_tokens(candidate_json)
+    job_description = truncate_text(job_description, jd_budget)
+
+    prompt = template.format(job_description=job_description, candidate_json=candidate_json)
+    tokens = estimate_tokens(prompt)
+    print(f"[BUDGET] Questions prompt compacted: ~{original} -> ~{tokens} tokens (budget {budget})")
+    return prompt, {"original_tokens": original, "prompt_tokens": tokens, "compacted": True}
+
+
+# -----------------------------------------------------
+# Usage accounting
+# -----------------------------------------------------
+
+def record_usage(label: str, response, est_prompt_tokens: int, original_tokens: int = None,
+                 compacted: bool = False) -> dict:
+    """
+    Adds one call's tokens in/out to the run stats and the current resume's
+    timing record (as "<label>_prompt_tokens" / "<label>_output_tokens").
+    Uses Gemini's usage_metadata when present, else the estimate.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or est_prompt_tokens
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    if output_tokens is None:
+        output_tokens = estimate_tokens(getattr(response, "text", "") or "")
+
+    with _lock:
+        s = STATS.setdefault(label, {
+            "calls": 0, "compacted": 0, "original_tokens": 0, "budgeted_tokens": 0,
+            "prompt_tokens": 0, "output_tokens": 0,
+        })
+        s["calls"] += 1
+        s["prompt_tokens"] += int(prompt_tokens)
+        s["output_tokens"] += int(output_tokens)
+        if compacted:
+            s["compacted"] += 1
+            s["original_tokens"] += original_tokens or est_prompt_tokens
+            s["budgeted_tokens"] += est_prompt_tokens
+
+    timing.count(f"{label}_prompt_tokens", int(prompt_tokens))
+    timing.count(f"{label}_output_tokens", int(output_tokens))
+    if original_tokens is not None:
+        timing.count(f"{label}_original_tokens", int(original_tokens))
+    return {"prompt_tokens": int(prompt_tokens), "output_tokens": int(output_tokens)}
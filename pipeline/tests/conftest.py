@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# Pipeline modules are flat files in code/, imported the same way the DAGs do
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code"))
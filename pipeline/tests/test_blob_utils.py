@@ -0,0 +1,72 @@
+# test_blob_utils.py
+"""Incremental blob sync against an in-memory container."""
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import blob_utils
+
+
+class FakeContainer:
+    def __init__(self, blobs: dict):
+        self.blobs = blobs       # name -> bytes
+        self.downloads = []
+
+    def list_blobs(self, name_starts_with=""):
+        modified = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        return [
+            SimpleNamespace(name=name, etag=f'"{hash(data)}"', size=len(data), last_modified=modified)
+            for name, data in self.blobs.items() if name.startswith(name_starts_with)
+        ]
+
+    def download_blob(self, blob, max_concurrency=1):
+        self.downloads.append(blob.name)
+        data = self.blobs[blob.name]
+        return SimpleNamespace(readinto=lambda f: f.write(data))
+
+
+@pytest.fixture
+def container(tmp_path, monkeypatch):
+    fake = FakeContainer({"resumes/a.txt": b"Jane Doe", "resumes/b.txt": b"John Roe"})
+    monkeypatch.setattr(blob_utils, "CONNECTION_STRING", "fake")
+    monkeypatch.setattr(blob_utils, "CONTAINER_NAME", "fake")
+    monkeypatch.setattr(blob_utils, "LOCAL_DOWNLOAD_PATH", str(tmp_path / "resumes"))
+    monkeypatch.setattr(blob_utils, "MANIFEST_PATH", str(tmp_path / "blob_manifest.json"))
+    monkeypatch.setattr(blob_utils, "get_container_client", lambda: fake)
+    return fake
+
+
+def test_second_sync_skips_unchanged_blobs(container):
+    assert blob_utils.download_resumes_from_blob() == 2
+    assert blob_utils.download_resumes_from_blob() == 0
+    assert len(container.downloads) == 2
+    assert blob_utils.LAST_SYNC["unchanged"] == 2
+
+
+def test_changed_blob_is_downloaded_again(container):
+    blob_utils.download_resumes_from_blob()
+    container.blobs["resumes/a.txt"] = b"Jane Doe, updated"
+
+    assert blob_utils.download_resumes_from_blob() == 1
+    assert blob_utils.LAST_SYNC["changed"] == ["a.txt"]
+
+
+def test_deleted_local_file_is_downloaded_again_even_before_the_watermark(container):
+    blob_utils.download_resumes_from_blob()
+    assert blob_utils.load_manifest()["watermark"] is not None
+    os.remove(os.path.join(blob_utils.LOCAL_DOWNLOAD_PATH, "a.txt"))
+
+    assert blob_utils.download_resumes_from_blob() == 1
+    with open(os.path.join(blob_utils.LOCAL_DOWNLOAD_PATH, "a.txt"), "rb") as f:
+        assert f.read() == b"Jane Doe"
+
+
+def test_truncated_local_file_is_downloaded_again(container):
+    blob_utils.download_resumes_from_blob()
+    with open(os.path.join(blob_utils.LOCAL_DOWNLOAD_PATH, "b.txt"), "wb") as f:
+        f.write(b"John")
+
+    assert blob_utils.download_resumes_from_blob() == 1
+    assert blob_utils.LAST_SYNC["changed"] == ["b.txt"]
@@ -0,0 +1,105 @@
+# test_http_client.py
+"""
+Retry rules of the shared backend client, against a local aiohttp server.
+
+    cd pipeline && python -m pytest tests
+"""
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import http_client
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF", 0.0)
+    monkeypatch.setattr(http_client, "HTTP_RETRIES", 3)
+
+
+def _serve(statuses: list, method: str = "POST", retry: bool = None, path: str = "/x"):
+    """
+    Runs one request against a server that answers with `statuses` in turn
+    (the last one repeats). Returns ((status, body), number of hits).
+    """
+    hits = []
+
+    async def handler(request):
+        hits.append(request.method)
+        status = statuses[min(len(hits), len(statuses)) - 1]
+        return web.json_response({"hit": len(hits)}, status=status)
+
+    async def main():
+        app = web.Application()
+        app.router.add_route("*", path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await http_client.request(method, f"http://127.0.0.1:{port}{path}", retry=retry, json={})
+        finally:
+            await http_client.close_session()
+            await runner.cleanup()
+
+    return asyncio.run(main()), len(hits)
+
+
+def test_post_is_not_resent_after_a_server_error():
+    (status, body), hits = _serve([503, 201], method="POST")
+    assert (status, hits) == (503, 1)
+
+
+def test_post_is_resent_after_429():
+    (status, body), hits = _serve([429, 201], method="POST")
+    assert (status, body, hits) == (201, {"hit": 2}, 2)
+
+
+def test_post_with_retry_is_resent():
+    (status, _), hits = _serve([503, 503, 201], method="POST", retry=True)
+    assert (status, hits) == (201, 3)
+
+
+def test_get_is_retried_until_success():
+    (status, body), hits = _serve([502, 504, 200], method="GET")
+    assert (status, body, hits) == (200, {"hit": 3}, 3)
+
+
+def test_get_gives_up_after_http_retries():
+    (status, _), hits = _serve([503], method="GET")
+    assert (status, hits) == (503, http_client.HTTP_RETRIES + 1)
+
+
+def test_client_errors_are_not_retried():
+    (status, _), hits = _serve([404], method="GET")
+    assert (status, hits) == (404, 1)
+
+
+def test_post_is_not_resent_after_a_timeout(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_TIMEOUT", 0.2)
+    hits = []
+
+    async def slow(request):
+        hits.append(1)
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/slow", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await http_client.request("POST", f"http://127.0.0.1:{port}/slow", json={})
+        finally:
+            await http_client.close_session()
+            await runner.cleanup()
+
+    asyncio.run(main())
+    assert len(hits) == 1
@@ -0,0 +1,221 @@
+# test_ledger.py
+"""
+Ledger behaviour the retry queue and the step checkpoints rely on.
+
+    cd pipeline && python -m pytest tests
+"""
+import time
+import threading
+
+import pytest
+
+import ledger
+
+
+@pytest.fixture(autouse=True)
+def isolated_ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_PATH", str(tmp_path / "ledger.sqlite3"))
+    monkeypatch.setattr(ledger, "RETRY_BASE_SECONDS", 10.0)
+    monkeypatch.setattr(ledger, "RETRY_MAX_DELAY_SECONDS", 60.0)
+    monkeypatch.setattr(ledger, "RETRY_MAX_ATTEMPTS", 3)
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume-1.txt"
+    path.write_text("Jane Doe\njane@example.com\nPython, Docker")
+    return str(path)
+
+
+def _failure(resume_id: str) -> dict:
+    with ledger._connect() as conn:
+        row = conn.execute("SELECT * FROM failures WHERE resume_id = ?", (resume_id,)).fetchone()
+        return dict(row) if row else None
+
+
+def _state(resume_id: str) -> str:
+    with ledger._connect() as conn:
+        row = conn.execute("SELECT state FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        return row["state"] if row else None
+
+
+def _make_due(resume_id: str):
+    with ledger._connect() as conn:
+        conn.execute("UPDATE failures SET next_retry_at = ? WHERE resume_id = ?", (time.time() - 1, resume_id))
+
+
+# -----------------------------------------------------
+# Retry queue
+# -----------------------------------------------------
+
+def test_backoff_doubles_per_attempt_and_is_capped():
+    assert [ledger._retry_delay(n) for n in range(1, 6)] == [10.0, 20.0, 40.0, 60.0, 60.0]
+
+
+def test_failure_is_scheduled_after_backoff(resume):
+    before = time.time()
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+
+    failure = _failure("resume-1")
+    assert failure["attempts"] == 1
+    assert failure["dead_letter"] == 0
+    assert before + 10.0 <= failure["next_retry_at"] <= time.time() + 10.0
+    assert _state("resume-1") == ledger.STATE_FAILED
+    assert ledger.due_failures() == []
+
+    ledger.record(resume, ledger.STATE_FAILED, "boom again", ledger.ERROR_LLM)
+    failure = _failure("resume-1")
+    assert failure["attempts"] == 2
+    assert failure["next_retry_at"] >= before + 20.0
+
+
+def test_due_failures_after_backoff(resume):
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_BACKEND)
+    _make_due("resume-1")
+
+    due = ledger.due_failures()
+    assert [f["resume_id"] for f in due] == ["resume-1"]
+    assert due[0]["error_class"] == ledger.ERROR_BACKEND
+    assert due[0]["attempts"] == 1
+
+
+def test_dead_letter_after_max_attempts(resume):
+    for _ in range(ledger.RETRY_MAX_ATTEMPTS - 1):
+        ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+        assert _state("resume-1") == ledger.STATE_FAILED
+
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+
+    failure = _failure("resume-1")
+    assert failure["attempts"] == ledger.RETRY_MAX_ATTEMPTS
+    assert failure["dead_letter"] == 1
+    assert failure["next_retry_at"] is None
+    assert _state("resume-1") == ledger.STATE_DEAD_LETTER
+    assert ledger.due_failures() == []
+    assert ledger.failure_stats()["dead_letter"] == 1
+
+
+def test_non_retryable_error_is_dead_lettered_at_once(resume):
+    ledger.record(resume, ledger.STATE_FAILED, "gone", ledger.ERROR_MISSING_FILE)
+
+    assert _failure("resume-1")["dead_letter"] == 1
+    assert _state("resume-1") == ledger.STATE_DEAD_LETTER
+
+
+def test_changed_content_restarts_attempts(resume):
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+
+    with open(resume, "a", encoding="utf-8") as f:
+        f.write("\nKubernetes")
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+
+    assert _failure("resume-1")["attempts"] == 1
+
+
+def test_completed_clears_failure_and_checkpoint(resume):
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+    ledger.save_checkpoint(resume, parsed_data={"first_name": "Jane"})
+
+    ledger.record(resume, ledger.STATE_COMPLETED)
+
+    assert _failure("resume-1") is None
+    assert ledger.load_checkpoint(resume) == {}
+    assert ledger.select_unprocessed([resume]) == []
+
+
+def test_queued_failure_is_left_to_the_retry_queue(resume, tmp_path):
+    other = tmp_path / "resume-2.txt"
+    other.write_text("John Roe")
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+
+    assert ledger.select_unprocessed([resume, str(other)]) == [str(other)]
+
+
+# -----------------------------------------------------
+# Step checkpoints
+# -----------------------------------------------------
+
+def test_checkpoint_merges_fields(resume):
+    ledger.save_checkpoint(resume, parsed_data={"first_name": "Jane"})
+    ledger.save_checkpoint(resume, job_id="job-1", resume_job_score=0.5)
+
+    assert ledger.load_checkpoint(resume) == {
+        "parsed_data": {"first_name": "Jane"},
+        "job_id": "job-1",
+        "resume_job_score": 0.5,
+    }
+
+
+def test_checkpoint_invalidated_when_content_changes(resume):
+    ledger.save_checkpoint(resume, parsed_data={"first_name": "Jane"}, candidate_id="cand-1")
+
+    with open(resume, "w", encoding="utf-8") as f:
+        f.write("Jane Doe\njane@example.com\nPython, Docker, Kubernetes")
+
+    assert ledger.load_checkpoint(resume) == {}
+
+    # A save for the new content replaces the stale checkpoint instead of merging into it
+    ledger.save_checkpoint(resume, job_id="job-2")
+    assert ledger.load_checkpoint(resume) == {"job_id": "job-2"}
+
+
+def test_concurrent_checkpoint_saves_keep_every_field(resume):
+    fields = [f"step_{i}" for i in range(8)]
+    barrier = threading.Barrier(len(fields))
+
+    def _save(name):
+        barrier.wait()
+        ledger.save_checkpoint(resume, **{name: True})
+
+    threads = [threading.Thread(target=_save, args=(name,)) for name in fields]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert ledger.load_checkpoint(resume) == {name: True for name in fields}
+
+
+# -----------------------------------------------------
+# In-progress leases
+# -----------------------------------------------------
+
+def test_lease_blocks_other_claims_until_recorded(resume):
+    assert ledger.claim(resume) is True
+    assert ledger.claim(resume) is False
+    assert ledger.select_unprocessed([resume]) == []
+
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+    _make_due("resume-1")
+    assert ledger.claim(resume) is True
+    assert ledger.due_failures() == []
+
+    ledger.record(resume, ledger.STATE_FAILED, "boom", ledger.ERROR_LLM)
+    _make_due("resume-1")
+    assert [f["resume_id"] for f in ledger.due_failures()] == ["resume-1"]
+
+
+def test_expired_lease_can_be_taken_over(resume, monkeypatch):
+    monkeypatch.setattr(ledger, "LEASE_SECONDS", -1.0)
+    assert ledger.claim(resume) is True
+    assert ledger.claim(resume) is True
+    assert ledger.select_unprocessed([resume]) == [resume]
+
+
+def test_retry_of_same_task_releases_its_own_stale_leases(resume, monkeypatch):
+    monkeypatch.setattr(ledger, "LEASE_OWNER", ledger.LEASE_OWNER)
+    ledger.set_lease_owner("run-1:parse:0")
+    assert ledger.claim(resume) is True
+
+    # Another task sees it as in progress, not done
+    ledger.set_lease_owner("run-1:parse:1")
+    assert ledger.release_owned() == 0
+    assert ledger.select_unprocessed([resume]) == []
+    assert ledger.leased([resume]) == [resume]
+
+    # The retried chunk drops the lease its killed attempt left behind
+    ledger.set_lease_owner("run-1:parse:0")
+    assert ledger.release_owned() == 1
+    assert ledger.leased([resume]) == []
+    assert ledger.select_unprocessed([resume]) == [resume]
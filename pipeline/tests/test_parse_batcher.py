@@ -0,0 +1,78 @@
+# test_parse_batcher.py
+"""
+Coalescing of concurrent submits into batched calls.
+
+    cd pipeline && python -m pytest tests
+"""
+import time
+import asyncio
+
+from parse_batcher import ParseBatcher
+
+
+def _submit_all(batcher: ParseBatcher, keys: list) -> list:
+    async def main():
+        return await asyncio.gather(*(batcher.submit(key, key.upper()) for key in keys))
+    return asyncio.run(main())
+
+
+def test_full_batch_goes_out_without_waiting():
+    calls = []
+
+    async def call(items):
+        calls.append(list(items))
+        return {key: f"parsed {payload}" for key, payload in items}
+
+    batcher = ParseBatcher(call, size=3, max_wait=5.0)
+    started = time.monotonic()
+    results = _submit_all(batcher, ["a", "b", "c"])
+
+    assert time.monotonic() - started < 1.0
+    assert results == ["parsed A", "parsed B", "parsed C"]
+    assert calls == [[("a", "A"), ("b", "B"), ("c", "C")]]
+
+
+def test_partial_batch_goes_out_after_max_wait():
+    calls = []
+
+    async def call(items):
+        calls.append(len(items))
+        return {key: payload for key, payload in items}
+
+    batcher = ParseBatcher(call, size=4, max_wait=0.05)
+    results = _submit_all(batcher, ["a", "b", "c", "d", "e"])
+
+    assert results == ["A", "B", "C", "D", "E"]
+    assert calls == [4, 1]
+    stats = batcher.stats()
+    assert stats["batches"] == 2 and stats["items"] == 5
+    assert stats["avg_batch_size"] == 2.5
+    assert stats["item_success_rate"] == 1.0
+
+
+def test_items_left_out_get_none():
+    async def call(items):
+        return {key: payload for key, payload in items if key != "b"}
+
+    batcher = ParseBatcher(call, size=3, max_wait=0.05)
+    assert _submit_all(batcher, ["a", "b", "c"]) == ["A", None, "C"]
+    assert batcher.stats()["returned"] == 2
+
+
+def test_failed_batch_gives_every_submitter_none():
+    async def call(items):
+        raise ValueError("malformed batch response")
+
+    batcher = ParseBatcher(call, size=2, max_wait=0.05)
+    assert _submit_all(batcher, ["a", "b"]) == [None, None]
+    assert batcher.stats()["failed_batches"] == 1
+
+
+def test_reset_stats():
+    async def call(items):
+        return {}
+
+    batcher = ParseBatcher(call, size=1, max_wait=0.0)
+    _submit_all(batcher, ["a"])
+    batcher.reset_stats()
+    assert batcher.stats()["batches"] == 0
@@ -0,0 +1,100 @@
+# test_parse_cache.py
+import os
+import time
+
+import pytest
+
+import parse_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "parse_cache"))
+    monkeypatch.setattr(parse_cache, "CACHE_ENABLED", True)
+    parse_cache.reset_stats()
+
+
+@pytest.fixture
+def resume(tmp_path):
+    path = tmp_path / "resume-1.txt"
+    path.write_text("Jane Doe\nPython, Docker")
+    return str(path)
+
+
+def test_key_is_stable_for_same_content_and_version(resume, tmp_path):
+    copy = tmp_path / "copy.txt"
+    copy.write_bytes(open(resume, "rb").read())
+
+    assert parse_cache.cache_key(resume, "v1") == parse_cache.cache_key(str(copy), "v1")
+
+
+def test_key_changes_with_content(resume):
+    before = parse_cache.cache_key(resume, "v1")
+    with open(resume, "a", encoding="utf-8") as f:
+        f.write("\nKubernetes")
+
+    assert parse_cache.cache_key(resume, "v1") != before
+
+
+def test_key_changes_with_prompt_version(resume):
+    assert parse_cache.cache_key(resume, "v1") != parse_cache.cache_key(resume, "v2")
+
+
+def test_precomputed_content_hash_gives_the_same_key(resume):
+    content_hash = parse_cache.file_sha256(resume)
+    assert parse_cache.cache_key(resume, "v1", content_hash) == parse_cache.cache_key(resume, "v1")
+
+
+def test_round_trip_and_stats(resume):
+    key = parse_cache.cache_key(resume, "v1")
+    assert parse_cache.get(key) is None
+
+    parse_cache.put(key, {"first_name": "Jane"})
+
+    assert parse_cache.get(key) == {"first_name": "Jane"}
+    assert parse_cache.get(parse_cache.cache_key(resume, "v2")) is None
+    assert parse_cache.stats() == {"hits": 1, "misses": 2, "writes": 1, "evicted": 0}
+
+
+def test_get_any_returns_first_hit_and_counts_once(resume):
+    v1, v2 = parse_cache.cache_key(resume, "v1"), parse_cache.cache_key(resume, "v2")
+    parse_cache.put(v2, {"from": "v2"})
+
+    assert parse_cache.get_any([v1, v2]) == {"from": "v2"}
+    assert parse_cache.get_any([v1]) is None
+    assert parse_cache.stats()["hits"] == 1
+    assert parse_cache.stats()["misses"] == 1
+
+
+def test_expired_entry_is_a_miss(resume, monkeypatch):
+    key = parse_cache.cache_key(resume, "v1")
+    parse_cache.put(key, {"first_name": "Jane"})
+    old = time.time() - 3600
+    os.utime(parse_cache._entry_path(key), (old, old))
+    monkeypatch.setattr(parse_cache, "CACHE_MAX_AGE", 60)
+
+    assert parse_cache.get(key) is None
+    assert not os.path.exists(parse_cache._entry_path(key))
+    assert parse_cache.stats()["evicted"] == 1
+
+
+def test_evict_drops_oldest_entries_over_the_size_cap(monkeypatch):
+    for i in range(3):
+        parse_cache.put(f"key{i}", {"blob": "x" * 100})
+        path = parse_cache._entry_path(f"key{i}")
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    entry_size = os.path.getsize(parse_cache._entry_path("key0"))
+    monkeypatch.setattr(parse_cache, "CACHE_MAX_BYTES", entry_size * 2)
+
+    assert parse_cache.evict() == 1
+    assert parse_cache.get("key0") is None
+    assert parse_cache.get("key2") == {"blob": "x" * 100}
+
+
+def test_disabled_cache_never_stores(resume, monkeypatch):
+    monkeypatch.setattr(parse_cache, "CACHE_ENABLED", False)
+    key = parse_cache.cache_key(resume, "v1")
+    parse_cache.put(key, {"first_name": "Jane"})
+
+    assert parse_cache.get(key) is None
+    assert not os.path.exists(parse_cache._entry_path(key))
@@ -0,0 +1,205 @@
+# test_rate_limiter.py
+"""
+Window, backoff and token accounting of the Gemini limiter, and the
+cross-process SharedQuota window behind it.
+
+    cd pipeline && python -m pytest tests
+"""
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+import shared_quota
+from rate_limiter import AdaptiveRateLimiter
+from shared_quota import SharedQuota
+
+
+class Throttled(Exception):
+    pass
+
+
+def _limiter(**kwargs) -> AdaptiveRateLimiter:
+    options = {"name": "test", "rpm": 0, "tpm": 0, "max_concurrency": 4, "base_backoff": 0.01, "max_backoff": 0.01}
+    options.update(kwargs)
+    return AdaptiveRateLimiter(**options)
+
+
+def _usage(tokens: int):
+    return SimpleNamespace(usage_metadata=SimpleNamespace(total_token_count=tokens))
+
+
+# -----------------------------------------------------
+# Sliding window
+# -----------------------------------------------------
+
+def test_requests_over_rpm_wait_for_the_window(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "WINDOW_SECONDS", 0.3)
+    limiter = _limiter(rpm=2)
+
+    async def call():
+        return "ok"
+
+    async def main():
+        return [await limiter.run(call) for _ in range(3)]
+
+    results = asyncio.run(main())
+    waits = [wait for _, wait in results]
+    assert waits[0] < 0.05 and waits[1] < 0.05
+    assert waits[2] >= 0.25
+
+
+def test_tokens_over_tpm_wait_for_the_window(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "WINDOW_SECONDS", 0.3)
+    limiter = _limiter(tpm=100)
+
+    async def call():
+        return "ok"
+
+    async def main():
+        return [await limiter.run(call, est_tokens=60) for _ in range(2)]
+
+    (_, first), (_, second) = asyncio.run(main())
+    assert first < 0.05
+    assert second >= 0.25
+
+
+def test_actual_usage_amends_the_reservation():
+    limiter = _limiter(tpm=1000)
+
+    async def call():
+        return _usage(250)
+
+    asyncio.run(limiter.run(call, est_tokens=100))
+    assert [entry[1] for entry in limiter._tokens] == [250]
+    assert limiter._token_sum == 250
+
+
+# -----------------------------------------------------
+# Backoff
+# -----------------------------------------------------
+
+def test_throttled_calls_are_retried_and_halve_the_limit():
+    limiter = _limiter(max_concurrency=8, retry_on=(Throttled,), max_retries=3)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled()
+        return "ok"
+
+    result, _ = asyncio.run(limiter.run(call))
+    stats = limiter.stats()
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert stats["retries"] == 2 and stats["throttled"] == 2
+    assert stats["concurrency_limit"] < 8 / 2
+
+
+def test_gives_up_after_max_retries():
+    limiter = _limiter(retry_on=(Throttled,), max_retries=2)
+
+    async def call():
+        raise Throttled()
+
+    with pytest.raises(Throttled):
+        asyncio.run(limiter.run(call))
+    assert limiter.stats()["gave_up"] == 1
+    assert limiter._in_flight == 0
+
+
+def test_other_errors_are_not_retried():
+    limiter = _limiter(retry_on=(Throttled,))
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.run(call))
+    assert len(attempts) == 1
+
+
+# -----------------------------------------------------
+# Shared quota
+# -----------------------------------------------------
+
+class SlowQuota:
+    """Stands in for SharedQuota with a slow reserve, like a busy SQLite file."""
+
+    def __init__(self):
+        self.adjusted = {}
+
+    def reserve(self, tokens, rpm, tpm):
+        time.sleep(0.2)
+        return 0.0, 1
+
+    def adjust(self, reservation_id, tokens):
+        self.adjusted[reservation_id] = tokens
+
+
+def test_shared_reservation_does_not_hold_the_lock():
+    limiter = _limiter(shared=SlowQuota())
+
+    async def call():
+        return "ok"
+
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.run(call) for _ in range(4)))
+        return time.monotonic() - started
+
+    # Serialised behind the lock this would take 4 x 0.2s
+    assert asyncio.run(main()) < 0.5
+
+
+def test_shared_wait_gives_the_local_slot_back():
+    class BusyOnce(SlowQuota):
+        calls = 0
+
+        def reserve(self, tokens, rpm, tpm):
+            self.calls += 1
+            return (0.05, None) if self.calls == 1 else (0.0, 7)
+
+    quota = BusyOnce()
+    limiter = _limiter(rpm=10, shared=quota)
+
+    async def call():
+        return _usage(40)
+
+    _, wait = asyncio.run(limiter.run(call, est_tokens=10))
+    assert wait >= 0.05
+    assert len(limiter._requests) == 1
+    assert limiter._token_sum == 40
+    assert quota.adjusted == {7: 40}
+
+
+def test_shared_quota_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_quota, "WINDOW_SECONDS", 0.3)
+    first = SharedQuota(str(tmp_path / "quota.sqlite3"), "gemini")
+    second = SharedQuota(str(tmp_path / "quota.sqlite3"), "gemini")
+
+    wait, reservation = first.reserve(10, rpm=2, tpm=0)
+    assert wait == 0.0 and reservation is not None
+    assert second.reserve(10, rpm=2, tpm=0)[0] == 0.0
+
+    wait, reservation = second.reserve(10, rpm=2, tpm=0)
+    assert 0 < wait <= 0.3 and reservation is None
+
+    time.sleep(0.35)
+    assert first.reserve(10, rpm=2, tpm=0)[0] == 0.0
+
+
+def test_shared_quota_adjust_changes_the_token_budget(tmp_path):
+    quota = SharedQuota(str(tmp_path / "quota.sqlite3"), "gemini")
+    _, reservation = quota.reserve(10, rpm=0, tpm=100)
+    assert quota.reserve(80, rpm=0, tpm=100)[0] == 0.0
+
+    # Only 10 of the 100 tokens are left once the first call turns out to cost 20
+    quota.adjust(reservation, 20)
+    wait, _ = quota.reserve(5, rpm=0, tpm=100)
+    assert wait > 0
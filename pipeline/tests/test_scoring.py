@@ -0,0 +1,79 @@
+# test_scoring.py
+"""
+Resume-job fit scores: weighted JD coverage blended with cosine similarity.
+
+    cd pipeline && python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+import scoring
+from scoring import SkillVocabulary
+
+
+@pytest.fixture
+def vocab():
+    return SkillVocabulary.build()
+
+
+def _score(vocab, skills, jd):
+    return scoring.score_batch([{"skills": skills}], [jd], vocab)[0]
+
+
+def test_normalize_skill_keeps_symbols():
+    assert scoring.normalize_skill("  C++ ") == "c++"
+    assert scoring.normalize_skill("Node.js") == "node.js"
+    assert scoring.normalize_skill("Machine   Learning") == "machine learning"
+
+
+def test_full_and_no_overlap(vocab):
+    jd = "We need Python and Docker experience."
+    assert _score(vocab, ["Python", "Docker"], jd) == 1.0
+    assert _score(vocab, ["Java"], jd) == 0.0
+    assert _score(vocab, [], jd) == 0.0
+    assert _score(vocab, ["Python"], "") == 0.0
+
+
+def test_partial_overlap_blends_coverage_and_cosine(vocab):
+    # coverage 1/2, cosine 1/sqrt(2)
+    expected = scoring.COVERAGE_WEIGHT * 0.5 + (1 - scoring.COVERAGE_WEIGHT) / np.sqrt(2)
+    assert _score(vocab, ["python"], "python, docker") == round(expected, 2)
+
+
+def test_weights_favour_rarer_skills():
+    weighted = SkillVocabulary.build(weights={"python": 3.0})
+    # coverage 3/4, cosine 3 / (sqrt(3) * 2)
+    expected = scoring.COVERAGE_WEIGHT * 0.75 + (1 - scoring.COVERAGE_WEIGHT) * 3 / (np.sqrt(3) * 2)
+    assert _score(weighted, ["python"], "python, docker") == round(expected, 2)
+    assert _score(weighted, ["docker"], "python, docker") < _score(weighted, ["python"], "python, docker")
+
+
+def test_multi_word_skills_match_in_jd_text(vocab):
+    assert _score(vocab, ["Machine Learning"], "Experience with machine learning.") == 1.0
+
+
+def test_score_pairs_matches_score_matrix(vocab):
+    resumes = vocab.resume_matrix([["python"], ["docker", "aws"], ["java", "sql"]])
+    jobs = vocab.jd_matrix(["python docker", "aws sql java"])
+    matrix = scoring.score_matrix(resumes, jobs, vocab.weights)
+    job_index = [0, 1, 1]
+    pairs = scoring.score_pairs(resumes, jobs, job_index, vocab.weights)
+    np.testing.assert_allclose(pairs, matrix[np.arange(3), job_index])
+
+
+def test_score_does_not_depend_on_the_batch(vocab):
+    jd = "python, docker, kubernetes"
+    alone = _score(vocab, ["python", "docker"], jd)
+    batch = scoring.score_batch(
+        [{"skills": ["java"]}, {"skills": ["python", "docker"]}, None],
+        ["sql and java", jd, jd],
+        vocab,
+    )
+    assert batch[1] == alone
+    assert batch[2] == 0.0
+
+
+def test_idf_weights_favour_rarer_terms(vocab):
+    weights = scoring.idf_weights(vocab, ["python docker", "python aws", "python sql"])
+    assert weights["python"] < weights["docker"]
+    assert weights["docker"] < weights["kafka"]
@@ -0,0 +1,100 @@
+# test_timing.py
+"""
+Per-run timing logs: run ids, per-resume records and summaries.
+
+    cd pipeline && python -m pytest tests
+"""
+import os
+import time
+
+import pytest
+
+import timing
+
+
+@pytest.fixture(autouse=True)
+def isolated_logs(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing, "TIMING_LOG_DIR", str(tmp_path / "timings"))
+    monkeypatch.setattr(timing, "_run", {"run_id": None, "started": None, "resumes": 0})
+
+
+def _run_one(resume_id: str, seconds: float = 0.01):
+    record = timing.start_record(resume_id)
+    timing.observe("llm_parse", seconds)
+    timing.count("prompt_tokens", 100)
+    return timing.finish_record(record, status="completed")
+
+
+def test_start_run_without_id_gets_a_fresh_one_each_time():
+    timing.start_run()
+    first = timing._run["run_id"]
+    timing.start_run(None)
+    second = timing._run["run_id"]
+
+    assert first.startswith("manual__") and second.startswith("manual__")
+    assert first != second
+
+
+def test_start_run_keeps_the_given_id_and_clears_samples():
+    timing.start_run("run-1")
+    timing.observe("llm_parse", 1.0)
+    timing.start_run("run-2")
+
+    assert timing._run["run_id"] == "run-2"
+    assert timing.summary()["stages"] == {}
+
+
+def test_log_path_is_safe_for_airflow_run_ids():
+    path = timing.log_path("scheduled__2026-10-17T00:00:00+00:00")
+    assert os.path.dirname(path) == timing.TIMING_LOG_DIR
+    assert os.path.basename(path) == "scheduled__2026-10-17T00_00_00_00_00.jsonl"
+
+
+def test_records_go_to_their_own_run_log():
+    timing.start_run("run-1")
+    _run_one("a")
+    _run_one("b")
+    timing.start_run("run-2")
+    _run_one("c")
+
+    first = timing.summarize_log("run-1")
+    assert first["resumes"] == 2
+    assert first["stages"]["llm_parse"]["count"] == 2
+    assert first["counts"] == {"prompt_tokens": 200}
+    assert timing.summarize_log("run-2")["resumes"] == 1
+    assert timing.summarize_log("run-3")["resumes"] == 0
+
+
+def test_stage_records_add_raw_samples():
+    timing.start_run("run-1")
+    timing.observe("blob_download", 0.5)
+    timing.observe("blob_download", 1.5)
+    timing.stage_record("extract")
+
+    stages = timing.summarize_log("run-1")["stages"]
+    assert stages["blob_download"]["count"] == 2
+    assert stages["blob_download"]["total"] == 2.0
+
+
+def test_span_times_the_block_for_the_current_resume():
+    timing.start_run("run-1")
+    record = timing.start_record("a")
+    with timing.span("text_extraction"):
+        time.sleep(0.02)
+    stages = timing.finish_record(record)
+
+    assert stages["text_extraction"] >= 0.02
+    assert timing.summary()["resumes"] == 1
+
+
+def test_prune_removes_only_old_logs():
+    timing.start_run("old")
+    _run_one("a")
+    timing.start_run("new")
+    _run_one("b")
+    old_path = timing.log_path("old")
+    os.utime(old_path, (time.time() - 3600, time.time() - 3600))
+
+    assert timing.prune_logs(max_age=60) == 1
+    assert not os.path.exists(old_path)
+    assert os.path.exists(timing.log_path("new"))
@@ -0,0 +1,103 @@
+# test_token_budget.py
+"""
+Compaction of the question-generation prompt and per-call token accounting.
+
+    cd pipeline && python -m pytest tests
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import timing
+import token_budget
+from rate_limiter import estimate_tokens
+
+TEMPLATE = "Job:\n{job_description}\nCandidate:\n{candidate_json}\nWrite questions."
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    token_budget.reset_stats()
+    yield
+    token_budget.reset_stats()
+
+
+def _experience(n: int, chars: int = 400):
+    return [{"title": f"Engineer {i}", "details": f"Built service {i}. " * (chars // 20)} for i in range(n)]
+
+
+def test_normalize_drops_blank_and_repeated_lines():
+    text = "Python   developer\n\n  python developer \nRemote\tonly\n"
+    assert token_budget.normalize_text(text) == "Python developer\nRemote only"
+
+
+def test_truncate_prefers_a_sentence_boundary():
+    text = "First sentence here. Second sentence is longer than the budget allows."
+    cut = token_budget.truncate_text(text, 8)
+    assert cut == "First sentence here." + token_budget.TRUNCATION_MARK
+    assert token_budget.truncate_text("short", 8) == "short"
+
+
+def test_small_prompt_is_left_alone():
+    prompt, info = token_budget.fit_questions_prompt(TEMPLATE, "Python role", ["python"], [], "Dev", budget=1000)
+    assert info["compacted"] is False
+    assert info["prompt_tokens"] == info["original_tokens"]
+    assert "Python role" in prompt
+
+
+def test_zero_budget_disables_compaction():
+    jd = "Python. " * 5000
+    _, info = token_budget.fit_questions_prompt(TEMPLATE, jd, ["python"], _experience(20), "Dev", budget=0)
+    assert info["compacted"] is False
+
+
+def test_long_prompt_is_compacted_within_budget():
+    jd = "\n".join(f"Requirement {i}: experience with distributed systems." for i in range(400))
+    experience = _experience(30)
+    prompt, info = token_budget.fit_questions_prompt(
+        TEMPLATE, jd, ["python", "docker"], experience, "Senior engineer. " * 200, budget=1500,
+    )
+
+    assert info["compacted"] is True
+    assert info["original_tokens"] > 1500
+    assert info["prompt_tokens"] == estimate_tokens(prompt)
+    assert info["prompt_tokens"] <= 1500 * 1.05
+    assert "Requirement 0:" in prompt           # the start of the JD is kept
+    assert '"python", "docker"' in prompt       # skills are never trimmed
+
+
+def test_oldest_experience_is_dropped_first():
+    candidate = json.loads(token_budget.compact_candidate(["python"], _experience(20, 200), "Dev", 400))
+    titles = [e["title"] for e in candidate["experience"] if isinstance(e, dict)]
+
+    assert titles and titles == [f"Engineer {i}" for i in range(len(titles))]
+    assert len(titles) < 20
+    assert candidate["experience"][-1].endswith("earlier role(s) omitted)")
+
+
+def test_record_usage_prefers_reported_tokens():
+    response = SimpleNamespace(
+        text="[]", usage_metadata=SimpleNamespace(prompt_token_count=900, candidates_token_count=120),
+    )
+    assert token_budget.record_usage("questions", response, 1000) == {"prompt_tokens": 900, "output_tokens": 120}
+
+    estimated = token_budget.record_usage("questions", SimpleNamespace(text="x" * 40), 500)
+    assert estimated == {"prompt_tokens": 500, "output_tokens": 10}
+
+    stats = token_budget.stats()["questions"]
+    assert stats["calls"] == 2
+    assert stats["prompt_tokens"] == 1400
+    assert stats["output_tokens"] == 130
+
+
+def test_record_usage_reports_savings_and_counts_per_resume():
+    timing.start_run("budget-test")
+    record = timing.start_record("r1")
+    token_budget.record_usage("questions", SimpleNamespace(text=""), 750, original_tokens=3000, compacted=True)
+
+    assert token_budget.stats()["questions"]["saved_pct"] == 75.0
+    assert record["counts"] == {
+        "questions_prompt_tokens": 750, "questions_output_tokens": 0, "questions_original_tokens": 3000,
+    }
+    timing.detach()